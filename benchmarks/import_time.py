@@ -0,0 +1,59 @@
+"""Measures the time of `import pykson` in fresh interpreters.
+
+    python benchmarks/import_time.py [--runs 20]
+
+Reports the median cumulative import time of pykson from `python -X importtime`, the dependencies loaded by the
+import and the time the deferred dependencies would add if they were imported eagerly.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+DEFERRED_MODULES = ['uuid', 'csv', 'pytz', 'jdatetime', 'dateutil.parser']
+
+
+def _run(code: str) -> subprocess.CompletedProcess:
+    environment = dict(os.environ)
+    environment['PYTHONPATH'] = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.pathsep + \
+        environment.get('PYTHONPATH', '')
+    return subprocess.run([sys.executable, '-X', 'importtime', '-c', code], env=environment,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+
+def _cumulative_import_time_us(stderr: str, module: str) -> int:
+    for line in stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1].strip())
+    raise Exception('Module ' + module + ' not found in import time output')
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description='Measure import time of pykson')
+    argument_parser.add_argument('--runs', type=int, default=20)
+    args = argument_parser.parse_args()
+
+    pykson_times = [_cumulative_import_time_us(_run('import pykson').stderr, 'pykson') for _ in range(args.runs)]
+    loaded = json.loads(_run(
+        'import sys, json, pykson; print(json.dumps([m for m in ' + repr(DEFERRED_MODULES) + ' if m in sys.modules]))'
+    ).stdout)
+    # time to import the deferred dependencies after pykson, which is what the import saves
+    deferred_times = [float(_run(
+        'import time, importlib, pykson\n'
+        'start = time.perf_counter()\n'
+        'for m in ' + repr(DEFERRED_MODULES) + ':\n'
+        '    importlib.import_module(m)\n'
+        'print((time.perf_counter() - start) * 1000000)'
+    ).stdout) for _ in range(args.runs)]
+    print('import pykson:              {:8.1f} ms (median of {} runs)'.format(
+        statistics.median(pykson_times) / 1000.0, args.runs))
+    print('deferred dependencies:      {:8.1f} ms if imported eagerly'.format(
+        statistics.median(deferred_times) / 1000.0))
+    print('deferred dependencies loaded by import: ' + (', '.join(loaded) if loaded else 'none'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Decodes and encodes objects from many threads sharing one Pykson instance.
+
+    python benchmarks/thread_scaling.py [--threads 1,2,4,8] [--objects 2000] [--rounds 3]
+
+Every thread decodes the same documents and checks that encoding the decoded objects gives the expected json, so the
+run fails on any corrupted value. Reports the throughput for each thread count relative to the first one; thread
+counts above one only scale on free-threaded python builds, with the GIL they show the locking overhead.
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pykson import Pykson, JsonObject, IntegerField, StringField, FloatField, DateField, ListField, ObjectField, \
+    ObjectListField, MultipleChoiceStringField  # noqa: E402
+
+
+class Address(JsonObject):
+    city = StringField()
+    zip_code = StringField(serialized_name='zip')
+
+
+class Visit(JsonObject):
+    day = DateField()
+    duration = FloatField()
+    tags = ListField(str)
+
+
+class Customer(JsonObject):
+    customer_id = IntegerField(serialized_name='id')
+    name = StringField(intern=True)
+    tier = MultipleChoiceStringField(options=['free', 'pro', 'enterprise'])
+    address = ObjectField(Address)
+    visits = ObjectListField(Visit)
+    # items are converted by the item field, which is shared by all threads
+    holidays = ListField(DateField())
+
+
+def _documents(count: int) -> list:
+    return [{
+        'id': i,
+        'name': 'customer ' + str(i % 50),
+        'tier': ['free', 'pro', 'enterprise'][i % 3],
+        'address': {'city': 'city ' + str(i % 7), 'zip': str(10000 + i)},
+        'visits': [{'day': '2024-01-' + str(1 + (i + j) % 28).zfill(2), 'duration': j * 1.5, 'tags': ['t' + str(j)]}
+                   for j in range(i % 5)],
+        'holidays': ['2024-12-' + str(20 + j) for j in range(1 + i % 6)],
+    } for i in range(count)]
+
+
+def _work(pson: Pykson, documents: list, expected: list, barrier: threading.Barrier) -> int:
+    barrier.wait()
+    for document, expected_json in zip(documents, expected):
+        customer = pson.from_json(document, Customer)
+        encoded = pson.to_json(customer)
+        if encoded != expected_json:
+            raise Exception('Corrupted value for customer ' + str(document['id']) + ': ' + encoded)
+    return len(documents)
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description='Measure thread scaling of pykson decoding and encoding')
+    argument_parser.add_argument('--threads', default='1,2,4,8')
+    argument_parser.add_argument('--objects', type=int, default=2000)
+    argument_parser.add_argument('--rounds', type=int, default=3)
+    args = argument_parser.parse_args()
+
+    pson = Pykson()
+    documents = _documents(args.objects)
+    expected = [pson.to_json(pson.from_json(d, Customer)) for d in documents]
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    print('python ' + sys.version.split()[0] + ', GIL ' +
+          ('enabled' if is_gil_enabled is None or is_gil_enabled() else 'disabled'))
+
+    single_thread_rate = None
+    for thread_count in [int(t) for t in args.threads.split(',')]:
+        best = None
+        for _ in range(args.rounds):
+            barrier = threading.Barrier(thread_count + 1)
+            with ThreadPoolExecutor(max_workers=thread_count) as executor:
+                futures = [executor.submit(_work, pson, documents, expected, barrier) for _ in range(thread_count)]
+                barrier.wait()
+                start = time.perf_counter()
+                total = sum(f.result() for f in futures)
+                elapsed = time.perf_counter() - start
+            rate = total / elapsed
+            best = rate if best is None else max(best, rate)
+        if single_thread_rate is None:
+            single_thread_rate = best
+        print('{:3d} threads: {:10.0f} objects/s  {:5.2f}x'.format(thread_count, best, best / single_thread_rate))
+    print('all decoded objects matched')
+
+
+if __name__ == '__main__':
+    main()
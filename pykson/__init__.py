@@ -1,15 +1,36 @@
-import uuid
+import binascii
 import decimal
+import importlib
 from enum import Enum
-from typing import Dict, Any, List, Optional, TypeVar, Union, Type, Set, Generic
-import six
-import csv
-import copy
-import pytz
+from typing import Dict, Any, List, Optional, TypeVar, Union, Type, Set, Generic, Callable, Iterable, Iterator, \
+    Tuple, Sequence
 import json
 import datetime
-import jdatetime
-from dateutil import parser
+
+
+class _LazyModule:
+    # module imported on first attribute access, attributes are cached on the proxy after their first access
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attribute: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        value = getattr(self._module, attribute)
+        setattr(self, attribute, value)
+        return value
+
+
+# dependencies only some fields and entry points use are imported on first use to keep import time low
+uuid = _LazyModule('uuid')
+csv = _LazyModule('csv')
+pytz = _LazyModule('pytz')
+jdatetime = _LazyModule('jdatetime')
+parser = _LazyModule('dateutil.parser')
+pickle = _LazyModule('pickle')
+hashlib = _LazyModule('hashlib')
+base64 = _LazyModule('base64')
 
 
 # name = "pykson"
@@ -39,6 +60,14 @@ class Field(JsonSerializable):
     def get_json_formatted_value(self, value):
         return value
 
+    # value used by binary codecs (msgpack, cbor) which can carry datetimes, bytes, decimals and uuids natively
+    def get_native_formatted_value(self, value):
+        return self.get_json_formatted_value(value)
+
+    # value written by Pykson.write_json, fields with large values can return objects written in chunks
+    def get_stream_formatted_value(self, value):
+        return self.get_json_formatted_value(value)
+
     # noinspection PyProtectedMember
     def __get__(self, instance, owner):
         if instance is None:
@@ -54,6 +83,10 @@ class Field(JsonSerializable):
             if instance is None:
                 raise Exception('Cannot access field without instance')
             instance._data[self.serialized_name] = value
+            if instance._dirty is not None:
+                instance._dirty.add(self.serialized_name)
+            if instance._observers is not None:
+                instance._notify_observers(self)
 
     def __init__(self,
                  field_type: FieldType,
@@ -77,9 +110,9 @@ class IntegerField(Field):
                 pass
         if value is not None and not isinstance(value, int):
             raise TypeError(instance, self.name, int, value)
-        if self.min_value is not None:
+        if value is not None and self.min_value is not None:
             assert value >= self.min_value
-        if self.max_value is not None:
+        if value is not None and self.max_value is not None:
             assert value <= self.max_value
         super().__set__(instance, value, test)
 
@@ -113,9 +146,9 @@ class FloatField(Field):
             value = float(value)
         if value is not None and not isinstance(value, float):
             raise TypeError(instance, self.name, float, value)
-        if self.min_value is not None:
+        if value is not None and self.min_value is not None:
             assert value >= self.min_value
-        if self.max_value is not None:
+        if value is not None and self.max_value is not None:
             assert value <= self.max_value
         super().__set__(instance, value, test)
 
@@ -170,50 +203,155 @@ class StringField(Field):
             value = str(value)
         if value is not None and not isinstance(value, str):
             raise TypeError(instance, self.name, str, value)
+        if value is not None and self.intern_table is not None:
+            interned = self.intern_table.get(value)
+            if interned is not None:
+                value = interned
+            elif len(self.intern_table) < self.intern_table_size:
+                self.intern_table[value] = value
         super().__set__(instance, value, test)
 
     def __init__(self, serialized_name: Optional[str] = None,
                  null: bool = True,
                  default_value: Optional[str] = None,
                  accepts_non_string: bool = False,
+                 intern: bool = False,
+                 intern_table_size: int = 10000,
                  ):
         super(StringField, self).__init__(field_type=FieldType.STRING,
                                           serialized_name=serialized_name,
                                           null=null,
                                           default_value=default_value)
         self.accepts_non_string = accepts_non_string
+        # values of fields with repeating values are shared, up to intern_table_size distinct values
+        self.intern_table = {} if intern else None  # type: Optional[Dict[str, str]]
+        self.intern_table_size = intern_table_size
         assert default_value is None or isinstance(default_value, str)
 
 
+BINARY_ENCODINGS = ['base64', 'base85']
+
+
+def _encode_binary(value: Union[bytes, bytearray, memoryview], encoding: str) -> str:
+    if encoding == 'base64':
+        return binascii.b2a_base64(value, newline=False).decode('ascii')
+    return base64.b85encode(value).decode('ascii')
+
+
+def _decode_binary(value: str, encoding: str) -> bytes:
+    if encoding == 'base64':
+        return binascii.a2b_base64(value)
+    return base64.b85decode(value)
+
+
+class _StreamedBinary:
+    # binary field value written in chunks by Pykson.write_json instead of being encoded to one string
+    def __init__(self, value: Union[bytes, bytearray, memoryview], encoding: str):
+        self.value = value
+        self.encoding = encoding
+
+    def iter_json_chunks(self, chunk_size: int) -> Iterator[str]:
+        view = memoryview(self.value)
+        # base64 encodes each 3 bytes and base85 each 4 bytes separately, so chunks of their multiples can be joined
+        step = max(chunk_size // 4 * 3, 3) if self.encoding == 'base64' else max(chunk_size // 5 * 4, 4)
+        yield '"'
+        for start in range(0, len(view), step):
+            yield _encode_binary(view[start:start + step], self.encoding)
+        yield '"'
+
+
+def _as_byte_view(value) -> memoryview:
+    # view of a buffer protocol object as unsigned bytes, the buffer is not copied
+    view = memoryview(value)
+    if view.format != 'B' or view.ndim != 1:
+        return view.cast('B')
+    return view
+
+
 class BytesField(Field):
+    # values are written as base64 or base85 strings in json and as raw binary by binary codecs. memoryviews and other
+    # buffer protocol objects are copied to bytes, or with zero_copy stored as memoryviews of their buffer, which must
+    # then not be changed while the object uses it. Pickles always hold bytes
+    def get_json_formatted_value(self, value):
+        if value is None:
+            return None
+        return _encode_binary(value, self.encoding)
+
+    def get_native_formatted_value(self, value):
+        if isinstance(value, memoryview):
+            return value.tobytes()
+        return value
+
+    def get_stream_formatted_value(self, value):
+        if value is None:
+            return None
+        return _StreamedBinary(value, self.encoding)
+
     def __set__(self, instance, value, test: bool = False):
+        if value is not None and isinstance(value, str):
+            try:
+                value = _decode_binary(value, self.encoding)
+            except ValueError:
+                raise ValueError('Invalid ' + self.encoding + ' value for field ' + str(self.name))
         if value is not None and not isinstance(value, bytes):
-            raise TypeError(instance, self.name, bytes, value)
+            try:
+                value = _as_byte_view(value)
+            except TypeError:
+                raise TypeError(instance, self.name, bytes, value)
+            if not self.zero_copy:
+                value = value.tobytes()
         super().__set__(instance, value, test)
 
     def __init__(self, serialized_name: Optional[str] = None, null: bool = True,
-                 default_value: Optional[bytes] = None):
+                 default_value: Optional[bytes] = None, encoding: str = 'base64', zero_copy: bool = False):
         super(BytesField, self).__init__(field_type=FieldType.BYTES,
                                          serialized_name=serialized_name,
                                          null=null,
                                          default_value=default_value
                                          )
         assert default_value is None or isinstance(default_value, bytes)
+        assert encoding in BINARY_ENCODINGS, 'Invalid binary encoding ' + str(encoding) + ', must be in ' + str(
+            BINARY_ENCODINGS)
+        self.encoding = encoding
+        self.zero_copy = zero_copy
 
 
 class ByteArrayField(Field):
+    def get_json_formatted_value(self, value):
+        if value is None:
+            return None
+        return _encode_binary(value, self.encoding)
+
+    def get_native_formatted_value(self, value):
+        return value
+
+    def get_stream_formatted_value(self, value):
+        if value is None:
+            return None
+        return _StreamedBinary(value, self.encoding)
+
     def __set__(self, instance, value, test: bool = False):
+        if value is not None and isinstance(value, str):
+            try:
+                value = _decode_binary(value, self.encoding)
+            except ValueError:
+                raise ValueError('Invalid ' + self.encoding + ' value for field ' + str(self.name))
+        if value is not None and isinstance(value, (bytes, memoryview)):
+            value = bytearray(value)
         if value is not None and not isinstance(value, bytearray):
             raise TypeError(instance, self.name, bytearray, value)
         super().__set__(instance, value, test)
 
     def __init__(self, serialized_name: Optional[str] = None, null: bool = True,
-                 default_value: Optional[bytearray] = None):
+                 default_value: Optional[bytearray] = None, encoding: str = 'base64'):
         super(ByteArrayField, self).__init__(field_type=FieldType.BYTE_ARRAY,
                                              serialized_name=serialized_name,
                                              null=null,
                                              default_value=default_value)
         assert default_value is None or isinstance(default_value, bytearray)
+        assert encoding in BINARY_ENCODINGS, 'Invalid binary encoding ' + str(encoding) + ', must be in ' + str(
+            BINARY_ENCODINGS)
+        self.encoding = encoding
 
 
 # noinspection DuplicatedCode
@@ -223,6 +361,8 @@ class MultipleChoiceStringField(Field):
             raise TypeError(instance, self.name, str, value)
         if value is not None and not (value in self.options):
             raise ValueError('Invalid value ' + str(value) + ' not present in options ' + str(self.options))
+        if value is not None:
+            value = self.canonical_options.get((type(value), value), value)
         super().__set__(instance, value, test)
 
     def __init__(self, options: Union[List[str], Set[str]],
@@ -249,19 +389,23 @@ class MultipleChoiceStringField(Field):
         if len(options) != len(set(options)):
             raise Exception("Duplicate values passed for options of multiple choice string field")
         self.options = set(options)
+        # decoded values are replaced by the option instances, so equal values share one object. Keyed by type too, so
+        # that only values of the type of an option are replaced by it
+        self.canonical_options = {(type(option), option): option for option in options}
         assert default_value is None or (isinstance(default_value, str) and default_value in self.options)
 
 
 # noinspection DuplicatedCode
 class EnumStringField(Field):
     def __set__(self, instance, value, test: bool = False):
-        if value is not None and value in self.enum_options:
-            if not isinstance(value, str):
-                value = value.value
+        if value is not None and isinstance(value, Enum) and value in self.enum_options:
+            value = value.value
         if value is not None and not isinstance(value, str):
             raise TypeError(instance, self.name, str, value)
         if value is not None and not (value in self.options):
             raise ValueError('Invalid value ' + str(value) + ' not present in enum values ' + str(self.options))
+        if value is not None:
+            value = self.canonical_options.get((type(value), value), value)
         super().__set__(instance, value, test)
 
     def __init__(self, enum, serialized_name: Optional[str] = None, null: bool = True,
@@ -286,16 +430,21 @@ class EnumStringField(Field):
             raise Exception("Duplicate values passed for options of enum string field")
         self.enum_options = [e for e in enum]
         self.options = set(options)
+        # decoded values are replaced by the option instances, so equal values share one object
+        self.canonical_options = {(type(option), option): option for option in options}
         assert default_value is None or (isinstance(default_value, str) and default_value in self.options)
 
 
 # noinspection DuplicatedCode
 class MultipleChoiceIntegerField(Field):
     def __set__(self, instance, value, test: bool = False):
-        if value is not None and not isinstance(value, int):
+        # bool is a subclass of int, True and False would otherwise be accepted as the options 1 and 0
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
             raise TypeError(instance, self.name, int, value)
         if value is not None and not (value in self.options):
             raise ValueError('Invalid value ' + str(value) + ' not present in options ' + str(self.options))
+        if value is not None:
+            value = self.canonical_options.get((type(value), value), value)
         super().__set__(instance, value, test)
 
     def __init__(self, options: Union[List[int], Set[int]], serialized_name: Optional[str] = None, null: bool = True,
@@ -313,24 +462,26 @@ class MultipleChoiceIntegerField(Field):
         if len(options) == 0:
             raise Exception("Empty options passed for multiple choice integer field")
         for option in options:
-            if not isinstance(option, int):
+            if not isinstance(option, int) or isinstance(option, bool):
                 raise Exception("Invalid value in options of multiple choice integer field, " + str(
                     option) + ', expected int value but found ' + str(type(option)))
         if len(options) != len(set(options)):
             raise Exception("Duplicate values passed for options of multiple choice integer field")
         self.options = set(options)
+        self.canonical_options = {(type(option), option): option for option in options}
         assert default_value is None or (isinstance(default_value, int) and default_value in self.options)
 
 
 class EnumIntegerField(Field):
     def __set__(self, instance, value, test: bool = False):
-        if value is not None and value in self.enum_options:
-            if not isinstance(value, int):
-                value = value.value
-        if value is not None and not isinstance(value, int):
+        if value is not None and isinstance(value, Enum) and value in self.enum_options:
+            value = value.value
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
             raise TypeError(instance, self.name, int, value)
         if value is not None and not (value in self.options):
             raise ValueError('Invalid value ' + str(value) + ' not present in enum values ' + str(self.options))
+        if value is not None:
+            value = self.canonical_options.get((type(value), value), value)
         super().__set__(instance, value, test)
 
     def __init__(self, enum, serialized_name: Optional[str] = None, null: bool = True,
@@ -347,7 +498,7 @@ class EnumIntegerField(Field):
         if len(options) == 0:
             raise Exception("Enum with no values passed for enum integer field")
         for option in options:
-            if not isinstance(option, int):
+            if not isinstance(option, int) or isinstance(option, bool):
                 raise Exception(
                     "Invalid value in enum integer field, " + str(option) + ', expected int value but found ' + str(
                         type(option)))
@@ -355,6 +506,7 @@ class EnumIntegerField(Field):
             raise Exception("Duplicate values passed for options of enum integer field")
         self.enum_options = [e for e in enum]
         self.options = set(options)
+        self.canonical_options = {(type(option), option): option for option in options}
         assert default_value is None or (isinstance(default_value, int) and default_value in self.options)
 
 
@@ -417,6 +569,13 @@ class DateTimeField(Field):
             return None
         return datetime.datetime.strftime(value, self.datetime_format)
 
+    def get_native_formatted_value(self, value):
+        if value is None:
+            return None
+        if value.tzinfo is None or value.tzinfo.utcoffset(value) is None:
+            return pytz.timezone(self.datetime_timezone).localize(value)
+        return value
+
     def __set__(self, instance, value, test: bool = False):
         if value is not None and isinstance(value, str):
             if self.datetime_format:
@@ -460,7 +619,7 @@ class JDateField(Field):
                                 str(self.date_format) + ', error: ' + str(ex))
         if value is not None and not isinstance(value, jdatetime.date):
             raise TypeError(instance, self.name, jdatetime.date, value)
-        super().__set__(instance, value)
+        super().__set__(instance, value, test)
 
     def __init__(self, date_format: str = '%Y-%m-%d', serialized_name: Optional[str] = None, null: bool = True):
         super(JDateField, self).__init__(field_type=FieldType.STRING, serialized_name=serialized_name, null=null)
@@ -507,6 +666,13 @@ class TimestampSecondsField(Field):
             return None
         return int(value.replace(tzinfo=pytz.timezone(self.datetime_timezone)).timestamp())
 
+    def get_native_formatted_value(self, value):
+        if value is None:
+            return None
+        if value.tzinfo is None or value.tzinfo.utcoffset(value) is None:
+            return pytz.timezone(self.datetime_timezone).localize(value)
+        return value
+
     def __set__(self, instance, value, test: bool = False):
         if value is not None and isinstance(value, int):
             try:
@@ -533,6 +699,13 @@ class TimestampMillisecondsField(Field):
             return None
         return int(value.replace(tzinfo=pytz.timezone(self.datetime_timezone)).timestamp() * 1000.0)
 
+    def get_native_formatted_value(self, value):
+        if value is None:
+            return None
+        if value.tzinfo is None or value.tzinfo.utcoffset(value) is None:
+            return pytz.timezone(self.datetime_timezone).localize(value)
+        return value
+
     def __set__(self, instance, value, test: bool = False):
         if value is not None and isinstance(value, int):
             try:
@@ -558,6 +731,9 @@ class TimestampMillisecondsField(Field):
 
 
 class DecimalField(Field):
+    def get_native_formatted_value(self, value):
+        return value
+
     def __set__(self, instance, value, test: bool = False):
         if value is not None and isinstance(value, str) and self.accepts_string:
             value = decimal.Decimal(value)
@@ -579,7 +755,12 @@ class DecimalField(Field):
 
 
 class UUIDField(Field):
+    def get_native_formatted_value(self, value):
+        return value
+
     def __set__(self, instance, value, test: bool = False):
+        if value is not None and isinstance(value, bytes) and len(value) == 16:
+            value = uuid.UUID(bytes=value)
         if value is not None and isinstance(value, str):
             try:
                 value = uuid.UUID(value, version=self.version)
@@ -591,7 +772,7 @@ class UUIDField(Field):
 
     def __init__(self, serialized_name: Optional[str] = None,
                  null: bool = True,
-                 default_value: Optional[uuid.UUID] = None,
+                 default_value: Optional['uuid.UUID'] = None,
                  accepts_string: bool = False,
                  version: int = 4,
                  ):
@@ -634,23 +815,39 @@ F = TypeVar('F', bound=Field)
 
 
 # noinspection PyProtectedMember
+class _ListItemHolder:
+    # instance used to convert list items with the item field of a ListField
+    _dirty = None
+    _observers = None
+
+    def __init__(self):
+        self._data = {}
+
+
 class ListField(Field):
+    def get_json_formatted_value(self, value):
+        if value is None or not isinstance(self.item_type, Field):
+            return value
+        return [self.item_type.get_json_formatted_value(item) for item in value]
+
+    def get_native_formatted_value(self, value):
+        if value is None or not isinstance(self.item_type, Field):
+            return value
+        return [self.item_type.get_native_formatted_value(item) for item in value]
+
     def __set__(self, instance, value, test: bool = False):
         if value is not None and not isinstance(value, list):
             raise TypeError(instance, self.name, list, value)
         if value is None:
             value = []
         values = []
+        # converted item values are stored on a holder local to this call, fields are shared by all threads
+        holder = _ListItemHolder() if isinstance(self.item_type, Field) else None
         for item in value:
             assert item is not None, "Null item passed to ListField"
-            if isinstance(self.item_type, Field):
-                inst = JsonObject()
-                inst._data = {}
-                self.tmp = copy.deepcopy(self.item_type)
-                self.tmp.serialized_name = 'tmp'
-                self.tmp.__set__(instance=inst, value=item)
-                del self.tmp
-                values.append(inst._data['tmp'])
+            if holder is not None:
+                self.item_type.__set__(instance=holder, value=item)
+                values.append(holder._data[self.item_type.serialized_name])
             else:
                 assert isinstance(item, self.item_type), "ListField items must be of " + str(self.item_type) + \
                                                          ", found " + str(type(item))
@@ -741,6 +938,24 @@ class JsonObjectMeta(type):
             else:
                 setattr(new_class, field_name, field)
 
+        # ordered fields of the whole class hierarchy, base class fields first, overridden fields keep base position
+        hierarchy_fields = {}  # type: Dict[str, Field]
+        for base in bases:
+            for base_field in getattr(base, '_pykson_fields', ()):
+                hierarchy_fields.setdefault(base_field.name, base_field)
+        for field in attrs.values():
+            if isinstance(field, Field):
+                hierarchy_fields[field.name] = field
+        new_class._pykson_fields = tuple(hierarchy_fields.values())
+        # fields with values stored in _data, in the order of field value tuples used by pickles
+        new_class._pykson_data_fields = tuple(f for f in new_class._pykson_fields if not isinstance(f, FunctionField))
+        new_class._pykson_data_names = tuple(f.serialized_name for f in new_class._pykson_data_fields)
+        new_class._pykson_data_defaults = any(f.default_value is not None for f in new_class._pykson_data_fields)
+        new_class._pykson_fields_by_name = {f.name: f for f in new_class._pykson_fields}
+        # positions of field values which may be memoryviews, converted to bytes in field value tuples
+        new_class._pykson_view_indexes = tuple(i for i, f in enumerate(new_class._pykson_data_fields)
+                                               if isinstance(f, BytesField) and f.zero_copy)
+
         user_defined_init = new_class.__init__
 
         # noinspection PyUnusedLocal
@@ -781,8 +996,11 @@ class JsonObjectMeta(type):
                         type(instance_self)) + ")as Field. key:" + str(key) +
                                     " val:" + str(value) + " type(value):" + str(type(value)))
 
-                # if user_defined_init != JsonObject.__init__:
-                #     user_defined_init(instance_self)
+            # start tracking modified fields once the initial values are set
+            instance_self._dirty = set()
+
+            # if user_defined_init != JsonObject.__init__:
+            #     user_defined_init(instance_self)
 
         # if the user has not defined the default init, or the name is JsonObject, override the init
         if user_defined_init == object.__init__ or name == "JsonObject":
@@ -790,21 +1008,190 @@ class JsonObjectMeta(type):
         return new_class
 
 
-class JsonObject(six.with_metaclass(JsonObjectMeta, JsonSerializable)):
+class JsonObject(JsonSerializable, metaclass=JsonObjectMeta):
+    # callables notified with (object, field) after a field of this object is set, field is None for changes of
+    # nested objects. Observing an object also observes its ObjectField and ObjectListField children.
+    _observers = None  # type: Optional[List[Callable[[JsonObject, Optional[Field]], None]]]
+    # serialized names of fields set since initialization or the last Pykson.mark_clean call
+    _dirty = None  # type: Optional[Set[str]]
+    # encoded outputs cached by Pykson.enable_output_cache, cleared when this object or a nested object changes
+    _output_cache = None  # type: Optional[Dict[Any, Any]]
+    # digests computed by Pykson.content_hash, cleared when this object or a nested object changes
+    _content_hashes = None  # type: Optional[Dict[Any, str]]
+    # set on nested objects shared by copies or by decoded references, which from_json_into must not decode into
+    _shared = False
+
     # noinspection PyUnusedLocal
     def __init__(self, accept_unknown: bool = False, extra_attributes: Optional[List[str]] = None, *args, **kwargs):
         # Empty init will be replaced by meta class
         super(JsonObject, self).__init__()
 
+    @classmethod
+    def _from_serialized_data(cls, data: Dict[str, Any]) -> 'JsonObject':
+        # creates an object from field values keyed by serialized names without validating them, for decoders which
+        # convert and validate values themselves, e.g. the ones generated by PyksonGenerator
+        instance = cls.__new__(cls)
+        instance._data = data
+        instance.serialized_name = None
+        instance._dirty = set()
+        return instance
+
+    def _field_values(self) -> tuple:
+        cls = type(self)
+        if cls._pykson_data_defaults:
+            data = self._data
+            values = tuple([data.get(f.serialized_name, f.default_value) for f in cls._pykson_data_fields])
+        else:
+            values = tuple(map(self._data.get, cls._pykson_data_names))
+        if cls._pykson_view_indexes:
+            # memoryviews cannot be pickled and would alias buffers of the pickling process
+            values = list(values)
+            for i in cls._pykson_view_indexes:
+                if isinstance(values[i], memoryview):
+                    values[i] = values[i].tobytes()
+            values = tuple(values)
+        return values
+
+    def _extra_attributes(self) -> Optional[Dict[str, Any]]:
+        # attributes other than the ones of JsonObject itself, e.g. extra attributes of type hierarchies
+        if self.__dict__.keys() <= _JSON_OBJECT_ATTRIBUTES:
+            return None
+        return {k: v for k, v in self.__dict__.items() if k not in _JSON_OBJECT_ATTRIBUTES}
+
+    def __getstate__(self):
+        # pickled as a tuple of field values, with extra attributes if the object has any
+        values = self._field_values()
+        if self.__dict__.keys() <= _JSON_OBJECT_ATTRIBUTES:
+            return values
+        return [values, self._extra_attributes()]
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            # pickled before field value tuples were used
+            self.__dict__.update(state)
+            return
+        if isinstance(state, list):
+            state, extra_attributes = state
+            self.__dict__.update(extra_attributes)
+        self._data = dict(zip(type(self)._pykson_data_names, state))
+        self.serialized_name = None
+        self._dirty = set()
+
+    def copy(self) -> 'JsonObject':
+        # shallow copy, nested objects and lists are shared with this object. Copies do not inherit observers or
+        # cached outputs and start with no modified fields
+        instance = object.__new__(type(self))
+        state = self.__dict__.copy()
+        state.pop('_observers', None)
+        state.pop('_output_cache', None)
+        state.pop('_content_hashes', None)
+        state.pop('_shared', None)
+        state['_data'] = self._data.copy()
+        state['_dirty'] = set()
+        instance.__dict__.update(state)
+        for child in self._child_objects():
+            child._shared = True
+        for value in state.values():
+            if isinstance(value, JsonObject):
+                value._shared = True
+        return instance
+
+    def replace(self, **changes) -> 'JsonObject':
+        # copy with the given fields changed, only changed values are validated. Nested objects and lists which are
+        # not changed are shared, so they should be replaced instead of modified in place
+        fields_by_name = type(self)._pykson_fields_by_name
+        instance = self.copy()
+        for name, value in changes.items():
+            field = fields_by_name.get(name)
+            if field is None:
+                raise Exception('Field ' + str(name) + ' is not defined in class ' + str(type(self)))
+            if isinstance(field, FunctionField):
+                raise Exception(f'Cannot set value of a FunctionField, field name: {name}, value {value}')
+            field.__set__(instance, value)
+        instance._dirty = set()
+        return instance
+
+    def _child_objects(self) -> List['JsonObject']:
+        children = []
+        for field in type(self)._pykson_fields:
+            if isinstance(field, ObjectField):
+                child = self._data.get(field.serialized_name)
+                if child is not None:
+                    children.append(child)
+            elif isinstance(field, ObjectListField):
+                child_list = self._data.get(field.serialized_name)
+                if child_list is not None:
+                    children.extend(child_list)
+        return children
+
+    def _add_observer(self, observer: Callable[['JsonObject', Optional[Field]], None]):
+        if self._observers is None:
+            self._observers = [observer]
+            for child in self._child_objects():
+                child._add_observer(self._on_child_changed)
+        else:
+            self._observers.append(observer)
+
+    def _remove_observer(self, observer: Callable[['JsonObject', Optional[Field]], None]):
+        if self._observers is None or observer not in self._observers:
+            return
+        self._observers.remove(observer)
+        if len(self._observers) == 0:
+            self._observers = None
+            for child in self._child_objects():
+                child._remove_observer(self._on_child_changed)
+
+    # noinspection PyUnusedLocal
+    def _on_child_changed(self, child: 'JsonObject', field: Optional[Field]):
+        self._notify_observers(None)
+
+    def _notify_observers(self, field: Optional[Field]):
+        for observer in list(self._observers):
+            observer(self, field)
+
+    # noinspection PyUnusedLocal
+    @staticmethod
+    def _clear_output_cache(instance: 'JsonObject', field: Optional[Field]):
+        instance._output_cache.clear()
+
+    # noinspection PyUnusedLocal
+    @staticmethod
+    def _clear_content_hashes(instance: 'JsonObject', field: Optional[Field]):
+        instance._content_hashes.clear()
+
+    def _has_changes(self) -> bool:
+        if self._dirty:
+            return True
+        return any(child._has_changes() for child in self._child_objects())
+
 
 T = TypeVar('T', bound=JsonObject)
 
+_JSON_OBJECT_ATTRIBUTES = frozenset(['_data', 'serialized_name', '_dirty', '_observers', '_output_cache',
+                                     '_content_hashes', '_shared'])
+
+
+# noinspection PyProtectedMember
+def _unpickle_json_object(cls: Type[T], values: tuple) -> T:
+    instance = object.__new__(cls)
+    instance._data = dict(zip(cls._pykson_data_names, values))
+    instance.serialized_name = None
+    instance._dirty = set()
+    return instance
+
 
 class ObjectField(Field):
+    # noinspection PyProtectedMember
     def __set__(self, instance, value, test: bool = False):
         if value is not None and not isinstance(value, self.item_type):
             raise TypeError(instance, self.name, self.item_type, value)
+        old_value = instance._data.get(self.serialized_name) if test is False and instance is not None else None
         super().__set__(instance, value, test)
+        if test is False and instance._observers is not None:
+            if old_value is not None:
+                old_value._remove_observer(instance._on_child_changed)
+            if value is not None:
+                value._add_observer(instance._on_child_changed)
 
     def __init__(self, item_type: Type[T], serialized_name: Optional[str] = None, null: bool = True):
         super(ObjectField, self).__init__(field_type=FieldType.LIST, serialized_name=serialized_name, null=null)
@@ -826,13 +1213,204 @@ class ObjectListField(Field, List[T], Generic[T]):
                 assert item is not None, "Null item passed to ObjectListField"
                 assert isinstance(item, self.item_type), "ObjectListField items must be of " + str(
                     self.item_type) + ", found " + str(type(item))
+        old_value = instance._data.get(self.serialized_name) if test is False and instance is not None else None
         super(ObjectListField, self).__set__(instance, value, test)
+        if test is False and instance._observers is not None:
+            for item in old_value or []:
+                item._remove_observer(instance._on_child_changed)
+            for item in value or []:
+                item._add_observer(instance._on_child_changed)
 
     def __init__(self, item_type: Type[T], serialized_name: Optional[str] = None, null: bool = True):
         super(ObjectListField, self).__init__(field_type=FieldType.LIST, serialized_name=serialized_name, null=null)
         self.item_type = item_type
 
 
+class JsonObjectCollection(Generic[T]):
+    def __init__(self, items: Optional[Iterable[T]] = None, index_fields: Optional[List[str]] = None):
+        self._items = {}  # type: Dict[int, T]
+        self._indexes = {}  # type: Dict[str, Dict[Any, Dict[int, T]]]
+        self._item_keys = {}  # type: Dict[int, Dict[str, Any]]
+        # (class, path) pairs checked by _check_path
+        self._checked_paths = set()  # type: Set[Tuple[type, str]]
+        for path in index_fields or []:
+            self.add_index(path)
+        if items is not None:
+            self.extend(items)
+
+    def _check_path(self, cls: type, path: str):
+        # paths are attribute names of fields, joined by dots through ObjectFields and ending at a field with hashable
+        # values, checked before anything is indexed so failures leave the collection unchanged
+        if (cls, path) in self._checked_paths:
+            return
+        value_class = cls
+        names = path.split('.')
+        for i, name in enumerate(names):
+            field = getattr(value_class, '_pykson_fields_by_name', {}).get(name)
+            if field is None:
+                child = getattr(value_class, name, None)
+                if not isinstance(child, JsonObject):
+                    raise Exception('Index path ' + path + ': ' + name + ' is not a field of ' + str(value_class))
+                value_class = type(child)
+            elif i < len(names) - 1:
+                if not isinstance(field, ObjectField):
+                    raise Exception('Index path ' + path + ': ' + name + ' of ' + str(value_class) +
+                                    ' is not an ObjectField, paths cannot go through lists or values')
+                value_class = field.item_type
+            elif isinstance(field, (JsonField, ByteArrayField)) or \
+                    (isinstance(field, BytesField) and field.zero_copy) or \
+                    (isinstance(field, ListField) and (isinstance(field.item_type, (JsonField, ByteArrayField)) or
+                                                       field.item_type in (dict, list, bytearray))):
+                raise Exception('Index path ' + path + ': values of ' + name + ' of ' + str(value_class) +
+                                ' are not hashable')
+        self._checked_paths.add((cls, path))
+
+    @staticmethod
+    def _get_path_value(item: JsonObject, path: str) -> Any:
+        value = item
+        for attribute_name in path.split('.'):
+            if value is None:
+                return None
+            value = getattr(value, attribute_name)
+        if isinstance(value, list):
+            return tuple(value)
+        return value
+
+    def _index_item(self, item: T, path: str):
+        key = JsonObjectCollection._get_path_value(item, path)
+        self._indexes[path].setdefault(key, {})[id(item)] = item
+        self._item_keys[id(item)][path] = key
+
+    def _unindex_item(self, item: T, path: str):
+        key = self._item_keys[id(item)].pop(path)
+        bucket = self._indexes[path][key]
+        del bucket[id(item)]
+        if len(bucket) == 0:
+            del self._indexes[path][key]
+
+    def _on_item_changed(self, item: T, field: Optional[Field]):
+        for path in self._indexes.keys():
+            if field is None:
+                if '.' not in path:
+                    continue
+            elif path.split('.', 1)[0] != field.name:
+                continue
+            if JsonObjectCollection._get_path_value(item, path) != self._item_keys[id(item)][path]:
+                self._unindex_item(item, path)
+                self._index_item(item, path)
+
+    def add_index(self, path: str):
+        if path in self._indexes:
+            return
+        for item in self._items.values():
+            self._check_path(type(item), path)
+        # built aside and installed once every item is indexed
+        index = {}  # type: Dict[Any, Dict[int, T]]
+        keys = {}  # type: Dict[int, Any]
+        for item_id, item in self._items.items():
+            key = keys[item_id] = JsonObjectCollection._get_path_value(item, path)
+            index.setdefault(key, {})[item_id] = item
+        self._indexes[path] = index
+        for item_id, key in keys.items():
+            self._item_keys[item_id][path] = key
+
+    def drop_index(self, path: str):
+        del self._indexes[path]
+        for item_keys in self._item_keys.values():
+            item_keys.pop(path, None)
+
+    def add(self, item: T):
+        assert isinstance(item, JsonObject), 'JsonObjectCollection items must be JsonObjects, found ' + str(type(item))
+        if id(item) in self._items:
+            return
+        for path in self._indexes.keys():
+            self._check_path(type(item), path)
+        keys = {path: JsonObjectCollection._get_path_value(item, path) for path in self._indexes.keys()}
+        self._items[id(item)] = item
+        self._item_keys[id(item)] = keys
+        for path, key in keys.items():
+            self._indexes[path].setdefault(key, {})[id(item)] = item
+        item._add_observer(self._on_item_changed)
+
+    def extend(self, items: Iterable[T]):
+        for item in items:
+            self.add(item)
+
+    def remove(self, item: T):
+        if id(item) not in self._items:
+            raise ValueError('Item is not in collection')
+        item._remove_observer(self._on_item_changed)
+        for path in self._indexes.keys():
+            self._unindex_item(item, path)
+        del self._item_keys[id(item)]
+        del self._items[id(item)]
+
+    def clear(self):
+        for item in list(self._items.values()):
+            self.remove(item)
+
+    def get(self, path: str, value: Any, default: Optional[T] = None) -> Optional[T]:
+        bucket = self._indexes[path].get(value)
+        if not bucket:
+            return default
+        return next(iter(bucket.values()))
+
+    def get_all(self, path: str, value: Any) -> List[T]:
+        return list(self._indexes[path].get(value, {}).values())
+
+    def group_by(self, path: str) -> Dict[Any, List[T]]:
+        return {key: list(bucket.values()) for key, bucket in self._indexes[path].items()}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(list(self._items.values()))
+
+    def __contains__(self, item) -> bool:
+        return id(item) in self._items
+
+
+class JsonObjectPool(Generic[T]):
+    # objects of a class kept for reuse by Pykson.from_json_pooled, for loops which decode objects and discard them.
+    # Nested objects and lists of a released object are reused with it, so nothing may keep references to them
+    def __init__(self, cls: Type[T], max_size: int = 1000):
+        assert issubclass(cls, JsonObject), 'cls must be subclass of JsonObject'
+        self.cls = cls
+        self.max_size = max_size
+        self._items = []  # type: List[T]
+        # ids of the pooled objects, an object released twice would be handed out twice
+        self._item_ids = set()  # type: Set[int]
+
+    def acquire(self) -> Optional[T]:
+        try:
+            item = self._items.pop()
+        except IndexError:
+            return None
+        self._item_ids.discard(id(item))
+        return item
+
+    # noinspection PyProtectedMember
+    def release(self, item: Union[T, List[T]]):
+        if isinstance(item, list):
+            for list_item in item:
+                self.release(list_item)
+            return
+        assert isinstance(item, self.cls), 'JsonObjectPool items must be of ' + str(self.cls) + ', found ' + str(
+            type(item))
+        if len(self._items) >= self.max_size or id(item) in self._item_ids:
+            return
+        for observer in list(item._observers or ()):
+            item._remove_observer(observer)
+        item.__dict__.pop('_output_cache', None)
+        item.__dict__.pop('_content_hashes', None)
+        self._items.append(item)
+        self._item_ids.add(id(item))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
 class TypeHierarchyAdapter:
     def __init__(self,
                  base_class: Type[T],
@@ -853,12 +1431,113 @@ class PyksonEncoder(json.JSONEncoder):
             return str(obj)
         elif isinstance(obj, uuid.UUID):
             return str(obj)
+        elif isinstance(obj, (bytes, bytearray, memoryview)):
+            return _encode_binary(obj, 'base64')
         # 👇️ otherwise use the default behavior
         return json.JSONEncoder.default(self, obj)
 
 
+def _copy_json_value(value: Any) -> Any:
+    # copy of the dicts and lists of an encoded value, other values are immutable or not changed by encoding
+    if isinstance(value, dict):
+        return {k: _copy_json_value(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [_copy_json_value(v) for v in value]
+    return value
+
+
+def _iter_cursor_rows(cursor, batch_size: int) -> Iterator[Sequence[Any]]:
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        yield from batch
+
+
+def _canonical_value(value: Any) -> Any:
+    # values of Pykson._to_json in native mode converted to one representation for each value
+    if isinstance(value, dict):
+        return {str(k): _canonical_value(v) for k, v in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return [_canonical_value(v) for v in value]
+    elif isinstance(value, bool) or value is None or isinstance(value, (int, str)):
+        return value
+    elif isinstance(value, float):
+        if value != value or value in (float('inf'), float('-inf')):
+            raise ValueError('Cannot encode ' + str(value) + ' in canonical json')
+        if value.is_integer() and abs(value) < 2 ** 53:
+            return int(value)
+        return value
+    elif isinstance(value, decimal.Decimal):
+        if not value.is_finite():
+            raise ValueError('Cannot encode ' + str(value) + ' in canonical json')
+        return format(value.normalize(), 'f')
+    elif isinstance(value, datetime.datetime):
+        if value.tzinfo is not None and value.tzinfo.utcoffset(value) is not None:
+            return value.astimezone(datetime.timezone.utc).replace(tzinfo=None).isoformat() + 'Z'
+        return value.isoformat()
+    elif isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        return _encode_binary(value, 'base64')
+    elif isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+class _SharedReferences:
+    # objects found more than once in a graph encoded with references, and the ids of the ones already written
+    def __init__(self, item: Union[JsonObject, List[JsonObject]]):
+        self.shared = set()  # type: Set[int]
+        self.ids = {}  # type: Dict[int, int]
+        self._find_shared(item, set(), set())
+
+    def _find_shared(self, value: Any, seen: Set[int], path: Set[int]):
+        if isinstance(value, list):
+            for list_item in value:
+                self._find_shared(list_item, seen, path)
+            return
+        if not isinstance(value, JsonObject):
+            return
+        if id(value) in path:
+            raise Exception('Reference cycle found at object of ' + str(type(value)) + ', cycles cannot be encoded')
+        if id(value) in seen:
+            self.shared.add(id(value))
+            return
+        seen.add(id(value))
+        path.add(id(value))
+        for field_value in value._data.values():
+            self._find_shared(field_value, seen, path)
+        for attribute_value in (value._extra_attributes() or {}).values():
+            self._find_shared(attribute_value, seen, path)
+        path.remove(id(value))
+
+
+def _iter_json_chunks(value, chunk_size: int) -> Iterator[str]:
+    # json text of values produced by Pykson._to_json in stream mode, formatted like json.dumps
+    if isinstance(value, _StreamedBinary):
+        yield from value.iter_json_chunks(chunk_size)
+    elif isinstance(value, dict):
+        yield '{'
+        for i, (key, item_value) in enumerate(value.items()):
+            yield (', ' if i > 0 else '') + json.dumps(str(key)) + ': '
+            yield from _iter_json_chunks(item_value, chunk_size)
+        yield '}'
+    elif isinstance(value, (list, tuple)):
+        yield '['
+        for i, item_value in enumerate(value):
+            if i > 0:
+                yield ', '
+            yield from _iter_json_chunks(item_value, chunk_size)
+        yield ']'
+    else:
+        yield json.dumps(value, cls=PyksonEncoder)
+
+
 # noinspection DuplicatedCode
 class Pykson:
+    MSGPACK_DECIMAL_EXT_TYPE = 1
+
     @staticmethod
     def __get_fields_mapped_by_names(cls) -> Dict[str, Field]:
         result_dict = {}
@@ -949,7 +1628,8 @@ class Pykson:
         return list_items
 
     @staticmethod
-    def __get_field_and_child_values_as_dict(json_object, serialized_keys_based: bool) -> Dict[str, Any]:
+    def __get_field_and_child_values_as_dict(json_object, serialized_keys_based: bool,
+                                             native: bool = False, stream: bool = False) -> Dict[str, Any]:
         fields_dict = {}
         type_dicts = type(json_object).__dict__
         for n, field in type_dicts.items():
@@ -958,7 +1638,9 @@ class Pykson:
                 field_serialized_name = field.serialized_name
                 field_value = json_object.__getattribute__(field_name)
                 fields_dict[field_serialized_name if serialized_keys_based else field_name] = \
-                    field.get_json_formatted_value(field_value)
+                    field.get_native_formatted_value(field_value) if native \
+                    else field.get_stream_formatted_value(field_value) if stream \
+                    else field.get_json_formatted_value(field_value)
             elif isinstance(field, JsonObject):
                 field_name = n
                 field_serialized_name = n
@@ -979,7 +1661,9 @@ class Pykson:
                     field_name = field.name
                     field_serialized_name = field.serialized_name
                     field_value = json_object.__getattribute__(field_name)
-                    fields_dict[field_serialized_name] = field.get_json_formatted_value(field_value)
+                    fields_dict[field_serialized_name] = field.get_native_formatted_value(field_value) if native \
+                        else field.get_stream_formatted_value(field_value) if stream \
+                        else field.get_json_formatted_value(field_value)
                 elif isinstance(field, JsonObject):
                     field_name = n
                     field_serialized_name = n
@@ -988,17 +1672,26 @@ class Pykson:
 
         return fields_dict
 
-    def __init__(self):
+    def __init__(self, intern_table_size: int = 100000):
         self.type_hierarchy_adapters = []  # type: List[TypeHierarchyAdapter]
+        # shared instances of string values decoded with intern_strings, bounded to intern_table_size values
+        self.intern_table = {}  # type: Dict[str, str]
+        self.intern_table_size = intern_table_size
+
+    def _intern(self, value: str) -> str:
+        interned = self.intern_table.get(value)
+        if interned is not None:
+            return interned
+        if len(self.intern_table) < self.intern_table_size:
+            self.intern_table[value] = value
+        return value
 
     def register_type_hierarchy_adapter(self, type_hierarchy_adapter: TypeHierarchyAdapter):
         self.type_hierarchy_adapters.append(type_hierarchy_adapter)
 
-    # noinspection PyCallingNonCallable
-    def _from_json_dict(self, data: Dict, cls: Type[T], accept_unknown: bool = False) -> T:
+    def _get_sub_type(self, data: Dict, cls: Type[T]) -> Tuple[Type[T], List[str]]:
         sub_type = cls
         extra_attributes = []  # type: List[str]
-
         for type_hierarchy_adapter in self.type_hierarchy_adapters:
             # if type_hierarchy_adapter.base_class == cls:
             if (type_hierarchy_adapter.accept_sub_type is True and issubclass(cls, type_hierarchy_adapter.base_class)) \
@@ -1012,6 +1705,26 @@ class Pykson:
                     raise Exception('No sub-type provided in type hierarchy adapter for base class of ' + str(
                         cls) + ' for sub-type key ' + str(subtype_key))
                 extra_attributes.append(type_hierarchy_adapter.type_key)
+        return sub_type, extra_attributes
+
+    # noinspection PyCallingNonCallable
+    def _from_json_dict(self, data: Dict, cls: Type[T], accept_unknown: bool = False,
+                        intern_strings: bool = False, references: Optional[Dict[Any, JsonObject]] = None) -> T:
+        reference_id = None
+        if references is not None:
+            # objects written once with $id and referenced with $ref by to_json(references=True)
+            if '$ref' in data:
+                referenced = references.get(data['$ref'])
+                if referenced is None:
+                    raise Exception('Reference ' + str(data['$ref']) + ' found before the object it refers to')
+                if not isinstance(referenced, cls):
+                    raise Exception('Reference ' + str(data['$ref']) + ' refers to an object of ' +
+                                    str(type(referenced)) + ', expected ' + str(cls))
+                return referenced
+            reference_id = data.get('$id')
+            if reference_id is not None:
+                data = {k: v for k, v in data.items() if k != '$id'}
+        sub_type, extra_attributes = self._get_sub_type(data, cls)
 
         children_mapped_by_serialized_names = Pykson.__get_children_mapped_by_serialized_names(sub_type)
         fields_mapped_by_serialized_names = Pykson.__get_fields_mapped_by_serialized_names(sub_type)
@@ -1024,8 +1737,8 @@ class Pykson:
                 for data_value_item in data_value:
                     # noinspection PyUnresolvedReferences
                     data_list_value.append(
-                        self.from_json(data_value_item, fields_mapped_by_serialized_names[data_key].item_type,
-                                       accept_unknown=accept_unknown)
+                        self._from_json(data_value_item, fields_mapped_by_serialized_names[data_key].item_type,
+                                        accept_unknown, intern_strings, references)
                     )
                 data_copy[field_names_mapped_by_serialized_names[data_key]] = data_list_value
             # elif isinstance(data_value, list) and (data_key in fields_mapped_by_serialized_names.keys()) and \
@@ -1037,28 +1750,42 @@ class Pykson:
             #         else:
             #             data_copy[data_key] = data_value
             elif data_key in children_mapped_by_serialized_names.keys() and isinstance(data_value, dict):
-                data_copy[data_key] = self.from_json(data_value, type(children_mapped_by_serialized_names[data_key]),
-                                                     accept_unknown=accept_unknown)
+                data_copy[data_key] = self._from_json(data_value, type(children_mapped_by_serialized_names[data_key]),
+                                                      accept_unknown, intern_strings, references)
             elif data_key in fields_mapped_by_serialized_names.keys() and isinstance(
                     fields_mapped_by_serialized_names[data_key], ObjectField):
                 # noinspection PyUnresolvedReferences
                 data_copy[field_names_mapped_by_serialized_names[data_key]] = \
-                    self.from_json(data_value,
-                                   fields_mapped_by_serialized_names[data_key].item_type,
-                                   accept_unknown=accept_unknown)
+                    self._from_json(data_value,
+                                    fields_mapped_by_serialized_names[data_key].item_type,
+                                    accept_unknown,
+                                    intern_strings,
+                                    references)
             else:
+                if intern_strings and data_value is not None:
+                    data_field = fields_mapped_by_serialized_names.get(data_key)
+                    if isinstance(data_field, StringField) and isinstance(data_value, str):
+                        data_value = self._intern(data_value)
+                    elif isinstance(data_field, ListField) and data_field.item_type is str and \
+                            isinstance(data_value, list):
+                        data_value = [self._intern(v) if isinstance(v, str) else v for v in data_value]
                 if data_key in field_names_mapped_by_serialized_names.keys():
                     data_copy[field_names_mapped_by_serialized_names[data_key]] = data_value
                 else:
                     data_copy[data_key] = data_value
-        return sub_type(accept_unknown=accept_unknown, extra_attributes=extra_attributes, **data_copy)
+        result = sub_type(accept_unknown=accept_unknown, extra_attributes=extra_attributes, **data_copy)
+        if reference_id is not None:
+            references[reference_id] = result
+            result._shared = True
+        return result
 
     # noinspection PyCallingNonCallable
-    def _from_json_list(self, data: List, cls: Type[T], accept_unknown: bool = False) -> List[T]:
+    def _from_json_list(self, data: List, cls: Type[T], accept_unknown: bool = False,
+                        intern_strings: bool = False, references: Optional[Dict[Any, JsonObject]] = None) -> List[T]:
         list_result = []  # type: List[T]
         for data_value_item in data:
             # noinspection PyUnresolvedReferences
-            list_result.append(self.from_json(data_value_item, cls, accept_unknown))
+            list_result.append(self._from_json(data_value_item, cls, accept_unknown, intern_strings, references))
         return list_result
 
     def from_csv(self, data: str, cls: Type[T], line_separator: str = '\n', first_row_as_field_names: bool = True,
@@ -1074,21 +1801,266 @@ class Pykson:
         rows = [r for r in reader_list]
         return self._from_json_list(rows, cls=cls, accept_unknown=accept_unknown)
 
-    def from_json(self, data: Union[str, Dict, List], cls: Type[T], accept_unknown: bool = False
-                  ) -> Optional[Union[T, List[T]]]:
+    def from_csv_file(self, path_or_file, cls: Type[T], first_row_as_field_names: bool = True,
+                      accept_unknown: bool = False, compression: Optional[str] = 'auto',
+                      buffer_size: int = 1 << 16) -> List[T]:
+        # like from_csv for a path or file object, compressed files are decompressed while they are read, see
+        # pykson.compression.open_file
+        from pykson.compression import open_file
+        with open_file(path_or_file, 'r', compression, buffer_size) as f:
+            if first_row_as_field_names:
+                reader_list = csv.DictReader(f)
+            else:
+                field_names = Pykson.__get_fields_mapped_by_serialized_names(cls=cls).keys()
+                reader_list = csv.DictReader(f, fieldnames=field_names)
+            return self._from_json_list(list(reader_list), cls=cls, accept_unknown=accept_unknown)
+
+    def _row_column_decoder(self, field: Field, accept_unknown: bool, intern_strings: bool
+                            ) -> Optional[Callable[[Any], Any]]:
+        # nested objects and lists come from database rows as json text or as decoded dicts and lists
+        if isinstance(field, (ObjectField, ObjectListField)):
+            item_type = field.item_type
+
+            def decode_object(value):
+                if isinstance(value, (str, bytes)):
+                    value = json.loads(value)
+                if isinstance(value, (dict, list)):
+                    return self._from_json(value, item_type, accept_unknown, intern_strings, None)
+                return value
+            return decode_object
+        elif isinstance(field, ListField):
+            def decode_list(value):
+                return json.loads(value) if isinstance(value, (str, bytes)) else value
+            return decode_list
+        elif intern_strings and isinstance(field, StringField):
+            def intern_string(value):
+                return self._intern(value) if isinstance(value, str) else value
+            return intern_string
+        return None
+
+    def _iter_rows(self, rows: Iterable[Sequence[Any]], cls: Type[T], columns: Optional[Sequence[str]],
+                   accept_unknown: bool, intern_strings: bool,
+                   column_decoders: Optional[Dict[str, Callable[[Any], Any]]] = None) -> Iterator[T]:
+        # column_decoders convert non null values of the named columns before they are set, e.g. values of the
+        # storage types of pykson.sqlite
+        assert issubclass(cls, JsonObject), 'cls must be subclass of JsonObject'
+        assert cls != JsonObject, 'Cannot convert to JsonObject'
+        for type_hierarchy_adapter in self.type_hierarchy_adapters:
+            if type_hierarchy_adapter.base_class == cls or (type_hierarchy_adapter.accept_sub_type is True and
+                                                            issubclass(cls, type_hierarchy_adapter.base_class)):
+                raise Exception('Cannot decode rows to ' + str(cls) + ' which has a type hierarchy adapter, decode '
+                                'rows of each sub-type to its own class')
+        if columns is None:
+            columns = cls._pykson_data_names
+        fields_mapped_by_serialized_names = Pykson.__get_fields_mapped_by_serialized_names(cls)
+        # column positions are mapped to fields once, rows are then set positionally without building dicts
+        plan = []  # type: List[Tuple[int, Callable, Optional[Callable[[Any], Any]]]]
+        column_fields = set()  # type: Set[str]
+        for index, column in enumerate(columns):
+            field = fields_mapped_by_serialized_names.get(column)
+            if field is None:
+                field = cls._pykson_fields_by_name.get(column)
+            if field is None:
+                if accept_unknown:
+                    continue
+                raise Exception('Column ' + str(column) + ' is not a field of ' + str(cls))
+            if isinstance(field, FunctionField):
+                raise Exception(f'Cannot set value of a FunctionField, field name: {field.name}, column {column}')
+            if field.serialized_name in column_fields:
+                raise Exception('Duplicate columns for field ' + str(field.name) + ' of ' + str(cls))
+            column_fields.add(field.serialized_name)
+            decode = self._row_column_decoder(field, accept_unknown, intern_strings)
+            column_decode = column_decoders.get(column) if column_decoders is not None else None
+            if column_decode is not None:
+                decode = column_decode if decode is None else \
+                    (lambda value, first=column_decode, second=decode: second(first(value)))
+            plan.append((index, field.__set__, decode))
+        # fields without columns get their default values as in from_json, set through the fields once (raising for
+        # not nullable fields without defaults), mutable results like the empty lists of list fields are set per row
+        defaults = object.__new__(cls)
+        defaults._data = {}
+        defaults.serialized_name = None
+        missing_defaults = []  # type: List[Field]
+        for field in cls._pykson_data_fields:
+            if field.serialized_name not in column_fields:
+                field.__set__(defaults, field.default_value)
+                if isinstance(defaults._data[field.serialized_name], (list, dict, bytearray, JsonObject)):
+                    missing_defaults.append(field)
+        missing_data = defaults._data
+        new_object = object.__new__
+        for row in rows:
+            # objects are built like unpickled ones, fields are set through their descriptors so values are
+            # converted and validated as in from_json
+            instance = new_object(cls)
+            instance._data = missing_data.copy()
+            instance.serialized_name = None
+            for index, set_value, decode in plan:
+                value = row[index]
+                if decode is not None and value is not None:
+                    value = decode(value)
+                set_value(instance, value)
+            for field in missing_defaults:
+                field.__set__(instance, field.default_value)
+            instance._dirty = set()
+            yield instance
+
+    def from_rows(self, rows: Iterable[Sequence[Any]], cls: Type[T], columns: Optional[Sequence[str]] = None,
+                  accept_unknown: bool = False, intern_strings: bool = False) -> List[T]:
+        # objects from tuples or other sequences of values, e.g. rows of a database query. columns are the serialized
+        # names or attribute names of the values in each row, the data fields of cls in definition order by default.
+        # Nested objects and lists may be given as json text. Unknown columns are ignored with accept_unknown
+        return list(self._iter_rows(rows, cls, columns, accept_unknown, intern_strings))
+
+    def from_cursor(self, cursor, cls: Type[T], batch_size: int = 1000, columns: Optional[Sequence[str]] = None,
+                    accept_unknown: bool = False, intern_strings: bool = False) -> Iterator[T]:
+        # yields objects from the remaining rows of a DB-API cursor, fetching batch_size rows at a time. columns are
+        # taken from cursor.description by default
+        if columns is None:
+            assert cursor.description is not None, 'cursor has no result columns, execute a query first'
+            columns = [description[0] for description in cursor.description]
+        return self._iter_rows(_iter_cursor_rows(cursor, batch_size), cls, columns, accept_unknown, intern_strings)
+
+    def load_json(self, path_or_file, cls: Type[T], accept_unknown: bool = False, intern_strings: bool = False,
+                  references: bool = False, compression: Optional[str] = 'auto',
+                  buffer_size: int = 1 << 16) -> Optional[Union[T, List[T]]]:
+        from pykson.compression import open_file
+        with open_file(path_or_file, 'r', compression, buffer_size) as f:
+            data = json.load(f)
+        return self.from_json(data, cls, accept_unknown, intern_strings, references)
+
+    def iter_ndjson(self, path_or_file, cls: Type[T], accept_unknown: bool = False, intern_strings: bool = False,
+                    compression: Optional[str] = 'auto', buffer_size: int = 1 << 16) -> Iterator[T]:
+        # decodes a newline delimited json file one line at a time
+        from pykson.compression import open_file
+        with open_file(path_or_file, 'r', compression, buffer_size) as f:
+            for line in f:
+                if line.strip():
+                    yield self.from_json(json.loads(line), cls, accept_unknown, intern_strings)
+
+    def dump_json(self, item: Union[T, List[T]], path_or_file, indent: Optional[int] = None,
+                  compression: Optional[str] = 'auto', buffer_size: int = 1 << 16,
+                  compression_level: Optional[int] = None):
+        # writes json to a path or file object, compressed by the extension of the path (.gz, .bz2, .xz, .zst) or by
+        # compression
+        from pykson.compression import open_file
+        with open_file(path_or_file, 'w', compression, buffer_size, compression_level=compression_level) as f:
+            if indent is None:
+                self.write_json(item, f)
+            else:
+                f.write(self.to_json(item, indent=indent))
+
+    def write_ndjson(self, items: Iterable[T], path_or_file, compression: Optional[str] = 'auto',
+                     buffer_size: int = 1 << 16, compression_level: Optional[int] = None):
+        from pykson.compression import open_file
+        with open_file(path_or_file, 'w', compression, buffer_size, compression_level=compression_level) as f:
+            for item in items:
+                f.write(self.to_json(item))
+                f.write('\n')
+
+    def _from_json(self, data: Union[str, Dict, List], cls: Type[T], accept_unknown: bool, intern_strings: bool,
+                   references: Optional[Dict[Any, JsonObject]]) -> Optional[Union[T, List[T]]]:
         assert issubclass(cls, JsonObject), 'cls must be subclass of JsonObject'
         assert cls != JsonObject, 'Cannot convert to JsonObject'
         if isinstance(data, str):
             data = json.loads(data)
         if isinstance(data, dict):
-            return self._from_json_dict(data, cls, accept_unknown)
+            return self._from_json_dict(data, cls, accept_unknown, intern_strings, references)
         elif isinstance(data, list):
-            return self._from_json_list(data, cls, accept_unknown)
+            return self._from_json_list(data, cls, accept_unknown, intern_strings, references)
         elif isinstance(data, type(None)):
             return None
         else:
             raise Exception('Unable to parse data of type ' + str(type(data)))
 
+    def from_json(self, data: Union[str, Dict, List], cls: Type[T], accept_unknown: bool = False,
+                  intern_strings: bool = False, references: bool = False) -> Optional[Union[T, List[T]]]:
+        # with references, objects written once by to_json(references=True) and referenced elsewhere are decoded to
+        # one shared object
+        return self._from_json(data, cls, accept_unknown, intern_strings, {} if references else None)
+
+    def _decode_or_reuse(self, current: Optional[JsonObject], data: Any, cls: Type[T], accept_unknown: bool,
+                         intern_strings: bool) -> Optional[T]:
+        # decodes into current if it is an object of the type data decodes to and is not shared with other objects,
+        # otherwise into a new object
+        if current is not None and not current._shared and isinstance(data, dict):
+            sub_type, extra_attributes = self._get_sub_type(data, cls)
+            if type(current) is sub_type:
+                self._from_json_into(current, data, extra_attributes, accept_unknown, intern_strings)
+                return current
+        return self.from_json(data, cls, accept_unknown=accept_unknown, intern_strings=intern_strings)
+
+    # noinspection PyProtectedMember
+    def _from_json_into(self, item: T, data: Dict, extra_attributes: List[str], accept_unknown: bool,
+                        intern_strings: bool):
+        cls = type(item)
+        fields_mapped_by_serialized_names = Pykson.__get_fields_mapped_by_serialized_names(cls)
+        children_mapped_by_serialized_names = Pykson.__get_children_mapped_by_serialized_names(cls)
+        for data_key, data_value in data.items():
+            field = fields_mapped_by_serialized_names.get(data_key)
+            if isinstance(field, ObjectField):
+                field.__set__(item, self._decode_or_reuse(item._data.get(field.serialized_name), data_value,
+                                                          field.item_type, accept_unknown, intern_strings))
+            elif isinstance(field, ObjectListField) and isinstance(data_value, list):
+                current = item._data.get(field.serialized_name)
+                if current is None:
+                    field.__set__(item, [self.from_json(v, field.item_type, accept_unknown=accept_unknown,
+                                                        intern_strings=intern_strings) for v in data_value])
+                    continue
+                # a new list is set, the current one may be shared with copies of item
+                field.__set__(item, [self._decode_or_reuse(current[i] if i < len(current) else None, v,
+                                                           field.item_type, accept_unknown, intern_strings)
+                                     for i, v in enumerate(data_value)])
+            elif isinstance(field, FunctionField):
+                raise Exception(f'Cannot set value of a FunctionField, field name: {field.name}, value {data_value}')
+            elif field is not None:
+                if intern_strings and data_value is not None:
+                    if isinstance(field, StringField) and isinstance(data_value, str):
+                        data_value = self._intern(data_value)
+                    elif isinstance(field, ListField) and field.item_type is str and isinstance(data_value, list):
+                        data_value = [self._intern(v) if isinstance(v, str) else v for v in data_value]
+                field.__set__(item, data_value)
+            elif data_key in extra_attributes:
+                setattr(item, data_key, data_value)
+            elif data_key in children_mapped_by_serialized_names.keys():
+                setattr(item, data_key, self._decode_or_reuse(
+                    item.__dict__.get(data_key), data_value, type(children_mapped_by_serialized_names[data_key]),
+                    accept_unknown, intern_strings))
+            elif not accept_unknown:
+                raise Exception('value given in json but was not defined in model class (' + str(cls) +
+                                ') as Field. key:' + str(data_key) + ' val:' + str(data_value))
+        # fields missing from data get their default values, as in objects created by from_json
+        for field in fields_mapped_by_serialized_names.values():
+            if field.serialized_name not in data and not isinstance(field, FunctionField):
+                field.__set__(item, field.default_value)
+        for data_key in children_mapped_by_serialized_names.keys():
+            if data_key not in data:
+                setattr(item, data_key, None)
+        item._dirty = set()
+
+    def from_json_into(self, item: T, data: Union[str, Dict], accept_unknown: bool = False,
+                       intern_strings: bool = False) -> T:
+        # updates item in place to the state from_json would decode data to. Nested objects and lists of objects are
+        # reused where their types match the data, instead of being allocated again
+        assert isinstance(item, JsonObject), 'item must be a JsonObject, found ' + str(type(item))
+        if isinstance(data, str):
+            data = json.loads(data)
+        if not isinstance(data, dict):
+            raise Exception('Unable to decode data of type ' + str(type(data)) + ' into an object')
+        sub_type, extra_attributes = self._get_sub_type(data, type(item))
+        if sub_type is not type(item):
+            raise Exception('Cannot decode data of type ' + str(sub_type) + ' into object of type ' + str(type(item)))
+        self._from_json_into(item, data, extra_attributes, accept_unknown, intern_strings)
+        return item
+
+    def from_json_pooled(self, data: Union[str, Dict, List], pool: 'JsonObjectPool[T]', accept_unknown: bool = False,
+                         intern_strings: bool = False) -> Optional[Union[T, List[T]]]:
+        # like from_json, decoding into objects released to pool when it has any
+        if isinstance(data, str):
+            data = json.loads(data)
+        if isinstance(data, list):
+            return [self.from_json_pooled(data_item, pool, accept_unknown, intern_strings) for data_item in data]
+        return self._decode_or_reuse(pool.acquire(), data, pool.cls, accept_unknown, intern_strings)
+
     # def __item_to_dict(self, item: T) -> Dict[str, Any]:
     #     fields_dict = Pykson.__get_field_and_child_values_as_dict(item)
     #     final_dict = {}
@@ -1109,16 +2081,32 @@ class Pykson:
     #             final_dict[field_key] = field_value
     #     return final_dict
 
-    def _to_json(self, item: Union[T, List[T]], serialized_keys_based: bool = True) -> \
-            Union[Dict[str, Any], List[Dict[str, Any]]]:
+    def _to_json(self, item: Union[T, List[T]], serialized_keys_based: bool = True, native: bool = False,
+                 stream: bool = False, references: Optional['_SharedReferences'] = None,
+                 copy_cached: bool = False) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        # cached dicts are returned as they are unless copy_cached is set, callers returning dicts to users set it so
+        # that changes of the returned dicts cannot change the caches
         if isinstance(item, list):
             final_list = []
             for i in item:
-                final_list.append(self._to_json(i))
+                final_list.append(self._to_json(i, serialized_keys_based, native, stream, references, copy_cached))
             return final_list
         else:
-            fields_dict = Pykson.__get_field_and_child_values_as_dict(item, serialized_keys_based)
+            if references is not None:
+                reference_id = references.ids.get(id(item))
+                if reference_id is not None:
+                    return {'$ref': reference_id}
+            # outputs with references depend on the rest of the graph, they are not cached
+            cache = item._output_cache if references is None else None
+            if cache is not None:
+                cached_dict = cache.get((self, serialized_keys_based, native, stream))
+                if cached_dict is not None:
+                    return _copy_json_value(cached_dict) if copy_cached else cached_dict
+            fields_dict = Pykson.__get_field_and_child_values_as_dict(item, serialized_keys_based, native, stream)
             final_dict = {}
+            if references is not None and id(item) in references.shared:
+                references.ids[id(item)] = len(references.ids) + 1
+                final_dict['$id'] = references.ids[id(item)]
             # check if item type exists in type hierarchy adapters
             for type_hierarchy_adapter in self.type_hierarchy_adapters:
                 if isinstance(item, type_hierarchy_adapter.base_class):
@@ -1136,12 +2124,14 @@ class Pykson:
 
             for field_key, field_value in fields_dict.items():
                 if isinstance(field_value, JsonObject):
-                    final_dict[field_key] = self._to_json(field_value)
+                    final_dict[field_key] = self._to_json(field_value, serialized_keys_based, native, stream,
+                                                          references, copy_cached)
                 elif isinstance(field_value, list):
                     list_value = []
                     for val in field_value:
                         if isinstance(val, JsonObject):
-                            list_value.append(self._to_json(val))
+                            list_value.append(self._to_json(val, serialized_keys_based, native, stream, references,
+                                                            copy_cached))
                         else:
                             list_value.append(val)
                     final_dict[field_key] = list_value
@@ -1149,13 +2139,231 @@ class Pykson:
                     final_dict[field_key] = field_value
                 else:
                     final_dict[field_key] = field_value
+            if cache is not None:
+                cache[(self, serialized_keys_based, native, stream)] = final_dict
+                if copy_cached:
+                    return _copy_json_value(final_dict)
             return final_dict
 
-    def to_json(self, item: Union[T, List[T]], base_indent: Optional[int] = None, indent: Optional[int] = None) -> str:
+    def to_json(self, item: Union[T, List[T]], base_indent: Optional[int] = None, indent: Optional[int] = None,
+                references: bool = False) -> str:
+        # with references, objects found more than once in item are written once with an $id key and as
+        # {"$ref": id} elsewhere, decode them with from_json(references=True)
+        if references:
+            return json.dumps(self._to_json(item, references=_SharedReferences(item)), cls=PyksonEncoder,
+                              indent=indent)
+        cache = item._output_cache if isinstance(item, JsonObject) else None
+        if cache is not None:
+            cached_str = cache.get((self, 'json', base_indent, indent))
+            if cached_str is not None:
+                return cached_str
         j_str = json.dumps(self._to_json(item), cls=PyksonEncoder, indent=indent)
         if base_indent:
             j_str.replace('\n', ''.join([' ' for i in range(0, base_indent)]) + '\n')
+        if cache is not None:
+            cache[(self, 'json', base_indent, indent)] = j_str
         return j_str
 
-    def to_dict_or_list(self, item: Union[T, List[T]]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
-        return self._to_json(item)
+    def to_canonical_json(self, item: Union[T, List[T]]) -> str:
+        # deterministic json of item: sorted keys, no whitespace, integral floats written as integers, decimals
+        # without trailing zeros and datetimes in UTC, so equal objects give equal strings
+        return json.dumps(_canonical_value(self._to_json(item, native=True)), sort_keys=True, separators=(',', ':'),
+                          ensure_ascii=False, allow_nan=False)
+
+    def content_hash(self, item: Union[T, List[T]], algorithm: str = 'sha256') -> str:
+        # hex digest of the canonical json of item. Digests of objects are cached on them until a field of the object
+        # or of a nested object is set, lists changed in place are not tracked
+        if isinstance(item, list):
+            return hashlib.new(algorithm, self.to_canonical_json(item).encode('utf-8')).hexdigest()
+        cache = item._content_hashes
+        if cache is not None:
+            digest = cache.get((self, algorithm))
+            if digest is not None:
+                return digest
+        digest = hashlib.new(algorithm, self.to_canonical_json(item).encode('utf-8')).hexdigest()
+        if cache is None:
+            cache = item._content_hashes = {}
+            item._add_observer(JsonObject._clear_content_hashes)
+        cache[(self, algorithm)] = digest
+        return digest
+
+    def write_json(self, item: Union[T, List[T]], fp, chunk_size: int = 65536):
+        # writes the json of item to a text file object, values of binary fields are encoded and written in chunks of
+        # about chunk_size characters instead of being encoded to whole strings first
+        for chunk in _iter_json_chunks(self._to_json(item, stream=True), chunk_size):
+            fp.write(chunk)
+
+    def enable_output_cache(self, item: Union[T, List[T]], recursive: bool = False):
+        # caches are cleared when fields are set, lists of objects or values changed in place are not tracked
+        if isinstance(item, list):
+            for i in item:
+                self.enable_output_cache(i, recursive)
+            return
+        if item._output_cache is None:
+            item._output_cache = {}
+            item._add_observer(JsonObject._clear_output_cache)
+        if recursive:
+            for child in item._child_objects():
+                self.enable_output_cache(child, recursive)
+
+    def disable_output_cache(self, item: Union[T, List[T]], recursive: bool = False):
+        if isinstance(item, list):
+            for i in item:
+                self.disable_output_cache(i, recursive)
+            return
+        if item._output_cache is not None:
+            item._remove_observer(JsonObject._clear_output_cache)
+            item._output_cache = None
+        if recursive:
+            for child in item._child_objects():
+                self.disable_output_cache(child, recursive)
+
+    def to_dict_or_list(self, item: Union[T, List[T]], references: bool = False) -> \
+            Union[Dict[str, Any], List[Dict[str, Any]]]:
+        return self._to_json(item, references=_SharedReferences(item) if references else None, copy_cached=True)
+
+    def _to_json_delta(self, item: T) -> Dict[str, Any]:
+        final_dict = {}
+        dirty = item._dirty or set()
+        for field in type(item)._pykson_fields:
+            if isinstance(field, FunctionField):
+                continue
+            field_value = item._data.get(field.serialized_name, field.default_value)
+            if field.serialized_name in dirty:
+                if isinstance(field_value, JsonObject):
+                    final_dict[field.serialized_name] = self._to_json(field_value, copy_cached=True)
+                elif isinstance(field_value, list):
+                    final_dict[field.serialized_name] = [
+                        self._to_json(val, copy_cached=True) if isinstance(val, JsonObject) else val
+                        for val in field.get_json_formatted_value(field_value)
+                    ]
+                else:
+                    final_dict[field.serialized_name] = field.get_json_formatted_value(field_value)
+            elif isinstance(field, ObjectField) and field_value is not None and field_value._has_changes():
+                final_dict[field.serialized_name] = self._to_json_delta(field_value)
+            elif isinstance(field, ObjectListField) and field_value is not None and \
+                    any(val._has_changes() for val in field_value):
+                # lists are replaced as a whole by merge patches
+                final_dict[field.serialized_name] = self._to_json(field_value, copy_cached=True)
+        return final_dict
+
+    def to_dict_delta(self, item: T, mark_clean: bool = False) -> Dict[str, Any]:
+        delta = self._to_json_delta(item)
+        if mark_clean:
+            self.mark_clean(item)
+        return delta
+
+    def to_json_delta(self, item: T, mark_clean: bool = False, indent: Optional[int] = None) -> str:
+        return json.dumps(self.to_dict_delta(item, mark_clean), cls=PyksonEncoder, indent=indent)
+
+    def mark_clean(self, item: Union[T, List[T]]):
+        if isinstance(item, list):
+            for i in item:
+                self.mark_clean(i)
+            return
+        if item._dirty is not None:
+            item._dirty.clear()
+        for child in item._child_objects():
+            self.mark_clean(child)
+
+    @staticmethod
+    def __msgpack_default(obj):
+        import msgpack
+        if isinstance(obj, decimal.Decimal):
+            return msgpack.ExtType(Pykson.MSGPACK_DECIMAL_EXT_TYPE, str(obj).encode('ascii'))
+        elif isinstance(obj, uuid.UUID):
+            return obj.bytes
+        raise TypeError('Object of type ' + str(type(obj)) + ' is not msgpack serializable')
+
+    @staticmethod
+    def __msgpack_ext_hook(code: int, data: bytes):
+        import msgpack
+        if code == Pykson.MSGPACK_DECIMAL_EXT_TYPE:
+            return decimal.Decimal(data.decode('ascii'))
+        return msgpack.ExtType(code, data)
+
+    def to_msgpack(self, item: Union[T, List[T]]) -> bytes:
+        try:
+            import msgpack
+        except ImportError:
+            raise ImportError('msgpack package is required for msgpack encoding, '
+                              'install it using "pip install pykson[msgpack]"')
+        return msgpack.packb(self._to_json(item, native=True), use_bin_type=True, datetime=True,
+                             default=Pykson.__msgpack_default)
+
+    def from_msgpack(self, data: bytes, cls: Type[T], accept_unknown: bool = False) -> Optional[Union[T, List[T]]]:
+        try:
+            import msgpack
+        except ImportError:
+            raise ImportError('msgpack package is required for msgpack decoding, '
+                              'install it using "pip install pykson[msgpack]"')
+        unpacked = msgpack.unpackb(data, raw=False, timestamp=3, ext_hook=Pykson.__msgpack_ext_hook)
+        return self.from_json(unpacked, cls, accept_unknown)
+
+    def to_cbor(self, item: Union[T, List[T]]) -> bytes:
+        try:
+            import cbor2
+        except ImportError:
+            raise ImportError('cbor2 package is required for cbor encoding, '
+                              'install it using "pip install pykson[cbor]"')
+        return cbor2.dumps(self._to_json(item, native=True), datetime_as_timestamp=True)
+
+    def from_cbor(self, data: bytes, cls: Type[T], accept_unknown: bool = False) -> Optional[Union[T, List[T]]]:
+        try:
+            import cbor2
+        except ImportError:
+            raise ImportError('cbor2 package is required for cbor decoding, '
+                              'install it using "pip install pykson[cbor]"')
+        return self.from_json(cbor2.loads(data), cls, accept_unknown)
+
+    # noinspection PyMethodMayBeStatic
+    def to_binary(self, item: Union[T, List[T]], cls: Optional[Type[T]] = None) -> bytes:
+        from pykson.binary import BinaryCodec
+        if cls is None:
+            if isinstance(item, list):
+                if len(item) == 0:
+                    raise Exception('cls must be given to encode an empty list to binary')
+                cls = type(item[0])
+            else:
+                cls = type(item)
+        return BinaryCodec.for_class(cls).dumps(item)
+
+    # noinspection PyMethodMayBeStatic
+    def from_binary(self, data: Union[bytes, bytearray, memoryview], cls: Type[T]) -> Union[T, List[T]]:
+        from pykson.binary import BinaryCodec
+        return BinaryCodec.for_class(cls).loads(data)
+
+    # noinspection PyProtectedMember
+    def pack_many(self, items: List[T]) -> bytes:
+        # pickles objects for other processes as rows of field values grouped by class, nested objects are pickled
+        # with JsonObject.__getstate__ and __setstate__. Only unpack data from trusted sources, like any pickle
+        classes = []  # type: List[Type[JsonObject]]
+        class_indexes = {}  # type: Dict[Type[JsonObject], int]
+        item_class_indexes = []  # type: List[int]
+        rows = []  # type: List[tuple]
+        extra_attributes = {}  # type: Dict[int, Dict[str, Any]]
+        for i, item in enumerate(items):
+            item_class = type(item)
+            class_index = class_indexes.get(item_class)
+            if class_index is None:
+                class_index = class_indexes[item_class] = len(classes)
+                classes.append(item_class)
+            item_class_indexes.append(class_index)
+            rows.append(item._field_values())
+            item_extra_attributes = item._extra_attributes()
+            if item_extra_attributes is not None:
+                extra_attributes[i] = item_extra_attributes
+        return pickle.dumps(
+            (tuple(classes), item_class_indexes if len(classes) > 1 else None, rows, extra_attributes),
+            protocol=pickle.HIGHEST_PROTOCOL
+        )
+
+    def unpack_many(self, data: bytes) -> List[JsonObject]:
+        classes, item_class_indexes, rows, extra_attributes = pickle.loads(data)
+        if item_class_indexes is None:
+            items = [_unpickle_json_object(classes[0], row) for row in rows]
+        else:
+            items = [_unpickle_json_object(classes[i], row) for i, row in zip(item_class_indexes, rows)]
+        for i, attributes in extra_attributes.items():
+            items[i].__dict__.update(attributes)
+        return items
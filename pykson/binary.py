@@ -0,0 +1,434 @@
+import json
+import uuid
+import struct
+import hashlib
+import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, Union
+
+from pykson import JsonObject, Field, FunctionField, IntegerField, FloatField, BooleanField, StringField, \
+    BytesField, ByteArrayField, MultipleChoiceStringField, EnumStringField, MultipleChoiceIntegerField, \
+    EnumIntegerField, DateField, TimeField, DateTimeField, TimestampSecondsField, TimestampMillisecondsField, \
+    UUIDField, JsonField, ListField, ObjectField, ObjectListField, T
+
+# Record layout (little endian, no field names on the wire):
+#   [null bitmap, one bit per field][fixed width fields packed with struct]
+#   [var width fields, each '<I' length + payload]
+# Fixed width fields of null values are written as zeros, null var width fields are omitted.
+# Payload header: magic, format version, single/many flag and the 8 bytes schema fingerprint of the root class.
+
+_LENGTH = struct.Struct('<I')
+_HEADER = struct.Struct('<3sBB8s')
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+_FIXED_FORMATS = {
+    'int': 'q',
+    'float': 'd',
+    'bool': '?',
+    'datetime': 'q',
+    'date': 'i',
+    'time': 'q',
+    'uuid': '16s',
+}
+_FIXED_NULL_VALUES = {
+    'int': 0,
+    'float': 0.0,
+    'bool': False,
+    'datetime': 0,
+    'date': 0,
+    'time': 0,
+    'uuid': bytes(16),
+}
+_LIST_ITEM_KINDS = {
+    int: 'int',
+    float: 'float',
+    bool: 'bool',
+    str: 'str',
+}
+
+
+class BinarySchemaMismatchError(Exception):
+    pass
+
+
+def _field_kind(field: Field) -> Optional[str]:
+    if isinstance(field, FunctionField):
+        return None
+    if isinstance(field, (IntegerField, MultipleChoiceIntegerField, EnumIntegerField)):
+        return 'int'
+    if isinstance(field, FloatField):
+        return 'float'
+    if isinstance(field, BooleanField):
+        return 'bool'
+    if isinstance(field, (StringField, MultipleChoiceStringField, EnumStringField)):
+        return 'str'
+    if isinstance(field, (BytesField, ByteArrayField)):
+        return 'bytes'
+    if isinstance(field, (DateTimeField, TimestampSecondsField, TimestampMillisecondsField)):
+        return 'datetime'
+    if isinstance(field, DateField):
+        return 'date'
+    if isinstance(field, TimeField):
+        return 'time'
+    if isinstance(field, UUIDField):
+        return 'uuid'
+    if isinstance(field, JsonField):
+        return 'json'
+    if isinstance(field, ListField):
+        return 'list'
+    if isinstance(field, ObjectField):
+        return 'object'
+    if isinstance(field, ObjectListField):
+        return 'object_list'
+    # decimal, jalali dates and custom fields are stored using their json formatted string
+    return 'text'
+
+
+class _BinaryField:
+    def __init__(self, field: Field, kind: str, index: int):
+        self.field = field
+        self.kind = kind
+        self.index = index
+        self.name = field.name
+        self.serialized_name = field.serialized_name
+        self.fixed = kind in _FIXED_FORMATS
+        self.item = None  # type: Optional[_BinaryField]
+        if kind == 'list':
+            item_type = field.item_type
+            if isinstance(item_type, Field):
+                self.item = _BinaryField(item_type, _field_kind(item_type), -1)
+            else:
+                self.item = _BinaryField(field, _LIST_ITEM_KINDS[item_type], -1)
+
+    def to_packed(self, value):
+        kind = self.kind
+        if kind == 'datetime':
+            return (self.field.get_native_formatted_value(value) - _EPOCH) // _MICROSECOND
+        elif kind == 'date':
+            return value.toordinal()
+        elif kind == 'time':
+            return ((value.hour * 60 + value.minute) * 60 + value.second) * 1000000 + value.microsecond
+        elif kind == 'uuid':
+            return value.bytes
+        return value
+
+    def from_packed(self, value):
+        kind = self.kind
+        if kind == 'datetime':
+            return _EPOCH + datetime.timedelta(microseconds=value)
+        elif kind == 'date':
+            return datetime.date.fromordinal(value)
+        elif kind == 'time':
+            seconds, microsecond = divmod(value, 1000000)
+            minutes, second = divmod(seconds, 60)
+            hour, minute = divmod(minutes, 60)
+            return datetime.time(hour, minute, second, microsecond)
+        elif kind == 'uuid':
+            return uuid.UUID(bytes=value)
+        return value
+
+    def encode(self, value) -> Union[bytes, bytearray]:
+        kind = self.kind
+        if kind == 'str':
+            return value.encode('utf-8')
+        elif kind == 'bytes':
+            return value
+        elif kind == 'text':
+            return str(self.field.get_json_formatted_value(value)).encode('utf-8')
+        elif kind == 'json':
+            return json.dumps(value, separators=(',', ':')).encode('utf-8')
+        elif kind == 'object':
+            out = bytearray()
+            BinaryCodec.for_class(self.field.item_type).encode_record(value, out)
+            return out
+        elif kind == 'object_list':
+            codec = BinaryCodec.for_class(self.field.item_type)
+            out = bytearray(_LENGTH.pack(len(value)))
+            for item in value:
+                record = bytearray()
+                codec.encode_record(item, record)
+                out += _LENGTH.pack(len(record))
+                out += record
+            return out
+        elif kind == 'list':
+            item = self.item
+            out = bytearray(_LENGTH.pack(len(value)))
+            if item.fixed:
+                out += struct.pack('<' + str(len(value)) + _FIXED_FORMATS[item.kind],
+                                   *[item.to_packed(v) for v in value])
+            else:
+                for v in value:
+                    chunk = item.encode(v)
+                    out += _LENGTH.pack(len(chunk))
+                    out += chunk
+            return out
+        return struct.pack('<' + _FIXED_FORMATS[kind], self.to_packed(value))
+
+    def decode(self, buffer: memoryview, start: int, end: int, lazy: bool):
+        kind = self.kind
+        if kind == 'str':
+            return str(buffer[start:end], 'utf-8')
+        elif kind == 'bytes':
+            if lazy:
+                return buffer[start:end]
+            return bytes(buffer[start:end])
+        elif kind == 'text':
+            return self.field_value(str(buffer[start:end], 'utf-8'))
+        elif kind == 'json':
+            return json.loads(str(buffer[start:end], 'utf-8'))
+        elif kind == 'object':
+            codec = BinaryCodec.for_class(self.field.item_type)
+            if lazy:
+                return BinaryRecordView(codec, buffer, start, end)
+            return codec.decode_record(buffer, start)
+        elif kind == 'object_list':
+            codec = BinaryCodec.for_class(self.field.item_type)
+            count = _LENGTH.unpack_from(buffer, start)[0]
+            position = start + 4
+            items = []
+            for _ in range(count):
+                length = _LENGTH.unpack_from(buffer, position)[0]
+                position += 4
+                if lazy:
+                    items.append(BinaryRecordView(codec, buffer, position, position + length))
+                else:
+                    items.append(codec.decode_record(buffer, position))
+                position += length
+            return items
+        elif kind == 'list':
+            item = self.item
+            count = _LENGTH.unpack_from(buffer, start)[0]
+            position = start + 4
+            if item.fixed:
+                packed = struct.unpack_from('<' + str(count) + _FIXED_FORMATS[item.kind], buffer, position)
+                if item.kind in ('int', 'float', 'bool'):
+                    return list(packed)
+                return [item.from_packed(v) for v in packed]
+            items = []
+            for _ in range(count):
+                length = _LENGTH.unpack_from(buffer, position)[0]
+                position += 4
+                items.append(item.decode(buffer, position, position + length, lazy))
+                position += length
+            return items
+        return self.from_packed(struct.unpack_from('<' + _FIXED_FORMATS[kind], buffer, start)[0])
+
+    def field_value(self, value):
+        # converts a json formatted value to the field value using the field itself
+        holder = JsonObject()
+        self.field.__set__(holder, value)
+        return holder._data[self.serialized_name]
+
+    def describe(self, visiting: List[type]) -> List[Any]:
+        if self.kind in ('object', 'object_list'):
+            return [self.serialized_name, self.kind, BinaryCodec.for_class(self.field.item_type).describe(visiting)]
+        if self.kind == 'list':
+            return [self.serialized_name, self.kind, self.item.describe(visiting)[1:]]
+        return [self.serialized_name, self.kind]
+
+
+class BinaryRecordView:
+    __slots__ = ('_codec', '_buffer', '_start', '_end', '_var_ranges')
+
+    def __init__(self, codec: 'BinaryCodec', buffer: memoryview, start: int, end: int):
+        self._codec = codec
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+        self._var_ranges = None  # type: Optional[List[Optional[Tuple[int, int]]]]
+
+    def __getattr__(self, name: str):
+        binary_field = self._codec.fields_by_name.get(name)
+        if binary_field is None:
+            raise AttributeError(name)
+        return self._codec.view_value(self, binary_field)
+
+    def __getitem__(self, name: str):
+        binary_field = self._codec.fields_by_name.get(name)
+        if binary_field is None:
+            raise KeyError(name)
+        return self._codec.view_value(self, binary_field)
+
+    def to_object(self) -> JsonObject:
+        return self._codec.decode_record(self._buffer, self._start)
+
+    def __repr__(self):
+        return '<BinaryRecordView of ' + self._codec.cls.__name__ + '>'
+
+
+class BinaryCodec:
+    MAGIC = b'PKB'
+    VERSION = 1
+    _SINGLE = 0
+    _MANY = 1
+    _codecs = {}  # type: Dict[type, BinaryCodec]
+
+    @staticmethod
+    def for_class(cls: Type[T]) -> 'BinaryCodec':
+        codec = BinaryCodec._codecs.get(cls)
+        if codec is None:
+            # threads creating a codec at the same time all use the first one stored
+            codec = BinaryCodec._codecs.setdefault(cls, BinaryCodec(cls))
+        return codec
+
+    def __init__(self, cls: Type[T]):
+        assert issubclass(cls, JsonObject), 'cls must be subclass of JsonObject'
+        assert cls != JsonObject, 'Cannot convert to JsonObject'
+        self.cls = cls
+        fields = [f for f in cls._pykson_fields if _field_kind(f) is not None]
+        self.fields = [_BinaryField(f, _field_kind(f), i) for i, f in enumerate(fields)]
+        self.fields_by_name = {f.name: f for f in self.fields}
+        self.fixed_fields = [f for f in self.fields if f.fixed]
+        self.var_fields = [f for f in self.fields if not f.fixed]
+        self.var_positions = {f.name: i for i, f in enumerate(self.var_fields)}
+        self.bitmap_size = (len(self.fields) + 7) // 8
+        self.fixed_struct = struct.Struct('<' + ''.join([_FIXED_FORMATS[f.kind] for f in self.fixed_fields]))
+        self.fixed_offsets = {}  # type: Dict[str, int]
+        offset = self.bitmap_size
+        for f in self.fixed_fields:
+            self.fixed_offsets[f.name] = offset
+            offset += struct.calcsize('<' + _FIXED_FORMATS[f.kind])
+        self.var_section_offset = offset
+        self._fingerprint = None  # type: Optional[bytes]
+
+    def describe(self, visiting: Optional[List[type]] = None) -> Any:
+        if visiting is None:
+            visiting = []
+        if self.cls in visiting:
+            return 'recursive:' + str(len(visiting) - visiting.index(self.cls))
+        visiting.append(self.cls)
+        description = [f.describe(visiting) for f in self.fields]
+        visiting.pop()
+        return description
+
+    @property
+    def fingerprint(self) -> bytes:
+        if self._fingerprint is None:
+            description = json.dumps(self.describe(), separators=(',', ':'))
+            self._fingerprint = hashlib.sha256(description.encode('utf-8')).digest()[:8]
+        return self._fingerprint
+
+    def encode_record(self, obj: JsonObject, out: bytearray):
+        # records hold the fields of self.cls only, fields of sub classes would be lost
+        if type(obj) is not self.cls:
+            raise Exception('Cannot encode ' + str(type(obj)) + ' with the binary codec of ' + str(self.cls))
+        data = obj._data
+        bitmap = bytearray(self.bitmap_size)
+        fixed_values = []
+        var_chunks = []
+        for f in self.fields:
+            value = data.get(f.serialized_name, f.field.default_value)
+            if value is None:
+                bitmap[f.index >> 3] |= 1 << (f.index & 7)
+                if f.fixed:
+                    fixed_values.append(_FIXED_NULL_VALUES[f.kind])
+            elif f.fixed:
+                fixed_values.append(f.to_packed(value))
+            else:
+                var_chunks.append(f.encode(value))
+        out += bitmap
+        out += self.fixed_struct.pack(*fixed_values)
+        for chunk in var_chunks:
+            out += _LENGTH.pack(len(chunk))
+            out += chunk
+
+    def decode_record(self, buffer: memoryview, start: int) -> JsonObject:
+        bitmap = buffer[start:start + self.bitmap_size]
+        fixed_values = self.fixed_struct.unpack_from(buffer, start + self.bitmap_size)
+        position = start + self.var_section_offset
+        fixed_index = 0
+        values = {}
+        for f in self.fields:
+            is_null = (bitmap[f.index >> 3] >> (f.index & 7)) & 1
+            if f.fixed:
+                values[f.name] = None if is_null else f.from_packed(fixed_values[fixed_index])
+                fixed_index += 1
+            elif is_null:
+                values[f.name] = None
+            else:
+                length = _LENGTH.unpack_from(buffer, position)[0]
+                position += 4
+                values[f.name] = f.decode(buffer, position, position + length, False)
+                position += length
+        return self.cls(**values)
+
+    def view_value(self, view: BinaryRecordView, f: _BinaryField):
+        buffer = view._buffer
+        if (buffer[view._start + (f.index >> 3)] >> (f.index & 7)) & 1:
+            return None
+        if f.fixed:
+            return f.from_packed(
+                struct.unpack_from('<' + _FIXED_FORMATS[f.kind], buffer, view._start + self.fixed_offsets[f.name])[0]
+            )
+        if view._var_ranges is None:
+            ranges = []
+            position = view._start + self.var_section_offset
+            for var_field in self.var_fields:
+                if (buffer[view._start + (var_field.index >> 3)] >> (var_field.index & 7)) & 1:
+                    ranges.append(None)
+                    continue
+                length = _LENGTH.unpack_from(buffer, position)[0]
+                position += 4
+                ranges.append((position, position + length))
+                position += length
+            view._var_ranges = ranges
+        start, end = view._var_ranges[self.var_positions[f.name]]
+        return f.decode(buffer, start, end, True)
+
+    def dumps(self, item: Union[T, List[T]]) -> bytes:
+        out = bytearray()
+        if isinstance(item, list):
+            out += _HEADER.pack(BinaryCodec.MAGIC, BinaryCodec.VERSION, BinaryCodec._MANY, self.fingerprint)
+            out += _LENGTH.pack(len(item))
+            for i in item:
+                record = bytearray()
+                self.encode_record(i, record)
+                out += _LENGTH.pack(len(record))
+                out += record
+        else:
+            out += _HEADER.pack(BinaryCodec.MAGIC, BinaryCodec.VERSION, BinaryCodec._SINGLE, self.fingerprint)
+            self.encode_record(item, out)
+        return bytes(out)
+
+    def _read_header(self, data) -> Tuple[memoryview, int]:
+        buffer = memoryview(data)
+        if len(buffer) < _HEADER.size:
+            raise BinarySchemaMismatchError('Binary payload is too short to contain a pykson header')
+        magic, version, flag, fingerprint = _HEADER.unpack_from(buffer, 0)
+        if magic != BinaryCodec.MAGIC or version != BinaryCodec.VERSION:
+            raise BinarySchemaMismatchError('Payload is not a pykson binary payload of version ' +
+                                            str(BinaryCodec.VERSION))
+        if fingerprint != self.fingerprint:
+            raise BinarySchemaMismatchError('Payload schema fingerprint ' + fingerprint.hex() +
+                                            ' does not match fingerprint ' + self.fingerprint.hex() +
+                                            ' of class ' + str(self.cls))
+        return buffer, flag
+
+    def _record_ranges(self, buffer: memoryview) -> Iterator[Tuple[int, int]]:
+        count = _LENGTH.unpack_from(buffer, _HEADER.size)[0]
+        position = _HEADER.size + 4
+        for _ in range(count):
+            length = _LENGTH.unpack_from(buffer, position)[0]
+            position += 4
+            yield position, position + length
+            position += length
+
+    def loads(self, data) -> Union[T, List[T]]:
+        buffer, flag = self._read_header(data)
+        if flag == BinaryCodec._SINGLE:
+            return self.decode_record(buffer, _HEADER.size)
+        return [self.decode_record(buffer, start) for start, _ in self._record_ranges(buffer)]
+
+    def view(self, data) -> Union[BinaryRecordView, List[BinaryRecordView]]:
+        buffer, flag = self._read_header(data)
+        if flag == BinaryCodec._SINGLE:
+            return BinaryRecordView(self, buffer, _HEADER.size, len(buffer))
+        return [BinaryRecordView(self, buffer, start, end) for start, end in self._record_ranges(buffer)]
+
+    def iter_views(self, data) -> Iterator[BinaryRecordView]:
+        buffer, flag = self._read_header(data)
+        if flag == BinaryCodec._SINGLE:
+            yield BinaryRecordView(self, buffer, _HEADER.size, len(buffer))
+            return
+        for start, end in self._record_ranges(buffer):
+            yield BinaryRecordView(self, buffer, start, end)
@@ -0,0 +1,150 @@
+import io
+import os
+import contextlib
+from typing import IO, Iterator, Optional, Union
+
+# Files compressed with gzip, bz2, lzma (xz) or zstd are read and written as streams, without decompressing them to
+# disk or to memory first. Compression of files being read is detected from their first bytes, or from the file name
+# when the stream cannot be peeked, and compression of written files from the file name.
+
+COMPRESSIONS = ['gzip', 'bz2', 'lzma', 'zstd']
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+_MAGIC_BYTES = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'lzma'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+]
+_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'lzma',
+    '.lzma': 'lzma',
+    '.zst': 'zstd',
+    '.zstd': 'zstd',
+}
+
+PathOrFile = Union[str, bytes, os.PathLike, IO]
+
+
+def compression_from_name(name: Optional[str]) -> Optional[str]:
+    if not isinstance(name, str):
+        return None
+    return _EXTENSIONS.get(os.path.splitext(name)[1].lower())
+
+
+def strip_compression_extension(name: str) -> str:
+    # file name without the extension of its compression, e.g. records.ndjson for records.ndjson.gz
+    root, extension = os.path.splitext(name)
+    return root if extension.lower() in _EXTENSIONS else name
+
+
+def detect_compression(stream: IO) -> Optional[str]:
+    # compression of a binary stream from its first bytes, the stream position is not changed. Returns None for
+    # uncompressed streams and for streams which can neither be peeked nor seeked
+    if hasattr(stream, 'peek'):
+        head = stream.peek(6)[:6]
+    elif stream.seekable():
+        position = stream.tell()
+        head = stream.read(6)
+        stream.seek(position)
+    else:
+        return None
+    for magic, compression in _MAGIC_BYTES:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _zstd_stream(raw: IO, reading: bool, buffer_size: int, compression_level: Optional[int]) -> IO:
+    try:
+        # noinspection PyUnresolvedReferences
+        from compression import zstd
+        if reading:
+            return zstd.ZstdFile(raw, 'r')
+        return zstd.ZstdFile(raw, 'w', level=compression_level)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError('zstandard package is required for zstd files, install it using "pip install pykson[zstd]"')
+    if reading:
+        return zstandard.ZstdDecompressor().stream_reader(raw, read_size=buffer_size, read_across_frames=True,
+                                                          closefd=False)
+    return zstandard.ZstdCompressor(level=3 if compression_level is None else compression_level).stream_writer(
+        raw, write_size=buffer_size, closefd=False)
+
+
+def _compressed_stream(raw: IO, compression: str, reading: bool, buffer_size: int,
+                       compression_level: Optional[int]) -> IO:
+    # the returned streams do not close raw
+    if compression == 'gzip':
+        import gzip
+        if reading:
+            return gzip.GzipFile(fileobj=raw, mode='rb')
+        return gzip.GzipFile(fileobj=raw, mode='wb',
+                             compresslevel=9 if compression_level is None else compression_level)
+    elif compression == 'bz2':
+        import bz2
+        if reading:
+            return bz2.BZ2File(raw, 'rb')
+        return bz2.BZ2File(raw, 'wb', compresslevel=9 if compression_level is None else compression_level)
+    elif compression == 'lzma':
+        import lzma
+        if reading:
+            return lzma.LZMAFile(raw, 'rb')
+        return lzma.LZMAFile(raw, 'wb', preset=compression_level)
+    elif compression == 'zstd':
+        return _zstd_stream(raw, reading, buffer_size, compression_level)
+    raise Exception('Unknown compression ' + str(compression) + ', must be one of ' + str(COMPRESSIONS))
+
+
+@contextlib.contextmanager
+def open_file(path_or_file: PathOrFile, mode: str = 'r', compression: Optional[str] = 'auto',
+              buffer_size: int = DEFAULT_BUFFER_SIZE, encoding: str = 'utf-8',
+              compression_level: Optional[int] = None) -> Iterator[IO]:
+    # opens a path or a binary file object for reading or writing, decompressing or compressing it on the fly. mode is
+    # one of 'r', 'rb', 'w' and 'wb'. compression is 'auto' (detected when reading, from the file name extension when
+    # writing), None for uncompressed files or one of COMPRESSIONS. buffer_size is the size of reads and writes of the
+    # file and of the decompressed buffer. File objects passed in are not closed
+    assert mode in ('r', 'rb', 'w', 'wb'), 'Invalid mode ' + str(mode)
+    reading = mode[0] == 'r'
+    if isinstance(path_or_file, io.TextIOBase):
+        # text streams are used as they are, they cannot be decompressed
+        yield path_or_file
+        return
+    opened = None  # type: Optional[IO]
+    if isinstance(path_or_file, (str, bytes, os.PathLike)):
+        raw = opened = open(path_or_file, 'rb' if reading else 'wb', buffering=buffer_size)
+        name = os.fsdecode(path_or_file)
+    else:
+        raw = path_or_file
+        name = getattr(path_or_file, 'name', None)
+    stream = raw
+    result = raw
+    try:
+        if compression == 'auto':
+            compression = (detect_compression(raw) or compression_from_name(name)) if reading \
+                else compression_from_name(name)
+        if compression is not None:
+            stream = _compressed_stream(raw, compression, reading, buffer_size, compression_level)
+            stream = io.BufferedReader(stream, buffer_size) if reading else io.BufferedWriter(stream, buffer_size)
+            result = stream
+        if mode in ('r', 'w'):
+            result = io.TextIOWrapper(stream, encoding=encoding, newline='')
+        yield result
+    finally:
+        if result is not stream:
+            if stream is raw and opened is None:
+                # keeps file objects passed in open
+                result.flush()
+                result.detach()
+            else:
+                result.close()
+        if stream is not raw:
+            stream.close()
+        if opened is not None:
+            opened.close()
@@ -1,8 +1,60 @@
 import re
+import os
+import io
 import _io
+import sys
 import json
+import pickle
+import datetime
+import bisect
+import hashlib
+import itertools
+import argparse
+import collections
+import multiprocessing
 from dateutil import parser
-from typing import List, Optional, Tuple, Dict, Set, Any, Union
+from typing import List, Optional, Tuple, Dict, Set, FrozenSet, Any, Union, Iterable, Iterator
+
+from pykson.compression import open_file, strip_compression_extension
+
+
+def _datetime_layouts() -> List[Tuple[Any, str]]:
+    # compiled patterns of common datetime layouts with their strptime format, most common first
+    layouts = []
+    for date_pattern, date_format in [(r'\d{4}-\d{2}-\d{2}', '%Y-%m-%d'), (r'\d{4}/\d{2}/\d{2}', '%Y/%m/%d')]:
+        for separator in ['T', ' ']:
+            for time_pattern, time_format in [
+                (r'\d{2}:\d{2}:\d{2}', '%H:%M:%S'),
+                (r'\d{2}:\d{2}:\d{2}\.\d{1,6}', '%H:%M:%S.%f'),
+                (r'\d{2}:\d{2}', '%H:%M'),
+            ]:
+                layouts.append((date_pattern + separator + time_pattern, date_format + separator + time_format))
+                layouts.append((
+                    date_pattern + separator + time_pattern + r'(?:Z|[+-]\d{2}:?\d{2})',
+                    date_format + separator + time_format + '%z'
+                ))
+        layouts.append((date_pattern, date_format))
+    layouts.extend([
+        (r'[A-Z][a-z]{2}, \d{2} [A-Z][a-z]{2} \d{4} \d{2}:\d{2}:\d{2} [+-]\d{4}', '%a, %d %b %Y %H:%M:%S %z'),
+        (r'[A-Z][a-z]{2}, \d{2} [A-Z][a-z]{2} \d{4} \d{2}:\d{2}:\d{2} GMT', '%a, %d %b %Y %H:%M:%S GMT'),
+        (r'\d{2} [A-Z][a-z]{2} \d{4} \d{2}:\d{2}:\d{2}', '%d %b %Y %H:%M:%S'),
+        (r'\d{2} [A-Z][a-z]{2} \d{4}', '%d %b %Y'),
+        (r'[A-Z][a-z]{2} \d{2}, \d{4}', '%b %d, %Y'),
+    ])
+    return [(re.compile(pattern), datetime_format) for pattern, datetime_format in layouts]
+
+
+_DATETIME_LAYOUTS = _datetime_layouts()
+_DATETIME_WORD_PATTERN = re.compile(r'[A-Za-z]{2,}')
+# words dateutil accepts in datetimes, besides upper case time zone names
+_DATETIME_WORDS = frozenset([
+    'jan', 'january', 'feb', 'february', 'mar', 'march', 'apr', 'april', 'may', 'jun', 'june', 'jul', 'july',
+    'aug', 'august', 'sep', 'sept', 'september', 'oct', 'october', 'nov', 'november', 'dec', 'december',
+    'mon', 'monday', 'tue', 'tues', 'tuesday', 'wed', 'wednesday', 'thu', 'thur', 'thurs', 'thursday',
+    'fri', 'friday', 'sat', 'saturday', 'sun', 'sunday',
+    'am', 'pm', 'at', 'on', 'and', 'ad', 'of', 'st', 'nd', 'rd', 'th', 'utc', 'gmt',
+    'hour', 'hours', 'minute', 'minutes', 'second', 'seconds',
+])
 
 
 class PyksonGenerator:
@@ -44,6 +96,181 @@ class PyksonGenerator:
     def _null_or_equal(a: str, b: str):
         return a is None or b is None or a == b
 
+    class ValueSketch:
+        # bounded summary of the primitive values seen for a property, memory and time per value are constant
+        sample_size = 100
+        distinct_sketch_size = 256
+
+        def __init__(self):
+            # first distinct values seen, mapped to the result of their datetime check (None if not checked yet),
+            # see PyksonGenerator._detect_datetime_format
+            self.sample = {}  # type: Dict[Any, Optional[Union[bool, str]]]
+            self.count = 0
+            self.min_value = None  # type: Optional[Union[int, float]]
+            self.max_value = None  # type: Optional[Union[int, float]]
+            self.min_length = None  # type: Optional[int]
+            self.max_length = None  # type: Optional[int]
+            self.smallest_hashes = []  # type: List[int]
+            # whether every value added is a datetime, and the strptime formats of their layouts (True for datetimes
+            # of unknown layouts), checked for every value since the sample only holds the first distinct ones
+            self.all_datetime = True
+            self.datetime_formats = set()  # type: Set[Union[bool, str]]
+
+        @staticmethod
+        def of(value) -> 'PyksonGenerator.ValueSketch':
+            sketch = PyksonGenerator.ValueSketch()
+            sketch.add(value)
+            return sketch
+
+        @staticmethod
+        def _stable_hash(value) -> int:
+            # python hash of str is salted per process, sketches are merged across processes and persisted
+            return int.from_bytes(
+                hashlib.blake2b((type(value).__name__ + ':' + repr(value)).encode('utf-8'), digest_size=8).digest(),
+                'little'
+            )
+
+        def _add_hash(self, value_hash: int):
+            hashes = self.smallest_hashes
+            if len(hashes) >= PyksonGenerator.ValueSketch.distinct_sketch_size and value_hash >= hashes[-1]:
+                return
+            i = bisect.bisect_left(hashes, value_hash)
+            if i < len(hashes) and hashes[i] == value_hash:
+                return
+            hashes.insert(i, value_hash)
+            if len(hashes) > PyksonGenerator.ValueSketch.distinct_sketch_size:
+                hashes.pop()
+
+        def _update_range(self, min_value, max_value):
+            if self.min_value is None or min_value < self.min_value:
+                self.min_value = min_value
+            if self.max_value is None or max_value > self.max_value:
+                self.max_value = max_value
+
+        def _update_length(self, min_length: int, max_length: int):
+            if self.min_length is None or min_length < self.min_length:
+                self.min_length = min_length
+            if self.max_length is None or max_length > self.max_length:
+                self.max_length = max_length
+
+        def _add_datetime(self, value):
+            if not isinstance(value, str):
+                self.all_datetime = False
+                self.datetime_formats = set()
+                return
+            datetime_format = self.sample.get(value)
+            if datetime_format is None:
+                datetime_format = PyksonGenerator._detect_datetime_format(value)
+                if value in self.sample:
+                    self.sample[value] = datetime_format
+            if datetime_format is False:
+                self.all_datetime = False
+                self.datetime_formats = set()
+            else:
+                self.datetime_formats.add(datetime_format)
+
+        def add(self, value):
+            self.count += 1
+            if value not in self.sample and len(self.sample) < PyksonGenerator.ValueSketch.sample_size:
+                self.sample[value] = None
+            if self.all_datetime:
+                self._add_datetime(value)
+            self._add_hash(PyksonGenerator.ValueSketch._stable_hash(value))
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                self._update_range(value, value)
+            elif isinstance(value, (str, bytes)):
+                self._update_length(len(value), len(value))
+
+        def update_from(self, other: 'PyksonGenerator.ValueSketch'):
+            self.count += other.count
+            for value, is_datetime in other.sample.items():
+                if value in self.sample:
+                    if self.sample[value] is None:
+                        self.sample[value] = is_datetime
+                elif len(self.sample) < PyksonGenerator.ValueSketch.sample_size:
+                    self.sample[value] = is_datetime
+            for value_hash in other.smallest_hashes:
+                self._add_hash(value_hash)
+            if other.min_value is not None:
+                self._update_range(other.min_value, other.max_value)
+            if other.min_length is not None:
+                self._update_length(other.min_length, other.max_length)
+            if self.all_datetime and other.all_datetime:
+                self.datetime_formats.update(other.datetime_formats)
+            else:
+                self.all_datetime = False
+                self.datetime_formats = set()
+
+        @property
+        def distinct_estimate(self) -> int:
+            hashes = self.smallest_hashes
+            if len(hashes) < PyksonGenerator.ValueSketch.distinct_sketch_size:
+                return len(hashes)
+            return int((len(hashes) - 1) * (2 ** 64) / (hashes[-1] + 1))
+
+        @property
+        def datetime_ratio(self) -> Optional[float]:
+            checked = [is_datetime for is_datetime in self.sample.values() if is_datetime is not None]
+            if len(checked) == 0:
+                return None
+            return len([is_datetime for is_datetime in checked if is_datetime is not False]) / len(checked)
+
+        def are_all_datetime(self) -> bool:
+            return self.count > 0 and self.all_datetime
+
+        @property
+        def datetime_format(self) -> Optional[str]:
+            # strptime format shared by all values, None if they are not datetimes of a single known layout
+            if not self.are_all_datetime() or len(self.datetime_formats) != 1:
+                return None
+            datetime_format = next(iter(self.datetime_formats))
+            return datetime_format if isinstance(datetime_format, str) else None
+
+        def json_state(self):
+            # lossless state of the sketch, see from_json_state
+            return {
+                'sample': [[value, is_datetime] for value, is_datetime in self.sample.items()],
+                'count': self.count,
+                'min': self.min_value,
+                'max': self.max_value,
+                'min_length': self.min_length,
+                'max_length': self.max_length,
+                'hashes': self.smallest_hashes,
+                'all_datetime': self.all_datetime,
+                'datetime_formats': list(self.datetime_formats),
+            }
+
+        @staticmethod
+        def from_json_state(state: dict) -> 'PyksonGenerator.ValueSketch':
+            sketch = PyksonGenerator.ValueSketch()
+            sketch.sample = {value: is_datetime for value, is_datetime in state['sample']}
+            sketch.count = state['count']
+            sketch.min_value = state['min']
+            sketch.max_value = state['max']
+            sketch.min_length = state['min_length']
+            sketch.max_length = state['max_length']
+            sketch.smallest_hashes = list(state['hashes'])
+            if 'all_datetime' in state:
+                sketch.all_datetime = state['all_datetime']
+                sketch.datetime_formats = set(state['datetime_formats'])
+            else:
+                # states saved before all values were checked only know the sample
+                for value in list(sketch.sample.keys()):
+                    if sketch.all_datetime:
+                        sketch._add_datetime(value)
+            return sketch
+
+        def json_repr(self):
+            return {
+                'count': self.count,
+                'distinct_estimate': self.distinct_estimate,
+                'min': self.min_value,
+                'max': self.max_value,
+                'min_length': self.min_length,
+                'max_length': self.max_length,
+                'datetime_ratio': self.datetime_ratio,
+            }
+
     class SchemaProperty:
         def __init__(
                 self,
@@ -51,22 +278,50 @@ class PyksonGenerator:
                 type_str: str,
                 item_type_str: Optional[str] = None,
                 nullable: bool = False,
-                values: Optional[Set[Any]] = None
+                values: Optional[Set[Any]] = None,
+                sketch: Optional['PyksonGenerator.ValueSketch'] = None
         ):
             self.name = name
             self.type_str = type_str
             self.item_type_str = item_type_str
             self.nullable = nullable
-            self.values = values
+            self.sketch = sketch
+            if values is not None:
+                if self.sketch is None:
+                    self.sketch = PyksonGenerator.ValueSketch()
+                for v in values:
+                    self.sketch.add(v)
 
-        def json_repr(self):
+        @property
+        def values(self) -> Optional[Set[Any]]:
+            if self.sketch is None:
+                return None
+            return set(self.sketch.sample.keys())
+
+        def json_repr(self, include_state: bool = False):
             js = {'name': self.name, 'type': self.type_str, 'null': self.nullable}
             if self.item_type_str:
                 js['item_type'] = self.item_type_str
-            if self.values:
-                js['values'] = list([str(v) for v in self.values])
+            if self.sketch is not None and len(self.sketch.sample) > 0:
+                js['values'] = list([str(v) for v in self.sketch.sample.keys()])
+            if self.sketch is not None:
+                js['stats'] = self.sketch.json_repr()
+                if include_state:
+                    js['sketch'] = self.sketch.json_state()
             return js
 
+        @staticmethod
+        def from_json_repr(js: dict) -> 'PyksonGenerator.SchemaProperty':
+            # json_repr must include state, values and stats are not enough to restore the sketch
+            sketch_state = js.get('sketch')
+            return PyksonGenerator.SchemaProperty(
+                name=js['name'],
+                type_str=js['type'],
+                item_type_str=js.get('item_type'),
+                nullable=js['null'],
+                sketch=PyksonGenerator.ValueSketch.from_json_state(sketch_state) if sketch_state is not None else None,
+            )
+
         def __str__(self):
             json_obj = self.json_repr()
             return json.dumps(json_obj, indent=2)
@@ -78,70 +333,89 @@ class PyksonGenerator:
                 properties: List['PyksonGenerator.SchemaProperty'],
         ):
             self.name = name
+            # schema lists indexing this schema by its property names, see SchemaList
+            self._schema_lists = []  # type: List[PyksonGenerator.SchemaList]
             self.properties = properties
 
-        def json_repr(self):
-            return {'name': self.name, 'properties': [p.json_repr() for p in self.properties]}
+        @property
+        def properties(self) -> List['PyksonGenerator.SchemaProperty']:
+            return self._properties
+
+        @properties.setter
+        def properties(self, properties: List['PyksonGenerator.SchemaProperty']):
+            self._properties = properties
+            self._properties_by_name = None  # type: Optional[Dict[str, PyksonGenerator.SchemaProperty]]
+            self._property_names = None  # type: Optional[FrozenSet[str]]
+            for schema_list in self._schema_lists:
+                schema_list._reindex(self)
+
+        def __getstate__(self):
+            # cached maps and list back references are rebuilt after unpickling
+            return {'name': self.name, 'properties': self._properties}
+
+        def __setstate__(self, state):
+            self.name = state['name']
+            self._schema_lists = []
+            self.properties = state['properties']
+
+        def json_repr(self, include_state: bool = False):
+            return {'name': self.name, 'properties': [p.json_repr(include_state) for p in self.properties]}
+
+        @staticmethod
+        def from_json_repr(js: dict) -> 'PyksonGenerator.Schema':
+            return PyksonGenerator.Schema(
+                name=js['name'],
+                properties=[PyksonGenerator.SchemaProperty.from_json_repr(p) for p in js['properties']],
+            )
 
         def __str__(self):
             json_obj = self.json_repr()
             return json.dumps(json_obj, indent=2)
 
         def get_properties_by_name(self) -> Dict[str, 'PyksonGenerator.SchemaProperty']:
-            return {
-                p.name: p for p in self.properties
-            }
+            if self._properties_by_name is None or len(self._properties_by_name) != len(self._properties):
+                self._properties_by_name = {
+                    p.name: p for p in self._properties
+                }
+                self._property_names = None
+            return self._properties_by_name
+
+        def get_property_names(self) -> FrozenSet[str]:
+            properties_by_name = self.get_properties_by_name()
+            if self._property_names is None:
+                self._property_names = frozenset(properties_by_name.keys())
+            return self._property_names
 
         def _is_similar_keys(
                 self,
                 other_schema: 'PyksonGenerator.Schema',
                 is_sibling_in_list: bool = False
         ) -> bool:
-            prop_by_name = self.get_properties_by_name()
-            other_prop_by_name = other_schema.get_properties_by_name()
-            prop_keys = set(prop_by_name.keys())
-            other_prop_keys = set(other_prop_by_name.keys())
+            prop_keys = self.get_property_names()
+            other_prop_keys = other_schema.get_property_names()
             if is_sibling_in_list:
-                return len(prop_keys.intersection(other_prop_keys)) > 0
-            return (
-                    len([k for k in prop_keys if k not in other_prop_keys]) == 0
-                    or
-                    len([k for k in other_prop_keys if k not in prop_keys]) == 0
-                    or
-                    set(list(prop_keys)) == set(list(other_prop_keys))
-                )
+                return not prop_keys.isdisjoint(other_prop_keys)
+            return prop_keys <= other_prop_keys or other_prop_keys <= prop_keys
 
         def is_similar(
                 self,
                 other_schema: 'PyksonGenerator.Schema',
                 is_sibling_in_list: bool = False
         ) -> bool:
+            if not self._is_similar_keys(other_schema, is_sibling_in_list):
+                return False
             prop_by_name = self.get_properties_by_name()
             other_prop_by_name = other_schema.get_properties_by_name()
-            prop_keys = list(prop_by_name.keys())
-            other_prop_keys = list(other_prop_by_name.keys())
-            all_keys = list(set(prop_keys + other_prop_keys))
-            # return prop_by_name.keys() == other_prop_by_name.keys() and all([
-            return self._is_similar_keys(other_schema, is_sibling_in_list) and \
-                all(
-                    [
-                        prop_by_name.get(n) is None or other_prop_by_name.get(n) is None or
-                        (
-                                PyksonGenerator._null_or_equal_type_strings(
-                                    prop_by_name[n].type_str,
-                                    other_prop_by_name[n].type_str
-                                )
-                                and
-                                (
-                                    True if prop_by_name[n].type_str != list.__name__
-                                    else PyksonGenerator._null_or_equal(
-                                        prop_by_name[n].item_type_str, other_prop_by_name[n].item_type_str
-                                    )
-                                )
-                        )
-                        for n in all_keys
-                    ]
-                )
+            # properties missing from one of the schemas are always similar
+            for n in self.get_property_names() & other_schema.get_property_names():
+                prop = prop_by_name[n]
+                other_prop = other_prop_by_name[n]
+                if not PyksonGenerator._null_or_equal_type_strings(prop.type_str, other_prop.type_str):
+                    return False
+                if prop.type_str == list.__name__ and \
+                        not PyksonGenerator._null_or_equal(prop.item_type_str, other_prop.item_type_str):
+                    return False
+            return True
 
         def update_from(
                 self,
@@ -167,19 +441,90 @@ class PyksonGenerator:
                     if prop.item_type_str is None and other_prop.item_type_str is not None:
                         prop.item_type_str = other_prop.item_type_str
                 else:
-                    if other_prop.values is not None and len(other_prop.values) > 0:
-                        if prop.values is None:
-                            prop.values = set()
-                        prop.values.update(other_prop.values)
+                    if other_prop.sketch is not None:
+                        if prop.sketch is None:
+                            prop.sketch = PyksonGenerator.ValueSketch()
+                        prop.sketch.update_from(other_prop.sketch)
             _self_props_keys = self_props.keys()
             only_other_props = [p_v for p_n, p_v in other_props.items() if p_n not in _self_props_keys]
             if not is_sibling_in_list and len(only_other_props) > 0:
                 raise Exception(f'Cannot update: Found properties {[p.name for p in only_other_props]} '
                                 f'which are not in this schema properties {[p.name for p in self_props.values()]}')
             for only_other_prop in only_other_props:
+                # siblings merged before did not have this property
+                only_other_prop.nullable = True
                 properties.append(only_other_prop)
             self.properties = properties
 
+    class SchemaList(list):
+        # list of schemas indexed by property names. Schemas similar to a schema share all of its property names
+        # or have only property names of it, so only schemas sharing its property names are compared with it.
+        def __init__(self, schemas: Iterable['PyksonGenerator.Schema'] = ()):
+            super().__init__()
+            self._positions = {}  # type: Dict[PyksonGenerator.Schema, int]
+            self._indexed_names = {}  # type: Dict[PyksonGenerator.Schema, FrozenSet[str]]
+            self._schemas_by_name = {}  # type: Dict[str, Dict[PyksonGenerator.Schema, None]]
+            self._schemas_without_properties = {}  # type: Dict[PyksonGenerator.Schema, None]
+            self.extend(schemas)
+
+        def __reduce__(self):
+            return PyksonGenerator.SchemaList, (list(self),)
+
+        def append(self, schema: 'PyksonGenerator.Schema'):
+            self._positions[schema] = len(self)
+            super().append(schema)
+            self._indexed_names[schema] = frozenset()
+            self._schemas_without_properties[schema] = None
+            schema._schema_lists.append(self)
+            self._reindex(schema)
+
+        def extend(self, schemas: Iterable['PyksonGenerator.Schema']):
+            for schema in schemas:
+                self.append(schema)
+
+        def _reindex(self, schema: 'PyksonGenerator.Schema'):
+            indexed_names = self._indexed_names[schema]
+            names = schema.get_property_names()
+            if names == indexed_names:
+                return
+            for name in names - indexed_names:
+                self._schemas_by_name.setdefault(name, {})[schema] = None
+            for name in indexed_names - names:
+                del self._schemas_by_name[name][schema]
+            if len(names) == 0:
+                self._schemas_without_properties[schema] = None
+            else:
+                self._schemas_without_properties.pop(schema, None)
+            self._indexed_names[schema] = names
+
+        def find_similar(
+                self,
+                schema: 'PyksonGenerator.Schema',
+                is_sibling_in_list: bool = False
+        ) -> Optional['PyksonGenerator.Schema']:
+            # returns the first similar schema of the list other than schema itself
+            names = schema.get_property_names()
+            if len(names) == 0:
+                candidates = self if not is_sibling_in_list else []
+            else:
+                shared_names_count = {}  # type: Dict[PyksonGenerator.Schema, int]
+                for name in names:
+                    for s in self._schemas_by_name.get(name, ()):
+                        shared_names_count[s] = shared_names_count.get(s, 0) + 1
+                if is_sibling_in_list:
+                    candidates = list(shared_names_count.keys())
+                else:
+                    candidates = [
+                        s for s, count in shared_names_count.items()
+                        if count == len(names) or count == len(self._indexed_names[s])
+                    ]
+                    candidates.extend(self._schemas_without_properties.keys())
+                candidates.sort(key=self._positions.__getitem__)
+            for s in candidates:
+                if s is not schema and schema.is_similar(s, is_sibling_in_list):
+                    return s
+            return None
+
     @staticmethod
     def _is_primitive(element) -> bool:
         if any([isinstance(element, cls) for cls in [int, str, float, bool, bytes]]):
@@ -206,16 +551,14 @@ class PyksonGenerator:
     def _add_schema_to_list_if_does_not_exist(
             schema_list: List['PyksonGenerator.Schema'], new_schema: 'PyksonGenerator.Schema'
     ) -> Optional['PyksonGenerator.Schema']:
-        found_new_schema: bool = False
-        duplicate_schema: Optional[PyksonGenerator.Schema] = None
-        for s in schema_list:
-            if new_schema.is_similar(s):
-                found_new_schema = True
-                s.update_from(new_schema, True)
-                duplicate_schema = s
-                break
-        if found_new_schema is False:
+        if isinstance(schema_list, PyksonGenerator.SchemaList):
+            duplicate_schema = schema_list.find_similar(new_schema)
+        else:
+            duplicate_schema = next((s for s in schema_list if new_schema.is_similar(s)), None)
+        if duplicate_schema is None:
             schema_list.append(new_schema)
+        else:
+            duplicate_schema.update_from(new_schema, True)
         return duplicate_schema
 
     @staticmethod
@@ -224,13 +567,15 @@ class PyksonGenerator:
             name: str,
             sub_schemas: Optional[List['PyksonGenerator.Schema']] = None
     ) -> Tuple['PyksonGenerator.Schema', List['PyksonGenerator.Schema']]:
+        # sub schemas are checked for duplicates once, by the call that created the list
+        is_root = sub_schemas is None
         if sub_schemas is None:
-            sub_schemas: List[PyksonGenerator.Schema] = []
+            sub_schemas = PyksonGenerator.SchemaList()
         properties: List[PyksonGenerator.SchemaProperty] = []
         for key, value in json_object.items():
             if PyksonGenerator._is_primitive(value):
                 properties.append(PyksonGenerator.SchemaProperty(
-                    name=key, type_str=type(value).__name__, values={value}
+                    name=key, type_str=type(value).__name__, sketch=PyksonGenerator.ValueSketch.of(value)
                 ))
             elif value is None:
                 properties.append(
@@ -291,11 +636,12 @@ class PyksonGenerator:
             else:
                 raise Exception(f"Unsupported value {value} of type {type(value)} in {name}")
 
-        for i in range(0, len(sub_schemas)):
-            for j in range(i + 1, len(sub_schemas)):
-                if sub_schemas[i].is_similar(sub_schemas[j]):
+        if is_root:
+            for sub_schema in sub_schemas:
+                duplicate_schema = sub_schemas.find_similar(sub_schema)
+                if duplicate_schema is not None:
                     raise Exception(
-                        f'Found duplicate schemas in final sub schemas {sub_schemas[i]} AND {sub_schemas[j]}'
+                        f'Found duplicate schemas in final sub schemas {duplicate_schema} AND {sub_schema}'
                     )
         return PyksonGenerator.Schema(name=name, properties=properties), sub_schemas
 
@@ -323,11 +669,22 @@ class PyksonGenerator:
         return text
 
     @staticmethod
-    def _is_datetime(value: str):
-        if value is None:
-            return True
+    def _detect_datetime_format(value: str) -> Optional[Union[bool, str]]:
+        # returns the strptime format of value, True if value is a datetime of an unknown layout,
+        # or False if it is not a datetime. Only values which do not match a known layout are parsed by dateutil.
         if len(value) < 8:
             return False
+        for word in _DATETIME_WORD_PATTERN.findall(value):
+            if word.lower() not in _DATETIME_WORDS and not (word.isupper() and len(word) <= 5):
+                return False
+        for pattern, datetime_format in _DATETIME_LAYOUTS:
+            if pattern.fullmatch(value) is not None:
+                # noinspection PyBroadException
+                try:
+                    datetime.datetime.strptime(value, datetime_format)
+                    return datetime_format
+                except Exception:
+                    break
         # noinspection PyBroadException
         try:
             parser.parse(value)
@@ -335,6 +692,12 @@ class PyksonGenerator:
         except Exception:
             return False
 
+    @staticmethod
+    def _is_datetime(value: str):
+        if value is None:
+            return True
+        return PyksonGenerator._detect_datetime_format(value) is not False
+
     @staticmethod
     def _are_all_datetime(values: Set[str]) -> bool:
         if values is None:
@@ -378,10 +741,13 @@ class PyksonGenerator:
                     f'(serialized_name="{p.name}", null={p.nullable})'
                 )
             elif p.type_str == str.__name__:
-                if p.values is not None and len(p.values) > 0 and PyksonGenerator._are_all_datetime(p.values):
+                if p.sketch is not None and p.sketch.are_all_datetime():
+                    datetime_format = p.sketch.datetime_format
                     file_writer.write(
                         f'{indent}{PyksonGenerator._to_snake_case(p.name)} = '
-                        f'pykson.DateTimeField(datetime_format=None, serialized_name="{p.name}", null={p.nullable})'
+                        f'pykson.DateTimeField('
+                        f'datetime_format={"None" if datetime_format is None else repr(datetime_format)}, '
+                        f'serialized_name="{p.name}", null={p.nullable})'
                     )
                 else:
                     file_writer.write(
@@ -418,35 +784,233 @@ class PyksonGenerator:
                                   f'serialized_name="{p.name}", null={p.nullable})')
             file_writer.write('\n')
 
+    @staticmethod
+    def _codec_field_kind(p: 'PyksonGenerator.SchemaProperty') -> Tuple[str, Optional[str]]:
+        # kind of the field written by write_pykson_class for a property, with its item type, class name
+        # or datetime format
+        if p.type_str in [int.__name__, float.__name__, bool.__name__, bytes.__name__]:
+            return p.type_str, None
+        if p.type_str == str.__name__:
+            if p.sketch is not None and p.sketch.are_all_datetime():
+                return 'datetime', p.sketch.datetime_format
+            return str.__name__, None
+        if p.type_str == 'NoneType':
+            return str.__name__, None
+        if p.type_str == list.__name__:
+            if p.item_type_str is None or p.item_type_str == 'NoneType':
+                return list.__name__, None
+            if p.item_type_str in [int.__name__, str.__name__, float.__name__, bool.__name__, bytes.__name__]:
+                return list.__name__, p.item_type_str
+            return 'object_list', PyksonGenerator._schema_name_to_class_name(p.item_type_str)
+        return 'object', PyksonGenerator._schema_name_to_class_name(p.type_str)
 
+    @staticmethod
+    def write_pykson_codecs(
+            schema: 'PyksonGenerator.Schema',
+            sub_schemas: List['PyksonGenerator.Schema'],
+            file_writer: _io.TextIOWrapper,
+            indent: str,
+    ):
+        # writes <class>_from_dict and <class>_to_dict functions for each class, converting values of all fields
+        # inline, so generated modules decode and encode without inspecting field descriptors at runtime
+        i1, i2, i3 = indent, indent * 2, indent * 3
+        file_writer.write(
+            f'def _localize(value):\n'
+            f'{i1}if value.tzinfo is None or value.tzinfo.utcoffset(value) is None:\n'
+            f'{i2}return pytz.utc.localize(value)\n'
+            f'{i1}return value\n'
+        )
+        for s in PyksonGenerator._sort_schemas_by_dependencies(list(sub_schemas)) + [schema]:
+            class_name = PyksonGenerator._schema_name_to_class_name(s.name)
+            function_name = PyksonGenerator._to_snake_case(class_name)
+            keys = ', '.join(json.dumps(p.name) for p in s.properties)
+            file_writer.write('\n\n')
+            file_writer.write(f'_{function_name}_keys = frozenset([{keys}])\n')
+            file_writer.write('\n\n')
+            file_writer.write(f'def {function_name}_from_dict(data: dict, accept_unknown: bool = False) -> '
+                              f'{class_name}:\n')
+            file_writer.write(f'{i1}if not accept_unknown and not _{function_name}_keys.issuperset(data):\n')
+            file_writer.write(f'{i2}raise Exception(\'Unknown keys \' + str(sorted(set(data) - _{function_name}_keys))'
+                              f' + \' for {class_name}\')\n')
+            values = []  # type: List[Tuple[str, str]]
+            for p in s.properties:
+                field_name = PyksonGenerator._to_snake_case(p.name)
+                key = json.dumps(p.name)
+                v = f'{field_name}_value'
+                values.append((key, v))
+                kind, argument = PyksonGenerator._codec_field_kind(p)
+                nullable = p.nullable or p.type_str == 'NoneType'
+                file_writer.write(f'{i1}{v} = data.get({key})\n')
+                if kind == list.__name__:
+                    # list fields are never null, null values are decoded as empty lists
+                    file_writer.write(f'{i1}if {v} is None:\n{i2}{v} = []\n')
+                    file_writer.write(f'{i1}elif not isinstance({v}, list):\n'
+                                      f'{i2}raise TypeError({class_name}, "{field_name}", list, {v})\n')
+                    if argument is not None:
+                        file_writer.write(f'{i1}else:\n'
+                                          f'{i2}{v} = list({v})\n'
+                                          f'{i2}for item in {v}:\n'
+                                          f'{i3}assert isinstance(item, {argument}), '
+                                          f'"ListField items must be of {argument}, found " + str(type(item))\n')
+                    else:
+                        file_writer.write(f'{i1}else:\n{i2}{v} = list({v})\n')
+                    continue
+                if kind == 'object':
+                    file_writer.write(f'{i1}if {v} is not None:\n'
+                                      f'{i2}if not isinstance({v}, dict):\n'
+                                      f'{i3}raise TypeError({class_name}, "{field_name}", dict, {v})\n'
+                                      f'{i2}{v} = {PyksonGenerator._to_snake_case(argument)}_from_dict('
+                                      f'{v}, accept_unknown)\n')
+                    if not nullable:
+                        file_writer.write(f'{i1}else:\n'
+                                          f'{i2}raise TypeError({class_name}, "{field_name}", {argument}, {v})\n')
+                    continue
+                if kind == 'object_list':
+                    file_writer.write(f'{i1}if {v} is not None:\n'
+                                      f'{i2}if not isinstance({v}, list):\n'
+                                      f'{i3}raise TypeError({class_name}, "{field_name}", list, {v})\n'
+                                      f'{i2}{v} = [{PyksonGenerator._to_snake_case(argument)}_from_dict('
+                                      f'item, accept_unknown) for item in {v}]\n')
+                    if not nullable:
+                        file_writer.write(f'{i1}else:\n'
+                                          f'{i2}raise TypeError({class_name}, "{field_name}", list, {v})\n')
+                    continue
+                if kind == float.__name__:
+                    file_writer.write(f'{i1}if isinstance({v}, int):\n{i2}{v} = float({v})\n')
+                    value_type = float.__name__
+                elif kind == 'datetime':
+                    parse = f'parser.parse({v})' if argument is None \
+                        else f'datetime.datetime.strptime({v}, {repr(argument)})'
+                    file_writer.write(f'{i1}if isinstance({v}, str):\n{i2}{v} = _localize({parse})\n')
+                    value_type = 'datetime.datetime'
+                else:
+                    value_type = kind
+                condition = f'not isinstance({v}, {value_type})' if not nullable \
+                    else f'{v} is not None and not isinstance({v}, {value_type})'
+                file_writer.write(f'{i1}if {condition}:\n'
+                                  f'{i2}raise TypeError({class_name}, "{field_name}", {value_type}, {v})\n')
+            file_writer.write(f'{i1}return {class_name}._from_serialized_data({{\n')
+            for key, v in values:
+                file_writer.write(f'{i2}{key}: {v},\n')
+            file_writer.write(f'{i1}}})\n')
+
+            file_writer.write('\n\n')
+            file_writer.write(f'def {function_name}_to_dict(obj: {class_name}) -> dict:\n')
+            file_writer.write(f'{i1}data = obj._data\n')
+            encoded_values = []  # type: List[Tuple[str, str]]
+            for p in s.properties:
+                field_name = PyksonGenerator._to_snake_case(p.name)
+                key = json.dumps(p.name)
+                v = f'{field_name}_value'
+                kind, argument = PyksonGenerator._codec_field_kind(p)
+                if kind == 'datetime':
+                    encode = f'{v}.isoformat()' if argument is None else f'{v}.strftime({repr(argument)})'
+                elif kind == 'object':
+                    encode = f'{PyksonGenerator._to_snake_case(argument)}_to_dict({v})'
+                elif kind == 'object_list':
+                    encode = f'[{PyksonGenerator._to_snake_case(argument)}_to_dict(item) for item in {v}]'
+                elif kind == list.__name__:
+                    encode = f'list({v})'
+                else:
+                    encoded_values.append((key, f'data.get({key})'))
+                    continue
+                file_writer.write(f'{i1}{v} = data.get({key})\n')
+                encoded_values.append((key, f'None if {v} is None else {encode}'))
+            file_writer.write(f'{i1}return {{\n')
+            for key, encoded_value in encoded_values:
+                file_writer.write(f'{i2}{key}: {encoded_value},\n')
+            file_writer.write(f'{i1}}}\n')
 
-    # noinspection PyTypeChecker
     @staticmethod
-    def generate_pykson_classes(
-            json_object: Union[dict, list],
-            base_name: str,
+    def _sort_schemas_by_dependencies(schemas: List['PyksonGenerator.Schema']) -> List['PyksonGenerator.Schema']:
+        # schemas referenced by a schema are placed before it, otherwise schemas keep their order
+        schemas_by_name = {s.name: s for s in schemas}
+        visited = set()  # type: Set[str]
+        sorted_schemas = []  # type: List[PyksonGenerator.Schema]
+
+        def visit(schema: 'PyksonGenerator.Schema'):
+            if schema.name in visited:
+                return
+            visited.add(schema.name)
+            for p in schema.properties:
+                for type_name in [p.type_str, p.item_type_str]:
+                    dependency = schemas_by_name.get(type_name)
+                    if dependency is not None:
+                        visit(dependency)
+            sorted_schemas.append(schema)
+
+        for s in schemas:
+            visit(s)
+        return sorted_schemas
+
+    @staticmethod
+    def pykson_class_sources(
+            schema: 'PyksonGenerator.Schema',
+            sub_schemas: List['PyksonGenerator.Schema'],
             indent: str = '    ',
-            generate_test: bool = False,
             include_todos: bool = True,
+    ) -> Dict[str, str]:
+        # generated code of each class by class name, in module order
+        sources = collections.OrderedDict()
+        for s in PyksonGenerator._sort_schemas_by_dependencies(list(sub_schemas)) + [schema]:
+            class_writer = io.StringIO()
+            PyksonGenerator.write_pykson_class(s, class_writer, indent, include_todos=include_todos)
+            sources[PyksonGenerator._schema_name_to_class_name(s.name)] = class_writer.getvalue()
+        return sources
+
+    @staticmethod
+    def _read_pykson_class_sources(file_path: str) -> Dict[str, str]:
+        sources = {}  # type: Dict[str, str]
+        if not os.path.exists(file_path):
+            return sources
+        class_name = None
+        class_lines = []  # type: List[str]
+        with open(file_path, 'r') as f:
+            for line in itertools.chain(f, ['if __name__']):
+                class_match = re.match(r'class (\w+)\(', line)
+                # class blocks end at the next top level statement
+                if class_match is not None or line[:1] not in ['', ' ', '\t', '\n', '#']:
+                    if class_name is not None:
+                        sources[class_name] = ''.join(class_lines).rstrip('\n') + '\n'
+                    class_name = class_match.group(1) if class_match is not None else None
+                    class_lines = []
+                if class_name is not None:
+                    class_lines.append(line)
+        return sources
+
+    @staticmethod
+    def write_pykson_module(
+            schema: 'PyksonGenerator.Schema',
+            sub_schemas: List['PyksonGenerator.Schema'],
+            file_path: str,
+            indent: str = '    ',
+            include_todos: bool = True,
+            test_json_object: Optional[dict] = None,
+            class_sources: Optional[Dict[str, str]] = None,
+            include_codecs: bool = False,
     ):
-        if isinstance(json_object, list):
-            json_object = {
-                'items': json_object
-            }
-        schema, sub_schemas = PyksonGenerator.generate_schema(json_object, name=base_name)
-        with open(f'pykson_{PyksonGenerator._to_snake_case(base_name)}.generated.py', 'w') as f:
-            f.write('import pykson\n')
+        if class_sources is None:
+            class_sources = PyksonGenerator.pykson_class_sources(schema, sub_schemas, indent, include_todos)
+        with open(file_path, 'w') as f:
+            if include_codecs:
+                f.write('import pytz\n')
+                f.write('import pykson\n')
+                f.write('import datetime\n')
+                if any(PyksonGenerator._codec_field_kind(p) == ('datetime', None)
+                       for s in list(sub_schemas) + [schema] for p in s.properties):
+                    f.write('from dateutil import parser\n')
+            else:
+                f.write('import pykson\n')
             f.write('\n\n')
-            for s_c in sub_schemas:
-                PyksonGenerator.write_pykson_class(s_c, f, indent, include_todos=include_todos)
-                f.write('\n')
-                f.write('\n')
-            PyksonGenerator.write_pykson_class(schema, f, indent, include_todos=include_todos)
-            if generate_test is True:
+            f.write('\n\n'.join(class_sources.values()))
+            if include_codecs:
+                f.write('\n\n')
+                PyksonGenerator.write_pykson_codecs(schema, sub_schemas, f, indent)
+            if test_json_object is not None:
                 f.write('\n')
                 f.write('\n')
                 f.write('if __name__ == "__main__":\n')
-                dumped_string = json.dumps(json_object, indent=indent).replace('\n', f'\n{indent}')
+                dumped_string = json.dumps(test_json_object, indent=indent).replace('\n', f'\n{indent}')
                 dumped_string = dumped_string.replace(': null\n', ': None\n')
                 dumped_string = dumped_string.replace(': false\n', ': False\n')
                 dumped_string = dumped_string.replace(': true\n', ': True\n')
@@ -457,3 +1021,294 @@ class PyksonGenerator:
                 f.write(f'{indent}\n')
                 f.write(f'{indent}obj = pykson.Pykson().from_json(test_json, {schema.name})')
                 f.write('\n')
+
+    # noinspection PyTypeChecker
+    @staticmethod
+    def generate_pykson_classes(
+            json_object: Union[dict, list],
+            base_name: str,
+            indent: str = '    ',
+            generate_test: bool = False,
+            include_todos: bool = True,
+            generate_codecs: bool = False,
+    ):
+        if isinstance(json_object, list):
+            json_object = {
+                'items': json_object
+            }
+        schema, sub_schemas = PyksonGenerator.generate_schema(json_object, name=base_name)
+        PyksonGenerator.write_pykson_module(
+            schema,
+            sub_schemas,
+            f'pykson_{PyksonGenerator._to_snake_case(base_name)}.generated.py',
+            indent,
+            include_todos=include_todos,
+            test_json_object=json_object if generate_test is True else None,
+            include_codecs=generate_codecs,
+        )
+
+    @staticmethod
+    def _rename_schema_references(schema: 'PyksonGenerator.Schema', renames: Dict[str, str]):
+        if len(renames) == 0:
+            return
+        for p in schema.properties:
+            if p.type_str in renames:
+                p.type_str = renames[p.type_str]
+            if p.item_type_str in renames:
+                p.item_type_str = renames[p.item_type_str]
+
+    @staticmethod
+    def merge_schemas(
+            schema: 'PyksonGenerator.Schema',
+            sub_schemas: List['PyksonGenerator.Schema'],
+            other_schema: 'PyksonGenerator.Schema',
+            other_sub_schemas: List['PyksonGenerator.Schema'],
+    ) -> Tuple['PyksonGenerator.Schema', List['PyksonGenerator.Schema']]:
+        # merges schemas inferred from another part of the same corpus into schema and sub_schemas.
+        # sub schemas are listed before the schemas referencing them, so references are renamed before matching.
+        renames = {}  # type: Dict[str, str]
+        sub_schemas_by_name = {s.name: s for s in sub_schemas}
+        for other_sub_schema in other_sub_schemas:
+            PyksonGenerator._rename_schema_references(other_sub_schema, renames)
+            same_name_schema = sub_schemas_by_name.get(other_sub_schema.name)
+            if same_name_schema is not None:
+                # schemas with the same name were inferred from the same path
+                if not same_name_schema.is_similar(other_sub_schema, True):
+                    raise Exception(f'Non similar schemas {same_name_schema} AND {other_sub_schema} '
+                                    f'found for {other_sub_schema.name}')
+                same_name_schema.update_from(other_sub_schema, True)
+                continue
+            duplicate_schema = PyksonGenerator._add_schema_to_list_if_does_not_exist(sub_schemas, other_sub_schema)
+            if duplicate_schema is None:
+                sub_schemas_by_name[other_sub_schema.name] = other_sub_schema
+            elif duplicate_schema.name != other_sub_schema.name:
+                renames[other_sub_schema.name] = duplicate_schema.name
+        PyksonGenerator._rename_schema_references(other_schema, renames)
+        schema.update_from(other_schema, True)
+        return schema, sub_schemas
+
+    @staticmethod
+    def iter_json_files(paths: Union[str, List[str]]) -> Iterator[str]:
+        if isinstance(paths, str):
+            paths = [paths]
+        for path in paths:
+            if os.path.isdir(path):
+                for directory, _, file_names in sorted(os.walk(path)):
+                    for file_name in sorted(file_names):
+                        if strip_compression_extension(file_name).endswith(PyksonGenerator._json_file_extensions):
+                            yield os.path.join(directory, file_name)
+            else:
+                yield path
+
+    _json_file_extensions = ('.json', '.ndjson', '.jsonl')
+    _ndjson_file_extensions = ('.ndjson', '.jsonl')
+
+    @staticmethod
+    def iter_json_records(paths: Union[str, List[str]]) -> Iterator[dict]:
+        # ndjson files are streamed line by line, json files contain a single object or a list of objects. Compressed
+        # files are decompressed while they are read
+        for file_path in PyksonGenerator.iter_json_files(paths):
+            with open_file(file_path, 'r') as f:
+                if strip_compression_extension(file_path).endswith(PyksonGenerator._ndjson_file_extensions):
+                    for line in f:
+                        if line.strip():
+                            yield json.loads(line)
+                else:
+                    document = json.load(f)
+                    if isinstance(document, list):
+                        for record in document:
+                            yield record
+                    else:
+                        yield document
+
+    @staticmethod
+    def _iter_chunks(records: Iterable[dict], chunk_size: int) -> Iterator[List[dict]]:
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if len(chunk) > 0:
+            yield chunk
+
+    @staticmethod
+    def generate_schema_from_records(
+            records: Iterable[dict],
+            base_name: str,
+            chunk_size: int = 10000,
+            processes: Optional[int] = 1,
+    ) -> Tuple['PyksonGenerator.Schema', List['PyksonGenerator.Schema']]:
+        # records are wrapped in an items list like generate_pykson_classes does for lists, each chunk schema is
+        # inferred separately (in a process pool when processes is not 1) and merged in chunk order
+        result = None  # type: Optional[Tuple[PyksonGenerator.Schema, List[PyksonGenerator.Schema]]]
+        chunks = PyksonGenerator._iter_chunks(records, chunk_size)
+        if processes == 1:
+            for chunk in chunks:
+                chunk_result = PyksonGenerator.generate_schema({'items': chunk}, base_name)
+                result = chunk_result if result is None else PyksonGenerator.merge_schemas(*result, *chunk_result)
+        else:
+            with multiprocessing.Pool(processes) as pool:
+                # a bounded number of chunks is in flight, so memory does not depend on corpus size
+                max_pending = 2 * (processes or os.cpu_count() or 1)
+                pending = collections.deque()
+                for chunk in chunks:
+                    pending.append(pool.apply_async(_generate_chunk_schema, (chunk, base_name)))
+                    while len(pending) >= max_pending:
+                        chunk_result = pickle.loads(pending.popleft().get())
+                        result = chunk_result if result is None else \
+                            PyksonGenerator.merge_schemas(*result, *chunk_result)
+                while len(pending) > 0:
+                    chunk_result = pickle.loads(pending.popleft().get())
+                    result = chunk_result if result is None else PyksonGenerator.merge_schemas(*result, *chunk_result)
+        if result is None:
+            raise PyksonGenerator.ValidationError('No records found to generate schema')
+        return result
+
+    @staticmethod
+    def generate_pykson_classes_from_files(
+            paths: Union[str, List[str]],
+            base_name: str,
+            output_path: Optional[str] = None,
+            indent: str = '    ',
+            include_todos: bool = True,
+            chunk_size: int = 10000,
+            processes: Optional[int] = 1,
+            generate_codecs: bool = False,
+    ) -> str:
+        schema, sub_schemas = PyksonGenerator.generate_schema_from_records(
+            PyksonGenerator.iter_json_records(paths), base_name, chunk_size=chunk_size, processes=processes
+        )
+        if output_path is None:
+            output_path = f'pykson_{PyksonGenerator._to_snake_case(base_name)}.generated.py'
+        PyksonGenerator.write_pykson_module(
+            schema, sub_schemas, output_path, indent, include_todos=include_todos, include_codecs=generate_codecs
+        )
+        return output_path
+
+    @staticmethod
+    def save_schemas(
+            schema: 'PyksonGenerator.Schema',
+            sub_schemas: List['PyksonGenerator.Schema'],
+            file_path: str,
+            class_sources: Optional[Dict[str, str]] = None,
+    ):
+        with open(file_path, 'w') as f:
+            json.dump({
+                'version': 1,
+                'schema': schema.json_repr(include_state=True),
+                'sub_schemas': [s.json_repr(include_state=True) for s in sub_schemas],
+                'classes': class_sources or {},
+            }, f)
+
+    @staticmethod
+    def load_schemas(
+            file_path: str
+    ) -> Tuple['PyksonGenerator.Schema', List['PyksonGenerator.Schema'], Dict[str, str]]:
+        # returns schema, sub schemas and the class sources generated when they were saved
+        with open(file_path, 'r') as f:
+            saved = json.load(f)
+        if saved.get('version') != 1:
+            raise Exception(f'Unsupported schemas file version {saved.get("version")} in {file_path}')
+        return (
+            PyksonGenerator.Schema.from_json_repr(saved['schema']),
+            PyksonGenerator.SchemaList(PyksonGenerator.Schema.from_json_repr(s) for s in saved['sub_schemas']),
+            saved['classes'],
+        )
+
+    @staticmethod
+    def update_pykson_classes_from_files(
+            paths: Union[str, List[str]],
+            base_name: str,
+            schemas_path: str,
+            output_path: Optional[str] = None,
+            indent: str = '    ',
+            include_todos: bool = True,
+            chunk_size: int = 10000,
+            processes: Optional[int] = 1,
+            generate_codecs: bool = False,
+    ) -> List[str]:
+        # merges new records into the schemas saved in schemas_path (if it exists) and saves the result.
+        # Only classes whose generated code changed are rewritten in the output module, others keep their code
+        # in the existing module, including manual changes. Returns names of the changed classes.
+        schema, sub_schemas = PyksonGenerator.generate_schema_from_records(
+            PyksonGenerator.iter_json_records(paths), base_name, chunk_size=chunk_size, processes=processes
+        )
+        previous_class_sources = {}  # type: Dict[str, str]
+        if os.path.exists(schemas_path):
+            saved_schema, saved_sub_schemas, previous_class_sources = PyksonGenerator.load_schemas(schemas_path)
+            schema, sub_schemas = PyksonGenerator.merge_schemas(saved_schema, saved_sub_schemas, schema, sub_schemas)
+        if output_path is None:
+            output_path = f'pykson_{PyksonGenerator._to_snake_case(base_name)}.generated.py'
+        class_sources = PyksonGenerator.pykson_class_sources(schema, sub_schemas, indent, include_todos)
+        existing_class_sources = PyksonGenerator._read_pykson_class_sources(output_path)
+        changed_class_names = []  # type: List[str]
+        module_class_sources = collections.OrderedDict()
+        for class_name, class_source in class_sources.items():
+            if previous_class_sources.get(class_name) == class_source and class_name in existing_class_sources:
+                module_class_sources[class_name] = existing_class_sources[class_name]
+            else:
+                module_class_sources[class_name] = class_source
+                changed_class_names.append(class_name)
+        if len(changed_class_names) > 0 or len(existing_class_sources) != len(class_sources) or generate_codecs:
+            PyksonGenerator.write_pykson_module(
+                schema, sub_schemas, output_path, indent, class_sources=module_class_sources,
+                include_codecs=generate_codecs
+            )
+        PyksonGenerator.save_schemas(schema, sub_schemas, schemas_path, class_sources=class_sources)
+        return changed_class_names
+
+
+def _generate_chunk_schema(chunk: List[dict], base_name: str) -> bytes:
+    # schemas are nested classes, they are pickled with protocol 4 which supports qualified names
+    return pickle.dumps(PyksonGenerator.generate_schema({'items': chunk}, base_name), protocol=4)
+
+
+def main(argv: Optional[List[str]] = None):
+    argument_parser = argparse.ArgumentParser(
+        prog='python -m pykson.generator',
+        description='Generate pykson classes from json, ndjson files or directories of json files'
+    )
+    argument_parser.add_argument('paths', nargs='+', help='json, ndjson files or directories')
+    argument_parser.add_argument('-n', '--name', required=True, help='base name of generated classes')
+    argument_parser.add_argument('-o', '--output', default=None, help='generated module path')
+    argument_parser.add_argument('--chunk-size', type=int, default=10000, help='records per inferred chunk')
+    argument_parser.add_argument('-p', '--processes', type=int, default=1,
+                                 help='worker processes, 0 to use all cpus')
+    argument_parser.add_argument('--indent', type=int, default=4, help='indent size of generated code')
+    argument_parser.add_argument('--no-todos', action='store_true', help='do not write todo comments')
+    argument_parser.add_argument('--codecs', action='store_true',
+                                 help='also generate from_dict and to_dict functions of classes')
+    argument_parser.add_argument('-s', '--schemas', default=None,
+                                 help='schemas file to merge the records into, created if it does not exist')
+    args = argument_parser.parse_args(argv)
+    if args.schemas is not None:
+        changed_class_names = PyksonGenerator.update_pykson_classes_from_files(
+            args.paths,
+            args.name,
+            args.schemas,
+            output_path=args.output,
+            indent=' ' * args.indent,
+            include_todos=not args.no_todos,
+            chunk_size=args.chunk_size,
+            processes=args.processes or None,
+            generate_codecs=args.codecs,
+        )
+        for class_name in changed_class_names:
+            sys.stdout.write(class_name + '\n')
+        return
+    output_path = PyksonGenerator.generate_pykson_classes_from_files(
+        args.paths,
+        args.name,
+        output_path=args.output,
+        indent=' ' * args.indent,
+        include_todos=not args.no_todos,
+        chunk_size=args.chunk_size,
+        processes=args.processes or None,
+        generate_codecs=args.codecs,
+    )
+    sys.stdout.write(output_path + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+import json
+import decimal
+import datetime
+import itertools
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Optional, Sequence, Tuple, Type, Union
+
+from pykson import Pykson, JsonObject, PyksonEncoder, Field, FunctionField, IntegerField, FloatField, BooleanField, \
+    StringField, BytesField, ByteArrayField, MultipleChoiceStringField, EnumStringField, MultipleChoiceIntegerField, \
+    EnumIntegerField, DateField, DateTimeField, TimestampSecondsField, TimestampMillisecondsField, DecimalField, \
+    UUIDField, JsonField, ListField, ObjectField, ObjectListField, T, _iter_cursor_rows
+
+# Tables store one row per object and one column per data field, named by the serialized name of the field:
+#   integer, enum and boolean fields as INTEGER, float fields as REAL, string fields as TEXT, binary fields as BLOB,
+#   uuids as 16 bytes BLOB, decimals as TEXT, dates as 'YYYY-MM-DD' TEXT, datetimes and timestamps in UTC as
+#   'YYYY-MM-DD HH:MM:SS.ffffff' TEXT (sortable and understood by sqlite date functions), json fields, lists and
+#   nested objects as json TEXT. Other fields are stored using their json formatted value.
+
+_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+_DATE_FORMAT = '%Y-%m-%d'
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _encode_datetime(field: Field) -> Callable[[Any], Any]:
+    def encode(value):
+        value = field.get_native_formatted_value(value)
+        return value.astimezone(datetime.timezone.utc).strftime(_DATETIME_FORMAT)
+    return encode
+
+
+def _decode_datetime(value: str) -> datetime.datetime:
+    # stored values have fixed positions, slicing them is several times faster than strptime
+    return datetime.datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]), int(value[11:13]),
+                             int(value[14:16]), int(value[17:19]), int(value[20:26]), datetime.timezone.utc)
+
+
+def _decode_date(value: str) -> datetime.date:
+    return datetime.date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+
+
+def _encode_json(value) -> str:
+    return json.dumps(value, cls=PyksonEncoder, separators=(',', ':'), ensure_ascii=False)
+
+
+class _Column:
+    def __init__(self, field: Field, sql_type: str, encode: Optional[Callable[[Any], Any]],
+                 decode: Optional[Callable[[Any], Any]]):
+        self.field = field
+        self.name = field.serialized_name
+        self.sql_type = sql_type
+        # encode converts non null values to the stored value, decode converts stored values back to values the
+        # field accepts. None when values are stored as they are
+        self.encode = encode
+        self.decode = decode
+
+    def definition(self) -> str:
+        return ' '.join([_quote(self.name)] + ([self.sql_type] if self.sql_type else []) +
+                        ([] if self.field.null else ['NOT NULL']))
+
+
+def _column(field: Field, pykson: Pykson) -> Optional[_Column]:
+    if isinstance(field, FunctionField):
+        return None
+    if isinstance(field, (IntegerField, MultipleChoiceIntegerField, EnumIntegerField)):
+        return _Column(field, 'INTEGER', None, None)
+    if isinstance(field, FloatField):
+        return _Column(field, 'REAL', None, None)
+    if isinstance(field, BooleanField):
+        return _Column(field, 'INTEGER', None, bool)
+    if isinstance(field, (StringField, MultipleChoiceStringField, EnumStringField)):
+        return _Column(field, 'TEXT', None, None)
+    if isinstance(field, (BytesField, ByteArrayField)):
+        return _Column(field, 'BLOB', None, None)
+    if isinstance(field, UUIDField):
+        # uuid fields accept their 16 bytes
+        return _Column(field, 'BLOB', lambda value: value.bytes, None)
+    if isinstance(field, DecimalField):
+        return _Column(field, 'TEXT', str, decimal.Decimal)
+    if isinstance(field, (DateTimeField, TimestampSecondsField, TimestampMillisecondsField)):
+        return _Column(field, 'TEXT', _encode_datetime(field), _decode_datetime)
+    if isinstance(field, DateField):
+        return _Column(field, 'TEXT', lambda value: value.strftime(_DATE_FORMAT), _decode_date)
+    if isinstance(field, JsonField):
+        return _Column(field, 'TEXT', _encode_json, json.loads)
+    if isinstance(field, ListField):
+        # json text of lists and nested objects is decoded by Pykson.from_rows
+        return _Column(field, 'TEXT', lambda value: _encode_json(field.get_json_formatted_value(value)), None)
+    if isinstance(field, (ObjectField, ObjectListField)):
+        # noinspection PyProtectedMember
+        return _Column(field, 'TEXT', lambda value: _encode_json(pykson._to_json(value)), None)
+    # times, jalali dates and custom fields, decoded by the field as in from_json
+    return _Column(field, '', field.get_json_formatted_value, None)
+
+
+class SqliteTable(Generic[T]):
+    # a sqlite table of objects of cls on a sqlite3 connection, see the layout above. table_name defaults to the name
+    # of the class. Objects of sub-classes are stored with the fields of cls
+    def __init__(self, connection, cls: Type[T], table_name: Optional[str] = None, pykson: Optional[Pykson] = None):
+        assert issubclass(cls, JsonObject), 'cls must be subclass of JsonObject'
+        assert cls != JsonObject, 'Cannot convert to JsonObject'
+        self.connection = connection
+        self.cls = cls
+        self.table_name = cls.__name__ if table_name is None else table_name
+        self.pykson = Pykson() if pykson is None else pykson
+        columns = [_column(f, self.pykson) for f in cls._pykson_data_fields]
+        self.columns = [c for c in columns if c is not None]  # type: List[_Column]
+        self.column_names = [c.name for c in self.columns]
+        self._columns_by_field_name = {}  # type: Dict[str, _Column]
+        for c in self.columns:
+            self._columns_by_field_name[c.field.name] = c
+            self._columns_by_field_name[c.name] = c
+        self._column_decoders = {c.name: c.decode for c in self.columns if c.decode is not None}
+        self._encoders = [(c.name, c.field.default_value, c.encode) for c in self.columns]
+        self._select_columns = ', '.join([_quote(n) for n in self.column_names])
+        self._insert_sql = 'INSERT INTO ' + _quote(self.table_name) + ' (' + self._select_columns + ') VALUES (' + \
+                           ', '.join(['?'] * len(self.columns)) + ')'
+
+    def _column_name(self, field_name: str) -> str:
+        column = self._columns_by_field_name.get(field_name)
+        if column is None:
+            raise Exception('Field ' + str(field_name) + ' is not a column of table ' + str(self.table_name))
+        return column.name
+
+    def create(self, indexes: Sequence[Union[str, Sequence[str]]] = (), if_not_exists: bool = True):
+        # creates the table and an index for each field name or sequence of field names in indexes
+        self.connection.execute('CREATE TABLE ' + ('IF NOT EXISTS ' if if_not_exists else '') +
+                                _quote(self.table_name) + ' (' +
+                                ', '.join([c.definition() for c in self.columns]) + ')')
+        for index in indexes:
+            self.create_index(index, if_not_exists=if_not_exists)
+
+    def create_index(self, fields: Union[str, Sequence[str]], unique: bool = False, if_not_exists: bool = True,
+                     index_name: Optional[str] = None):
+        # fields are attribute names or serialized names, index_name defaults to the table and column names
+        if isinstance(fields, str):
+            fields = [fields]
+        column_names = [self._column_name(f) for f in fields]
+        if index_name is None:
+            index_name = '_'.join(['ix', self.table_name] + column_names)
+        self.connection.execute('CREATE ' + ('UNIQUE ' if unique else '') + 'INDEX ' +
+                                ('IF NOT EXISTS ' if if_not_exists else '') + _quote(index_name) + ' ON ' +
+                                _quote(self.table_name) + ' (' + ', '.join([_quote(n) for n in column_names]) + ')')
+
+    def _row(self, item: T) -> Tuple[Any, ...]:
+        if not isinstance(item, self.cls):
+            raise Exception('Cannot insert ' + str(type(item)) + ' into table ' + str(self.table_name) + ' of ' +
+                            str(self.cls))
+        # noinspection PyProtectedMember
+        data = item._data
+        row = []
+        for name, default, encode in self._encoders:
+            value = data.get(name, default)
+            row.append(value if encode is None or value is None else encode(value))
+        return tuple(row)
+
+    def insert(self, items: Iterable[T], batch_size: int = 1000) -> int:
+        # inserts items with executemany, committing each batch of batch_size rows in its own transaction. Returns
+        # the number of inserted rows
+        count = 0
+        items = iter(items)
+        while True:
+            rows = [self._row(item) for item in itertools.islice(items, batch_size)]
+            if not rows:
+                return count
+            self._insert_batch(rows)
+            count += len(rows)
+
+    def _insert_batch(self, rows: List[Tuple[Any, ...]]):
+        connection = self.connection
+        if connection.in_transaction:
+            # uncommitted changes of the connection are committed with the batch
+            with connection:
+                connection.executemany(self._insert_sql, rows)
+            return
+        # the transaction is begun explicitly, connections in autocommit mode (isolation_level=None) would commit each
+        # row on its own
+        connection.execute('BEGIN')
+        try:
+            connection.executemany(self._insert_sql, rows)
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def select(self, where: Optional[str] = None, parameters: Sequence[Any] = (), order_by: Optional[str] = None,
+               limit: Optional[int] = None, batch_size: int = 1000) -> Iterator[T]:
+        # yields objects of the rows matching where, fetched batch_size rows at a time. where and order_by are sql
+        # expressions of the column names, which are the serialized names of the fields
+        sql = 'SELECT ' + self._select_columns + ' FROM ' + _quote(self.table_name)
+        if where is not None:
+            sql += ' WHERE ' + where
+        if order_by is not None:
+            sql += ' ORDER BY ' + order_by
+        if limit is not None:
+            sql += ' LIMIT ' + str(int(limit))
+        cursor = self.connection.execute(sql, parameters)
+        # noinspection PyProtectedMember
+        return self.pykson._iter_rows(_iter_cursor_rows(cursor, batch_size), self.cls, self.column_names, False,
+                                      False, self._column_decoders)
+
+    def count(self, where: Optional[str] = None, parameters: Sequence[Any] = ()) -> int:
+        sql = 'SELECT COUNT(*) FROM ' + _quote(self.table_name)
+        if where is not None:
+            sql += ' WHERE ' + where
+        return self.connection.execute(sql, parameters).fetchone()[0]
+
+    def drop(self, if_exists: bool = True):
+        self.connection.execute('DROP TABLE ' + ('IF EXISTS ' if if_exists else '') + _quote(self.table_name))
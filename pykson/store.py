@@ -0,0 +1,216 @@
+import os
+import re
+import sys
+import json
+import mmap
+import array
+import struct
+import tempfile
+from typing import Any, Dict, Generic, Iterator, List, Optional, Type, Union
+
+from pykson import Pykson, JsonObject, PyksonEncoder, T, JsonField, ListField, ObjectField, ObjectListField
+
+# Offsets index file layout: header (magic, indexed file size, indexed file mtime in nanoseconds) followed by
+# the start offsets of the non empty lines as little endian unsigned 64 bit integers. Indexes of a file which has
+# changed since they were written are rebuilt.
+_OFFSETS_HEADER = struct.Struct('<4sQQ')
+_OFFSETS_MAGIC = b'PKI1'
+# whitespace removed by bytes.strip
+_WHITESPACE = frozenset(b' \t\n\r\x0b\x0c')
+_NON_WHITESPACE = re.compile(rb'[^ \t\n\r\x0b\x0c]')
+
+
+def _remove(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _write_index(path: str, mode: str, write):
+    # indexes are written to a temporary file renamed over path, so a crash cannot leave a partly written index. They
+    # are only a cache, indexes which cannot be written (e.g. in read only directories) are kept in memory
+    try:
+        fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + '.',
+                                              suffix='.tmp')
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+        os.replace(temporary_path, path)
+    except OSError:
+        _remove(temporary_path)
+    except BaseException:
+        _remove(temporary_path)
+        raise
+
+
+class PyksonStore(Generic[T]):
+    def __init__(self,
+                 path: str,
+                 cls: Type[T],
+                 key_field: Optional[str] = None,
+                 pykson: Optional[Pykson] = None,
+                 accept_unknown: bool = False,
+                 persist_index: bool = True):
+        assert issubclass(cls, JsonObject), 'cls must be subclass of JsonObject'
+        assert cls != JsonObject, 'Cannot convert to JsonObject'
+        self.path = path
+        self.cls = cls
+        self.key_field = key_field
+        self.pykson = pykson if pykson is not None else Pykson()
+        self.accept_unknown = accept_unknown
+        self.persist_index = persist_index
+        self._file = open(path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        self._size = stat.st_size
+        self._mtime_ns = stat.st_mtime_ns
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._size > 0 else b''
+        self._offsets = self._load_offsets()
+        self._keys = None  # type: Optional[Dict[Any, int]]
+        if key_field is not None:
+            fields_by_name = {f.name: f for f in cls._pykson_fields}
+            if key_field not in fields_by_name:
+                raise Exception('Key field ' + str(key_field) + ' is not a field of class ' + str(cls))
+            self._key_field = fields_by_name[key_field]
+            if isinstance(self._key_field, (JsonField, ListField, ObjectField, ObjectListField)):
+                raise Exception('Key field ' + str(key_field) + ' of class ' + str(cls) + ' must have scalar values')
+            self._key_serialized_name = self._key_field.serialized_name
+            self._keys = self._load_keys()
+
+    @property
+    def offsets_index_path(self) -> str:
+        return self.path + '.offsets'
+
+    @property
+    def keys_index_path(self) -> str:
+        return self.path + '.' + str(self.key_field) + '.keys'
+
+    def _load_offsets(self) -> array.array:
+        if self.persist_index and os.path.exists(self.offsets_index_path):
+            with open(self.offsets_index_path, 'rb') as f:
+                header = f.read(_OFFSETS_HEADER.size)
+                if len(header) == _OFFSETS_HEADER.size and \
+                        _OFFSETS_HEADER.unpack(header) == (_OFFSETS_MAGIC, self._size, self._mtime_ns):
+                    offsets = array.array('Q')
+                    offsets.frombytes(f.read())
+                    if sys.byteorder == 'big':
+                        offsets.byteswap()
+                    return offsets
+        offsets = self._build_offsets()
+        if self.persist_index:
+            stored = offsets
+            if sys.byteorder == 'big':
+                stored = array.array('Q', offsets)
+                stored.byteswap()
+
+            def write(f):
+                f.write(_OFFSETS_HEADER.pack(_OFFSETS_MAGIC, self._size, self._mtime_ns))
+                stored.tofile(f)
+            _write_index(self.offsets_index_path, 'wb', write)
+        return offsets
+
+    def _build_offsets(self) -> array.array:
+        offsets = array.array('Q')
+        mm = self._mm
+        size = self._size
+        position = 0
+        while position < size:
+            end = mm.find(b'\n', position)
+            if end == -1:
+                end = size
+            # lines are checked in place, without copying them
+            if end > position and (mm[position] not in _WHITESPACE or
+                                   _NON_WHITESPACE.search(mm, position, end) is not None):
+                offsets.append(position)
+            position = end + 1
+        return offsets
+
+    def _load_keys(self) -> Dict[Any, int]:
+        if self.persist_index and os.path.exists(self.keys_index_path):
+            with open(self.keys_index_path, 'r') as f:
+                persisted = json.load(f)
+            if persisted.get('size') == self._size and persisted.get('mtime_ns') == self._mtime_ns:
+                return {k: i for k, i in persisted['keys']}
+        keys = {}
+        for i in range(len(self._offsets)):
+            key = json.loads(self._raw(i)).get(self._key_serialized_name)
+            if isinstance(key, (list, dict)):
+                raise Exception('Key ' + str(self.key_field) + ' of record ' + str(i) + ' in ' + str(self.path) +
+                                ' is not a scalar value')
+            # later lines win over earlier lines with the same key
+            keys[key] = i
+        if self.persist_index:
+            _write_index(self.keys_index_path, 'w', lambda f: json.dump(
+                {'size': self._size, 'mtime_ns': self._mtime_ns, 'keys': list(keys.items())}, f))
+        return keys
+
+    def _index_key(self, key):
+        # keys are indexed by their json values, other values (e.g. uuids or datetimes) are converted to them with the
+        # key field
+        if key is None or isinstance(key, (str, int, float, bool)):
+            return key
+        return json.loads(json.dumps(self._key_field.get_json_formatted_value(key), cls=PyksonEncoder))
+
+    def _raw(self, index: int) -> bytes:
+        start = self._offsets[index]
+        end = self._mm.find(b'\n', start)
+        if end == -1:
+            end = self._size
+        return self._mm[start:end]
+
+    def raw(self, index: int) -> bytes:
+        if index < 0:
+            index += len(self._offsets)
+        if index < 0 or index >= len(self._offsets):
+            raise IndexError('PyksonStore index out of range')
+        return self._raw(index)
+
+    def _decode(self, index: int) -> T:
+        return self.pykson.from_json(json.loads(self._raw(index)), self.cls, accept_unknown=self.accept_unknown)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, List[T]]:
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(*index.indices(len(self._offsets)))]
+        if index < 0:
+            index += len(self._offsets)
+        if index < 0 or index >= len(self._offsets):
+            raise IndexError('PyksonStore index out of range')
+        return self._decode(index)
+
+    def __iter__(self) -> Iterator[T]:
+        for i in range(len(self._offsets)):
+            yield self._decode(i)
+
+    def __contains__(self, key) -> bool:
+        if self._keys is None:
+            raise Exception('PyksonStore was created without key_field')
+        return self._index_key(key) in self._keys
+
+    def get(self, key, default: Optional[T] = None) -> Optional[T]:
+        if self._keys is None:
+            raise Exception('PyksonStore was created without key_field')
+        index = self._keys.get(self._index_key(key))
+        if index is None:
+            return default
+        return self._decode(index)
+
+    def keys(self) -> List[Any]:
+        if self._keys is None:
+            raise Exception('PyksonStore was created without key_field')
+        return list(self._keys.keys())
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self) -> 'PyksonStore[T]':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
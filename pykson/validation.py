@@ -0,0 +1,394 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from pykson import JsonObject, Field, FunctionField, IntegerField, FloatField, BooleanField, StringField, \
+    BytesField, ByteArrayField, MultipleChoiceStringField, EnumStringField, MultipleChoiceIntegerField, \
+    EnumIntegerField, DateField, TimeField, DateTimeField, JDateField, JDateTimeField, TimestampSecondsField, \
+    TimestampMillisecondsField, DecimalField, UUIDField, JsonField, ListField, ObjectField, ObjectListField, T
+
+# Validators check parsed json (dicts and lists) against the fields of a JsonObject class without creating objects.
+# The checks of a class and of its nested classes are generated as python source and compiled once per class, fields
+# of the builtin types are checked inline and other fields (dates, uuids, custom fields...) by calling their __set__ in
+# test mode, so values are accepted exactly when Pykson.from_json would accept them.
+
+_LIST_ITEM_TYPE_NAMES = {
+    int: 'integer',
+    float: 'float',
+    bool: 'boolean',
+    str: 'string',
+}
+_BOOLEAN_STRINGS = ('True', 'False', 'true', 'false')
+_JSON_SCHEMA_DIALECT = 'https://json-schema.org/draft/2020-12/schema'
+
+
+class ValidationError(Exception):
+    def __init__(self, errors: List[Tuple[str, str]]):
+        super(ValidationError, self).__init__('; '.join([path + ': ' + message for path, message in errors]))
+        # (json path, message) of each invalid value
+        self.errors = errors
+
+
+def _key_path(path: str, key: Any) -> str:
+    if isinstance(key, str) and key.isidentifier():
+        return path + '.' + key
+    return path + '[' + json.dumps(key) + ']'
+
+
+def _type_name(value: Any) -> str:
+    if value is None:
+        return 'null'
+    if isinstance(value, dict):
+        return 'object'
+    if isinstance(value, list):
+        return 'array'
+    return type(value).__name__
+
+
+def _field_error(field: Field, value: Any) -> Optional[str]:
+    try:
+        field.__set__(None, value, True)
+    except TypeError as e:
+        if len(e.args) == 4:
+            return 'expected ' + getattr(e.args[2], '__name__', str(e.args[2])) + ', found ' + _type_name(value)
+        return str(e)
+    except Exception as e:
+        return str(e) or 'invalid value ' + repr(value)
+    return None
+
+
+def _child_objects(cls: type) -> Dict[str, JsonObject]:
+    # nested objects declared as class attributes instead of ObjectFields
+    children = {}  # type: Dict[str, JsonObject]
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if isinstance(value, JsonObject):
+                children[name] = value
+    return children
+
+
+class _ValidatorCompiler:
+    def __init__(self, accept_unknown: bool):
+        self.accept_unknown = accept_unknown
+        self.function_names = {}  # type: Dict[type, str]
+        self.functions = []  # type: List[List[str]]
+        self.namespace = {
+            '_field_error': _field_error,
+            '_key_path': _key_path,
+            '_type_name': _type_name,
+        }  # type: Dict[str, Any]
+
+    def constant(self, value: Any) -> str:
+        name = '_c' + str(len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def add_class(self, cls: type) -> str:
+        name = self.function_names.get(cls)
+        if name is not None:
+            return name
+        name = '_validate_' + str(len(self.function_names)) + '_' + cls.__name__
+        self.function_names[cls] = name
+        lines = ['def ' + name + '(data, path, errors):']
+        known_keys = set()
+        for field in cls._pykson_fields:
+            known_keys.add(field.serialized_name)
+            path = 'path + ' + repr(_key_path('', field.serialized_name))
+            if isinstance(field, FunctionField):
+                lines.append('    if ' + repr(field.serialized_name) + ' in data:')
+                lines.append('        errors.append((' + path + ', \'cannot set value of a FunctionField\'))')
+                continue
+            lines.append('    v = data.get(' + repr(field.serialized_name) + ')')
+            lines.append('    if v is not None:')
+            lines.extend(['        ' + line for line in self.value_checks(field, 'v', path, 0)])
+            if isinstance(field, ListField):
+                # from_json decodes null lists to empty lists, also for fields which are not nullable
+                continue
+            if not field.null and field.default_value is None:
+                lines.append('    else:')
+                lines.append('        errors.append((' + path + ', \'null value for not nullable field\' if ' +
+                             repr(field.serialized_name) + ' in data else \'missing value\'))')
+            elif not field.null:
+                lines.append('    elif ' + repr(field.serialized_name) + ' in data:')
+                lines.append('        errors.append((' + path + ', \'null value for not nullable field\'))')
+        for child_name, child in _child_objects(cls).items():
+            known_keys.add(child_name)
+            lines.append('    v = data.get(' + repr(child_name) + ')')
+            lines.append('    if isinstance(v, dict):')
+            lines.append('        ' + self.add_class(type(child)) + '(v, path + ' + repr(_key_path('', child_name)) +
+                         ', errors)')
+        if not self.accept_unknown:
+            keys = self.constant(frozenset(known_keys))
+            lines.append('    if not ' + keys + '.issuperset(data):')
+            lines.append('        for key in data:')
+            lines.append('            if key not in ' + keys + ':')
+            lines.append('                errors.append((_key_path(path, key), \'unknown field\'))')
+        if len(lines) == 1:
+            lines.append('    pass')
+        self.functions.append(lines)
+        return name
+
+    def value_checks(self, field: Field, value: str, path: str, level: int) -> List[str]:
+        # lines checking value, a variable holding a value which is not None. level is the nesting level of lists,
+        # used to name loop variables
+        field_class = type(field)
+
+        def error(message: str) -> str:
+            return 'errors.append((' + path + ', ' + message + '))'
+
+        def expected(type_name: str) -> str:
+            return error('\'expected ' + type_name + ', found \' + _type_name(' + value + ')')
+
+        lines = []
+        if field_class is IntegerField or field_class is FloatField:
+            python_type, type_name, parse = (int, 'integer', 'int') if field_class is IntegerField \
+                else (float, 'float', 'float')
+            if field.accepts_string:
+                lines.append('if isinstance(' + value + ', str) and ' + value + ' != \'\':')
+                lines.append('    try:')
+                lines.append('        ' + value + ' = ' + parse + '(' + value + ')')
+                lines.append('    except ValueError:')
+                lines.append('        pass')
+            if field_class is FloatField and field.accepts_int:
+                lines.append('if isinstance(' + value + ', int):')
+                lines.append('    ' + value + ' = float(' + value + ')')
+            lines.append('if not isinstance(' + value + ', ' + python_type.__name__ + '):')
+            lines.append('    ' + expected(type_name))
+            if field.min_value is not None:
+                lines.append('elif ' + value + ' < ' + self.constant(field.min_value) + ':')
+                lines.append('    ' + error('\'value \' + repr(' + value + ') + ' +
+                                            self.constant(' is less than ' + repr(field.min_value))))
+            if field.max_value is not None:
+                lines.append('elif ' + value + ' > ' + self.constant(field.max_value) + ':')
+                lines.append('    ' + error('\'value \' + repr(' + value + ') + ' +
+                                            self.constant(' is greater than ' + repr(field.max_value))))
+        elif field_class is BooleanField:
+            if field.accepts_string:
+                lines.append('if not (isinstance(' + value + ', bool) or (isinstance(' + value + ', str) and ' +
+                             value + ' in ' + repr(_BOOLEAN_STRINGS) + ')):')
+            else:
+                lines.append('if not isinstance(' + value + ', bool):')
+            lines.append('    ' + expected('boolean'))
+        elif field_class is StringField:
+            if field.accepts_non_string:
+                return []
+            lines.append('if not isinstance(' + value + ', str):')
+            lines.append('    ' + expected('string'))
+        elif field_class in (MultipleChoiceStringField, EnumStringField, MultipleChoiceIntegerField,
+                             EnumIntegerField):
+            options = self.constant(field.options)
+            python_type, type_name = (str, 'string') if field_class in (MultipleChoiceStringField, EnumStringField) \
+                else (int, 'integer')
+            if python_type is int:
+                lines.append('if not isinstance(' + value + ', int) or isinstance(' + value + ', bool):')
+            else:
+                lines.append('if not isinstance(' + value + ', str):')
+            lines.append('    ' + expected(type_name))
+            lines.append('elif ' + value + ' not in ' + options + ':')
+            lines.append('    ' + error('\'invalid value \' + repr(' + value + ') + ' +
+                                        self.constant(', must be one of ' + repr(sorted(field.options)))))
+        elif field_class is JsonField:
+            lines.append('if not isinstance(' + value + ', dict):')
+            lines.append('    ' + expected('object'))
+        elif field_class is ListField:
+            item = 'v' + str(level)
+            index = 'i' + str(level)
+            item_path = '(' + path + ') + \'[\' + str(' + index + ') + \']\''
+            lines.append('if not isinstance(' + value + ', list):')
+            lines.append('    ' + expected('array'))
+            lines.append('else:')
+            lines.append('    for ' + index + ', ' + item + ' in enumerate(' + value + '):')
+            lines.append('        if ' + item + ' is None:')
+            lines.append('            errors.append((' + item_path + ', \'null list item\'))')
+            if isinstance(field.item_type, Field):
+                item_lines = self.value_checks(field.item_type, item, item_path, level + 1)
+            else:
+                item_lines = ['if not isinstance(' + item + ', ' + field.item_type.__name__ + '):',
+                              '    errors.append((' + item_path + ', \'expected ' +
+                              _LIST_ITEM_TYPE_NAMES[field.item_type] + ', found \' + _type_name(' + item + ')))']
+            if item_lines:
+                lines.append('        else:')
+                lines.extend(['            ' + line for line in item_lines])
+        elif field_class is ObjectField:
+            lines.append('if isinstance(' + value + ', dict):')
+            lines.append('    ' + self.add_class(field.item_type) + '(' + value + ', ' + path + ', errors)')
+            lines.append('else:')
+            lines.append('    ' + expected('object'))
+        elif field_class is ObjectListField:
+            item = 'v' + str(level)
+            index = 'i' + str(level)
+            item_path = '(' + path + ') + \'[\' + str(' + index + ') + \']\''
+            lines.append('if not isinstance(' + value + ', list):')
+            lines.append('    ' + expected('array'))
+            lines.append('else:')
+            lines.append('    for ' + index + ', ' + item + ' in enumerate(' + value + '):')
+            lines.append('        if isinstance(' + item + ', dict):')
+            lines.append('            ' + self.add_class(field.item_type) + '(' + item + ', ' + item_path +
+                         ', errors)')
+            lines.append('        else:')
+            lines.append('            errors.append((' + item_path + ', \'expected object, found \' + _type_name(' +
+                         item + ')))')
+        else:
+            lines.append('m = _field_error(' + self.constant(field) + ', ' + value + ')')
+            lines.append('if m is not None:')
+            lines.append('    ' + error('m'))
+        return lines
+
+    def source(self) -> str:
+        return '\n\n'.join(['\n'.join(lines) for lines in self.functions]) + '\n'
+
+
+class DictValidator:
+    _validators = {}  # type: Dict[Tuple[type, bool], DictValidator]
+
+    @staticmethod
+    def for_class(cls: Type[T], accept_unknown: bool = False) -> 'DictValidator':
+        validator = DictValidator._validators.get((cls, accept_unknown))
+        if validator is None:
+            validator = DictValidator._validators.setdefault((cls, accept_unknown), DictValidator(cls, accept_unknown))
+        return validator
+
+    def __init__(self, cls: Type[T], accept_unknown: bool = False):
+        assert issubclass(cls, JsonObject), 'cls must be subclass of JsonObject'
+        assert cls != JsonObject, 'Cannot validate JsonObject'
+        self.cls = cls
+        self.accept_unknown = accept_unknown
+        compiler = _ValidatorCompiler(accept_unknown)
+        function_name = compiler.add_class(cls)
+        # generated source of the checks, useful for debugging
+        self.source = compiler.source()
+        namespace = compiler.namespace
+        exec(compile(self.source, '<pykson validator of ' + cls.__name__ + '>', 'exec'), namespace)
+        self._validate = namespace[function_name]
+
+    def errors(self, data: Union[Dict, List]) -> List[Tuple[str, str]]:
+        # (json path, message) of all invalid values of data, a parsed json object or list of objects
+        errors = []  # type: List[Tuple[str, str]]
+        if isinstance(data, dict):
+            self._validate(data, '$', errors)
+        elif isinstance(data, list):
+            for i, item in enumerate(data):
+                if isinstance(item, dict):
+                    self._validate(item, '$[' + str(i) + ']', errors)
+                else:
+                    errors.append(('$[' + str(i) + ']', 'expected object, found ' + _type_name(item)))
+        else:
+            errors.append(('$', 'expected object, found ' + _type_name(data)))
+        return errors
+
+    def is_valid(self, data: Union[Dict, List]) -> bool:
+        return len(self.errors(data)) == 0
+
+    def validate(self, data: Union[Dict, List]):
+        errors = self.errors(data)
+        if errors:
+            raise ValidationError(errors)
+
+
+def _nullable_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    if len(schema) == 0:
+        return schema
+    if 'enum' in schema:
+        return dict(schema, enum=schema['enum'] + [None])
+    if 'anyOf' in schema:
+        return dict(schema, anyOf=schema['anyOf'] + [{'type': 'null'}])
+    schema_type = schema.get('type')
+    if isinstance(schema_type, str):
+        return dict(schema, type=[schema_type, 'null'])
+    if isinstance(schema_type, list):
+        return dict(schema, type=schema_type + ['null'])
+    return {'anyOf': [schema, {'type': 'null'}]}
+
+
+class _JsonSchemaBuilder:
+    def __init__(self, accept_unknown: bool):
+        self.accept_unknown = accept_unknown
+        self.definitions = {}  # type: Dict[str, Dict[str, Any]]
+        self.names = {}  # type: Dict[type, str]
+
+    def class_reference(self, cls: type) -> Dict[str, Any]:
+        name = self.names.get(cls)
+        if name is None:
+            name = cls.__name__
+            if name in self.definitions:
+                name = cls.__module__ + '.' + cls.__name__
+            self.names[cls] = name
+            self.definitions[name] = {}
+            self.definitions[name] = self.class_schema(cls)
+        return {'$ref': '#/$defs/' + name}
+
+    def class_schema(self, cls: type) -> Dict[str, Any]:
+        properties = {}  # type: Dict[str, Any]
+        required = []  # type: List[str]
+        for field in cls._pykson_fields:
+            if isinstance(field, FunctionField):
+                continue
+            schema = self.field_schema(field)
+            if field.default_value is not None and isinstance(field.default_value, (int, float, str, bool)):
+                schema = dict(schema, default=field.default_value)
+            if field.null or isinstance(field, ListField):
+                schema = _nullable_schema(schema)
+            elif field.default_value is None:
+                required.append(field.serialized_name)
+            properties[field.serialized_name] = schema
+        for child_name, child in _child_objects(cls).items():
+            properties[child_name] = _nullable_schema(self.class_reference(type(child)))
+        schema = {'type': 'object', 'properties': properties}  # type: Dict[str, Any]
+        if required:
+            schema['required'] = required
+        if not self.accept_unknown:
+            schema['additionalProperties'] = False
+        return schema
+
+    def field_schema(self, field: Union[Field, type]) -> Dict[str, Any]:
+        if not isinstance(field, Field):
+            return {'type': {int: 'integer', float: 'number', bool: 'boolean', str: 'string'}[field]}
+        field_class = type(field)
+        if field_class is IntegerField or field_class is FloatField:
+            schema = {'type': 'integer' if field_class is IntegerField else 'number'}  # type: Dict[str, Any]
+            if field.accepts_string:
+                schema['type'] = [schema['type'], 'string']
+            if field.min_value is not None:
+                schema['minimum'] = field.min_value
+            if field.max_value is not None:
+                schema['maximum'] = field.max_value
+            return schema
+        if field_class is BooleanField:
+            if field.accepts_string:
+                return {'anyOf': [{'type': 'boolean'}, {'enum': list(_BOOLEAN_STRINGS)}]}
+            return {'type': 'boolean'}
+        if field_class is StringField:
+            return {} if field.accepts_non_string else {'type': 'string'}
+        if field_class in (MultipleChoiceStringField, EnumStringField, MultipleChoiceIntegerField, EnumIntegerField):
+            return {'enum': sorted(field.options)}
+        if field_class is DateField:
+            if field.date_format == '%Y-%m-%d':
+                return {'type': 'string', 'format': 'date'}
+            return {'type': 'string'}
+        if field_class in (TimeField, DateTimeField, JDateField, JDateTimeField, DecimalField):
+            return {'type': 'string'}
+        if field_class in (TimestampSecondsField, TimestampMillisecondsField):
+            return {'type': 'integer'}
+        if field_class is UUIDField:
+            return {'type': 'string', 'format': 'uuid'}
+        if field_class in (BytesField, ByteArrayField):
+            if field.encoding == 'base64':
+                return {'type': 'string', 'contentEncoding': 'base64'}
+            return {'type': 'string'}
+        if field_class is JsonField:
+            return {'type': 'object'}
+        if field_class is ListField:
+            return {'type': 'array', 'items': self.field_schema(field.item_type)}
+        if field_class is ObjectField:
+            return self.class_reference(field.item_type)
+        if field_class is ObjectListField:
+            return {'type': 'array', 'items': self.class_reference(field.item_type)}
+        # custom fields accept any value as far as the schema is concerned
+        return {}
+
+
+def json_schema(cls: Type[T], accept_unknown: bool = False) -> Dict[str, Any]:
+    # JSON Schema (draft 2020-12) of the json accepted by Pykson.from_json for cls, nested classes are in $defs
+    assert issubclass(cls, JsonObject), 'cls must be subclass of JsonObject'
+    builder = _JsonSchemaBuilder(accept_unknown)
+    reference = builder.class_reference(cls)
+    return {'$schema': _JSON_SCHEMA_DIALECT, '$ref': reference['$ref'], '$defs': builder.definitions}
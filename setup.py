@@ -22,5 +22,13 @@ setuptools.setup(name='pykson',
                      "Operating System :: OS Independent",
                  ],
                  install_requires=required,
+                 extras_require={
+                     'msgpack': ['msgpack>=1.0.0'],
+                     'cbor': ['cbor2>=5.0.0'],
+                     'zstd': ['zstandard>=0.15.0'],
+                 },
+                 entry_points={
+                     'console_scripts': ['pykson-generate=pykson.generator:main'],
+                 },
                  python_requires='>=3.6',
                  zip_safe=False)
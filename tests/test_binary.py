@@ -0,0 +1,142 @@
+import uuid
+import decimal
+import datetime
+import unittest
+
+from pykson import Pykson, JsonObject, StringField, IntegerField, FloatField, BooleanField, BytesField, DateField, \
+    TimeField, DateTimeField, TimestampMillisecondsField, DecimalField, UUIDField, JsonField, ListField, ObjectField, \
+    ObjectListField
+from pykson.binary import BinaryCodec, BinaryRecordView, BinarySchemaMismatchError
+
+
+class Score(JsonObject):
+    course = StringField()
+    score = FloatField()
+
+
+class Student(JsonObject):
+    name = StringField()
+    age = IntegerField()
+    active = BooleanField()
+    photo = BytesField()
+    birth_date = DateField()
+    wake_up = TimeField()
+    registered = DateTimeField()
+    updated = TimestampMillisecondsField()
+    balance = DecimalField()
+    id = UUIDField()
+    extra = JsonField()
+    tags = ListField(str)
+    numbers = ListField(int)
+    days = ListField(DateField())
+    best_score = ObjectField(Score)
+    scores = ObjectListField(Score)
+
+
+class ExchangeStudent(Student):
+    country = StringField()
+
+
+class Nested(JsonObject):
+    score = ObjectField(Score)
+
+
+def student(i):
+    return Student(name='student ' + str(i), age=20 + i, active=i % 2 == 0, photo=bytes([i, 0, 255]),
+                   birth_date=datetime.date(2000, 1, 1 + i), wake_up=datetime.time(7, i, 30, 5),
+                   registered=datetime.datetime(2020, 2, 3, 4, 5, i, tzinfo=datetime.timezone.utc),
+                   updated=datetime.datetime(2021, 1, 1, 12, 0, i, 123000, tzinfo=datetime.timezone.utc),
+                   balance=decimal.Decimal('10.0' + str(i)), id=uuid.UUID(int=i), extra={'a': [1, None, 'b']},
+                   tags=['x', 'ü'], numbers=[i, -i, 2 ** 40], days=[datetime.date(2010, 5, 6)],
+                   best_score=Score(course='math', score=19.5),
+                   scores=[Score(course='art', score=i), Score(course='music', score=None)])
+
+
+class BinaryCodecTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+
+    def assert_same(self, first, second):
+        self.assertEqual(self.pson.to_json(first), self.pson.to_json(second))
+
+    def test_round_trip(self):
+        item = student(3)
+        decoded = self.pson.from_binary(self.pson.to_binary(item), Student)
+        self.assertIsInstance(decoded, Student)
+        self.assert_same(decoded, item)
+        self.assertEqual(decoded.registered, item.registered)
+        self.assertEqual(decoded.id, item.id)
+        self.assertEqual(decoded.balance, item.balance)
+
+    def test_list_round_trip(self):
+        items = [student(i) for i in range(5)]
+        decoded = self.pson.from_binary(self.pson.to_binary(items), Student)
+        self.assertEqual(len(decoded), 5)
+        for first, second in zip(decoded, items):
+            self.assert_same(first, second)
+
+    def test_null_values(self):
+        item = Student(name='empty')
+        self.assert_same(self.pson.from_binary(self.pson.to_binary(item), Student), item)
+
+    def test_empty_list(self):
+        self.assertEqual(self.pson.from_binary(self.pson.to_binary([], Student), Student), [])
+        with self.assertRaises(Exception):
+            self.pson.to_binary([])
+
+    def test_sub_class_objects_are_rejected(self):
+        with self.assertRaises(Exception):
+            BinaryCodec.for_class(Student).dumps(ExchangeStudent(name='a', country='b'))
+        with self.assertRaises(Exception):
+            self.pson.to_binary([Student(name='a'), ExchangeStudent(name='b', country='c')])
+        self.assertEqual(self.pson.from_binary(
+            self.pson.to_binary(ExchangeStudent(name='a', country='b')), ExchangeStudent).country, 'b')
+
+    def test_schema_mismatch(self):
+        data = self.pson.to_binary(student(1))
+        with self.assertRaises(BinarySchemaMismatchError):
+            self.pson.from_binary(data, ExchangeStudent)
+        with self.assertRaises(BinarySchemaMismatchError):
+            self.pson.from_binary(data[:4], Student)
+        with self.assertRaises(BinarySchemaMismatchError):
+            self.pson.from_binary(b'XYZ' + data[3:], Student)
+
+
+class BinaryRecordViewTest(unittest.TestCase):
+    def test_views(self):
+        items = [student(i) for i in range(3)]
+        codec = BinaryCodec.for_class(Student)
+        data = codec.dumps(items)
+        views = codec.view(data)
+        self.assertEqual(len(views), 3)
+        for view, item in zip(views, items):
+            self.assertIsInstance(view, BinaryRecordView)
+            self.assertEqual(view.name, item.name)
+            self.assertEqual(view['age'], item.age)
+            self.assertEqual(view.registered, item.registered)
+            self.assertEqual(view.balance, item.balance)
+            self.assertEqual(view.days, item.days)
+            self.assertEqual(bytes(view.photo), item.photo)
+            self.assertIsInstance(view.best_score, BinaryRecordView)
+            self.assertEqual(view.best_score.score, 19.5)
+            self.assertEqual([s.course for s in view.scores], ['art', 'music'])
+            self.assertIsNone(view.scores[1].score)
+            self.assertEqual(Pykson().to_json(view.to_object()), Pykson().to_json(item))
+        self.assertEqual([v.name for v in codec.iter_views(data)], [i.name for i in items])
+        with self.assertRaises(AttributeError):
+            getattr(views[0], 'unknown')
+        with self.assertRaises(KeyError):
+            views[0]['unknown']
+
+    def test_single_view_and_null_fields(self):
+        codec = BinaryCodec.for_class(Nested)
+        view = codec.view(codec.dumps(Nested()))
+        self.assertIsNone(view.score)
+        view = codec.view(codec.dumps(Nested(score=Score(course='a'))))
+        self.assertEqual(view.score.course, 'a')
+        self.assertEqual([v.score.course for v in codec.iter_views(codec.dumps(Nested(score=Score(course='b'))))],
+                         ['b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
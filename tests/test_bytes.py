@@ -0,0 +1,111 @@
+import io
+import json
+import array
+import base64
+import random
+import unittest
+
+from pykson import Pykson, JsonObject, BytesField, ByteArrayField, StringField, ObjectListField
+
+
+class Attachment(JsonObject):
+    name = StringField()
+    data = BytesField()
+    packed = BytesField(encoding='base85', serialized_name='p')
+    buffer = ByteArrayField()
+
+
+class View(JsonObject):
+    data = BytesField(zero_copy=True)
+
+
+class Message(JsonObject):
+    attachments = ObjectListField(Attachment)
+
+
+class ChunkCounter(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return super().write(s)
+
+
+def attachment(size):
+    data = bytes(random.Random(size).getrandbits(8) for _ in range(size))
+    return Attachment(name='file ' + str(size), data=data, packed=data[::-1], buffer=bytearray(data[:size // 2]))
+
+
+class BytesFieldTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+
+    def test_round_trip(self):
+        for size in [0, 1, 2, 3, 4, 5, 100, 1001]:
+            item = attachment(size)
+            data = json.loads(self.pson.to_json(item))
+            self.assertEqual(base64.b64decode(data['data']), item.data)
+            self.assertEqual(base64.b85decode(data['p']), item.packed)
+            decoded = self.pson.from_json(data, Attachment)
+            self.assertEqual((decoded.data, decoded.packed, decoded.buffer), (item.data, item.packed, item.buffer))
+            self.assertIsInstance(decoded.data, bytes)
+            self.assertIsInstance(decoded.buffer, bytearray)
+
+    def test_invalid_values(self):
+        with self.assertRaises(ValueError):
+            self.pson.from_json({'data': 'a'}, Attachment)
+        with self.assertRaises(TypeError):
+            Attachment(data=1)
+        with self.assertRaises(TypeError):
+            Attachment(buffer=1)
+
+    def test_buffers_are_copied(self):
+        buffer = bytearray(b'hello')
+        item = Attachment(data=memoryview(buffer), buffer=memoryview(buffer))
+        buffer[0:1] = b'j'
+        self.assertEqual(item.data, b'hello')
+        self.assertIsInstance(item.data, bytes)
+        self.assertEqual(item.buffer, bytearray(b'hello'))
+
+    def test_zero_copy_keeps_views(self):
+        buffer = bytearray(b'hello')
+        item = View(data=buffer)
+        self.assertIsInstance(item.data, memoryview)
+        buffer[0:1] = b'j'
+        self.assertEqual(bytes(item.data), b'jello')
+        self.assertEqual(self.pson.from_json(self.pson.to_json(item), View).data, b'jello')
+        native = View._pykson_fields_by_name['data'].get_native_formatted_value(item.data)
+        self.assertEqual((type(native), native), (bytes, b'jello'))
+        numbers = array.array('i', [1, 2, 3])
+        self.assertEqual(View(data=numbers).data.tobytes(), numbers.tobytes())
+
+
+class WriteJsonTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+
+    def test_same_json_as_to_json(self):
+        message = Message(attachments=[attachment(size) for size in [0, 1, 5, 999, 5000]] + [Attachment()])
+        expected = self.pson.to_json(message)
+        for chunk_size in [1, 4, 7, 64, 65536]:
+            fp = io.StringIO()
+            self.pson.write_json(message, fp, chunk_size=chunk_size)
+            self.assertEqual(fp.getvalue(), expected)
+        fp = io.StringIO()
+        self.pson.write_json([message, message], fp)
+        self.assertEqual(json.loads(fp.getvalue()), json.loads(self.pson.to_json([message, message])))
+
+    def test_values_are_written_in_chunks(self):
+        item = attachment(30000)
+        small, large = ChunkCounter(), ChunkCounter()
+        self.pson.write_json(item, small, chunk_size=1000)
+        self.pson.write_json(item, large)
+        self.assertEqual(small.getvalue(), large.getvalue())
+        self.assertGreater(small.writes, large.writes + 40)
+        self.assertEqual(self.pson.from_json(small.getvalue(), Attachment).data, item.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import decimal
+import hashlib
+import datetime
+import unittest
+
+import pytz
+
+from pykson import Pykson, JsonObject, IntegerField, FloatField, StringField, DecimalField, DateTimeField, \
+    JsonField, ListField, ObjectField, ObjectListField
+
+
+class Tag(JsonObject):
+    name = StringField()
+
+
+class Invoice(JsonObject):
+    number = IntegerField(serialized_name='no')
+    amount = FloatField()
+    tax = DecimalField()
+    issued = DateTimeField()
+    note = StringField()
+    meta = JsonField()
+    ratios = ListField(FloatField())
+    tag = ObjectField(Tag)
+    tags = ObjectListField(Tag)
+
+
+def invoice(**changes):
+    values = dict(number=1, amount=2.0, tax=decimal.Decimal('1.50'), note='نامه',
+                  issued=pytz.utc.localize(datetime.datetime(2020, 1, 2, 10, 0)), meta={'b': 1, 'a': [1.0, 2.5]},
+                  ratios=[0.5, 3.0], tag=Tag(name='x'), tags=[Tag(name='y')])
+    values.update(changes)
+    return Invoice(**values)
+
+
+class CanonicalJsonTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+
+    def test_representation(self):
+        self.assertEqual(self.pson.to_canonical_json(invoice()),
+                         '{"amount":2,"issued":"2020-01-02T10:00:00Z","meta":{"a":[1,2.5],"b":1},"no":1,'
+                         '"note":"نامه","ratios":[0.5,3],"tag":{"name":"x"},"tags":[{"name":"y"}],"tax":"1.5"}')
+
+    def test_equal_objects_give_equal_strings(self):
+        expected = self.pson.to_canonical_json(invoice())
+        tehran = pytz.timezone('Asia/Tehran').localize(datetime.datetime(2020, 1, 2, 13, 30))
+        for changes in [dict(amount=2), dict(tax=decimal.Decimal('1.500')), dict(issued=tehran),
+                        dict(meta={'a': [1, 2.5], 'b': 1.0}), dict(ratios=[0.5, 3])]:
+            self.assertEqual(self.pson.to_canonical_json(invoice(**changes)), expected, changes)
+        self.assertNotEqual(self.pson.to_canonical_json(invoice(amount=2.5)), expected)
+        self.assertEqual(self.pson.to_canonical_json(invoice(tax=decimal.Decimal('1E+2')))[-12:], '"tax":"100"}')
+
+    def test_round_trip(self):
+        item = invoice(issued=None)
+        canonical = self.pson.to_canonical_json(item)
+        self.assertEqual(self.pson.to_canonical_json(self.pson.from_json(canonical, Invoice)), canonical)
+        self.assertEqual(json.dumps(json.loads(canonical), sort_keys=True, separators=(',', ':'), ensure_ascii=False),
+                         canonical)
+        self.assertEqual(self.pson.to_canonical_json([item, item]), '[' + canonical + ',' + canonical + ']')
+
+    def test_non_finite_values(self):
+        for changes in [dict(amount=float('nan')), dict(amount=float('inf')), dict(tax=decimal.Decimal('NaN'))]:
+            with self.assertRaises(ValueError):
+                self.pson.to_canonical_json(invoice(**changes))
+
+
+class ContentHashTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+
+    def test_digest(self):
+        item = invoice()
+        canonical = self.pson.to_canonical_json(item).encode('utf-8')
+        self.assertEqual(self.pson.content_hash(item), hashlib.sha256(canonical).hexdigest())
+        self.assertEqual(self.pson.content_hash(item, 'md5'), hashlib.md5(canonical).hexdigest())
+        self.assertEqual(self.pson.content_hash(invoice(amount=2)), self.pson.content_hash(item))
+        self.assertEqual(self.pson.content_hash([item]),
+                         hashlib.sha256(self.pson.to_canonical_json([item]).encode('utf-8')).hexdigest())
+
+    def test_cached_until_changed(self):
+        item = invoice()
+        digest = self.pson.content_hash(item)
+        self.assertEqual(item._content_hashes, {(self.pson, 'sha256'): digest})
+        self.assertEqual(self.pson.content_hash(item), digest)
+        item.note = 'changed'
+        self.assertIsNone(item._content_hashes.get((self.pson, 'sha256')))
+        changed = self.pson.content_hash(item)
+        self.assertNotEqual(changed, digest)
+        item.tag.name = 'z'
+        self.assertNotEqual(self.pson.content_hash(item), changed)
+        item.tags[0].name = 'z'
+        expected = invoice(note='changed', tag=Tag(name='z'), tags=[Tag(name='z')])
+        self.assertEqual(self.pson.content_hash(item), self.pson.content_hash(expected))
+        item.note = 'نامه'
+        expected = invoice(tag=Tag(name='z'), tags=[Tag(name='z')])
+        self.assertEqual(self.pson.content_hash(item), self.pson.content_hash(expected))
+
+    def test_copies_do_not_share_caches(self):
+        item = invoice()
+        digest = self.pson.content_hash(item)
+        copy = item.replace(note='other')
+        self.assertNotEqual(self.pson.content_hash(copy), digest)
+        self.assertEqual(self.pson.content_hash(item), digest)
+
+
+if __name__ == '__main__':
+    unittest.main()
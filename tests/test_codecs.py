@@ -0,0 +1,138 @@
+import enum
+import uuid
+import decimal
+import datetime
+import unittest
+
+from pykson import Pykson, JsonObject, StringField, IntegerField, FloatField, BooleanField, BytesField, \
+    ByteArrayField, DateField, TimeField, DateTimeField, TimestampSecondsField, TimestampMillisecondsField, \
+    DecimalField, UUIDField, JsonField, ListField, ObjectField, ObjectListField, EnumStringField, \
+    MultipleChoiceIntegerField
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+
+class Level(enum.Enum):
+    LOW = 'low'
+    HIGH = 'high'
+
+
+class Score(JsonObject):
+    course = StringField(serialized_name='c')
+    score = FloatField(serialized_name='s')
+
+
+class Student(JsonObject):
+    name = StringField(serialized_name='n')
+    age = IntegerField()
+    active = BooleanField()
+    photo = BytesField()
+    thumbnail = ByteArrayField()
+    birth_date = DateField()
+    wake_up = TimeField()
+    registered = DateTimeField(datetime_timezone='Asia/Tehran')
+    updated = TimestampSecondsField()
+    updated_ms = TimestampMillisecondsField()
+    balance = DecimalField()
+    id = UUIDField()
+    level = EnumStringField(Level)
+    grade = MultipleChoiceIntegerField(options=[1, 2, 3])
+    extra = JsonField()
+    tags = ListField(str)
+    days = ListField(DateField())
+    best_score = ObjectField(Score)
+    scores = ObjectListField(Score)
+
+
+def student(i):
+    return Student(name='student ' + str(i), age=20 + i, active=i % 2 == 0, photo=bytes([i, 0, 255]),
+                   thumbnail=bytearray(b'\x01\x02'), birth_date=datetime.date(2000, 1, 1 + i),
+                   wake_up=datetime.time(7, i, 30),
+                   registered=datetime.datetime(2020, 2, 3, 4, 5, i, tzinfo=datetime.timezone.utc),
+                   updated=datetime.datetime(2021, 1, 1, 12, 0, i, tzinfo=datetime.timezone.utc),
+                   updated_ms=datetime.datetime(2021, 1, 1, 12, 0, i, 123000, tzinfo=datetime.timezone.utc),
+                   balance=decimal.Decimal('12345678901234567890.123456789'), id=uuid.UUID(int=i), level=Level.HIGH,
+                   grade=2, extra={'a': [1, None, 'b'], 'c': {'d': 1.5}}, tags=['x', 'ü'],
+                   days=[datetime.date(2010, 5, 6)], best_score=Score(course='math', score=19.5),
+                   scores=[Score(course='art', score=i), Score(course='music')])
+
+
+class CodecTestMixin:
+    def dumps(self, item):
+        raise NotImplementedError
+
+    def loads(self, data, cls):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.pson = Pykson()
+
+    def test_round_trip(self):
+        item = student(3)
+        decoded = self.loads(self.dumps(item), Student)
+        self.assertEqual(self.pson.to_json(decoded), self.pson.to_json(item))
+        self.assertEqual(decoded.registered, item.registered)
+        self.assertEqual(decoded.updated_ms, item.updated_ms)
+        self.assertEqual(decoded.balance, item.balance)
+        self.assertEqual(decoded.id, item.id)
+        self.assertEqual(decoded.photo, item.photo)
+        self.assertEqual(decoded.scores[1].score, None)
+
+    def test_list_round_trip(self):
+        items = [student(i) for i in range(3)] + [Student(name='empty')]
+        decoded = self.loads(self.dumps(items), Student)
+        self.assertEqual([self.pson.to_json(d) for d in decoded], [self.pson.to_json(i) for i in items])
+
+    def test_native_values(self):
+        decoded = self.raw_loads(self.dumps(student(1)))
+        self.assertIsInstance(decoded['registered'], datetime.datetime)
+        self.assertEqual(decoded['photo'], bytes([1, 0, 255]))
+        self.assertEqual(decoded['id'], self.raw_uuid(uuid.UUID(int=1)))
+        self.assertEqual(decoded['n'], 'student 1')
+        self.assertEqual(decoded['scores'][0]['c'], 'art')
+
+
+@unittest.skipIf(msgpack is None, 'msgpack is not installed')
+class MessagePackTest(CodecTestMixin, unittest.TestCase):
+    def dumps(self, item):
+        return self.pson.to_msgpack(item)
+
+    def loads(self, data, cls):
+        return self.pson.from_msgpack(data, cls)
+
+    @staticmethod
+    def raw_loads(data):
+        return msgpack.unpackb(data, raw=False, timestamp=3)
+
+    @staticmethod
+    def raw_uuid(value):
+        return value.bytes
+
+
+@unittest.skipIf(cbor2 is None, 'cbor2 is not installed')
+class CborTest(CodecTestMixin, unittest.TestCase):
+    def dumps(self, item):
+        return self.pson.to_cbor(item)
+
+    def loads(self, data, cls):
+        return self.pson.from_cbor(data, cls)
+
+    @staticmethod
+    def raw_loads(data):
+        return cbor2.loads(data)
+
+    @staticmethod
+    def raw_uuid(value):
+        # 16 bytes in the uuid tag
+        return value
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+from pykson import Pykson, JsonObject, JsonObjectCollection, StringField, IntegerField, JsonField, ListField, \
+    ObjectField, ObjectListField
+
+
+class School(JsonObject):
+    city = StringField()
+    name = StringField()
+
+
+class Student(JsonObject):
+    first_name = StringField(serialized_name='f')
+    last_name = StringField(serialized_name='l')
+    age = IntegerField()
+    tags = ListField(str)
+    extra = JsonField()
+    school = ObjectField(School)
+    previous_schools = ObjectListField(School)
+
+
+class Teacher(JsonObject):
+    last_name = StringField()
+
+
+def students():
+    return Pykson().from_json([
+        {'f': 'Ann', 'l': 'Smith', 'age': 20, 'tags': ['a'], 'school': {'city': 'Paris', 'name': 'P1'}},
+        {'f': 'Bob', 'l': 'Jones', 'age': 21, 'tags': ['a', 'b'], 'school': {'city': 'Rome', 'name': 'R1'}},
+        {'f': 'Eve', 'l': 'Smith', 'age': 22, 'school': {'city': 'Paris', 'name': 'P2'}},
+        {'f': 'Dan', 'l': 'Brown', 'age': 23},
+    ], Student)
+
+
+class JsonObjectCollectionTest(unittest.TestCase):
+    def setUp(self):
+        self.items = students()
+        self.collection = JsonObjectCollection(self.items, index_fields=['last_name', 'school.city', 'tags'])
+
+    def test_lookups(self):
+        self.assertEqual(len(self.collection), 4)
+        self.assertIn(self.items[0], self.collection)
+        self.assertIs(self.collection.get('last_name', 'Jones'), self.items[1])
+        self.assertIsNone(self.collection.get('last_name', 'Unknown'))
+        self.assertEqual([s.first_name for s in self.collection.get_all('school.city', 'Paris')], ['Ann', 'Eve'])
+        self.assertEqual(self.collection.get_all('school.city', None), [self.items[3]])
+        self.assertEqual(self.collection.get('tags', ('a', 'b')), self.items[1])
+        self.assertEqual({k: len(v) for k, v in self.collection.group_by('last_name').items()},
+                         {'Smith': 2, 'Jones': 1, 'Brown': 1})
+        self.assertEqual(list(self.collection), self.items)
+
+    def test_indexes_follow_changes(self):
+        ann, bob, eve, dan = self.items
+        ann.last_name = 'Smyth'
+        self.assertEqual(self.collection.get_all('last_name', 'Smith'), [eve])
+        self.assertIs(self.collection.get('last_name', 'Smyth'), ann)
+        # nested objects and replaced nested objects
+        bob.school.city = 'Paris'
+        self.assertEqual(self.collection.get_all('school.city', 'Rome'), [])
+        self.assertIn(bob, self.collection.get_all('school.city', 'Paris'))
+        dan.school = School(city='Oslo')
+        self.assertIs(self.collection.get('school.city', 'Oslo'), dan)
+        dan.school.city = 'Kyiv'
+        self.assertIs(self.collection.get('school.city', 'Kyiv'), dan)
+        eve.tags = ['c']
+        self.assertIs(self.collection.get('tags', ('c',)), eve)
+
+    def test_add_remove_and_indexes(self):
+        ann = self.items[0]
+        self.collection.remove(ann)
+        self.assertNotIn(ann, self.collection)
+        self.assertEqual(self.collection.get_all('last_name', 'Smith'), [self.items[2]])
+        ann.last_name = 'Jones'
+        self.assertEqual(self.collection.get_all('last_name', 'Jones'), [self.items[1]])
+        with self.assertRaises(ValueError):
+            self.collection.remove(ann)
+        self.collection.add(ann)
+        self.collection.add(ann)
+        self.assertEqual(len(self.collection), 4)
+        self.assertEqual(len(self.collection.get_all('last_name', 'Jones')), 2)
+        self.collection.add_index('age')
+        self.assertIs(self.collection.get('age', 22), self.items[2])
+        self.collection.drop_index('age')
+        with self.assertRaises(KeyError):
+            self.collection.get('age', 22)
+        self.collection.clear()
+        self.assertEqual(len(self.collection), 0)
+        self.assertEqual(self.collection.group_by('last_name'), {})
+
+    def test_invalid_paths(self):
+        for path in ['previous_schools.city', 'extra', 'unknown', 'school.unknown', 'age.value']:
+            with self.assertRaises(Exception):
+                self.collection.add_index(path)
+            with self.assertRaises(KeyError):
+                self.collection.get(path, None)
+        with self.assertRaises(Exception):
+            self.collection.add(Teacher(last_name='Smith'))
+        self.assertEqual(len(self.collection), 4)
+        self.assertEqual(len(self.collection.get_all('last_name', 'Smith')), 2)
+        teachers = JsonObjectCollection([Teacher(last_name='Smith')], index_fields=['last_name'])
+        self.assertEqual(teachers.get('last_name', 'Smith').last_name, 'Smith')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+import io
+import os
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import tempfile
+import unittest
+
+from pykson import Pykson, JsonObject, IntegerField, StringField, ObjectListField
+from pykson.compression import open_file, detect_compression, strip_compression_extension, COMPRESSIONS
+
+try:
+    from compression import zstd
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
+
+
+class Item(JsonObject):
+    name = StringField()
+    count = IntegerField(accepts_string=True)
+
+
+class Box(JsonObject):
+    label = StringField()
+    items = ObjectListField(Item)
+
+
+def boxes(n):
+    return [Box(label='box ' + str(i) + ' é', items=[Item(name='i' + str(j), count=j) for j in range(i % 4)])
+            for i in range(n)]
+
+
+def decompress(compression, data):
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    if compression == 'bz2':
+        return bz2.decompress(data)
+    if compression == 'lzma':
+        return lzma.decompress(data)
+    if hasattr(zstd, 'ZstdFile'):
+        return zstd.decompress(data)
+    # frames written by streams have no content size, which zstandard.decompress requires
+    return zstd.ZstdDecompressor().decompressobj().decompress(data)
+
+
+def compress(compression, data):
+    if compression == 'gzip':
+        return gzip.compress(data)
+    if compression == 'bz2':
+        return bz2.compress(data)
+    if compression == 'lzma':
+        return lzma.compress(data)
+    if hasattr(zstd, 'ZstdFile'):
+        return zstd.compress(data)
+    return zstd.ZstdCompressor().compress(data)
+
+
+EXTENSIONS = {'gzip': '.gz', 'bz2': '.bz2', 'lzma': '.xz', 'zstd': '.zst'}
+
+
+class CompressionTestMixin:
+    compression = None
+
+    def setUp(self):
+        self.pson = Pykson()
+        self.directory = tempfile.TemporaryDirectory()
+        self.items = boxes(200)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name + EXTENSIONS[self.compression])
+
+    def assert_same(self, decoded):
+        self.assertEqual(self.pson.to_json(decoded), self.pson.to_json(self.items))
+
+    def test_json(self):
+        path = self.path('boxes.json')
+        self.pson.dump_json(self.items, path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.assertEqual(json.loads(decompress(self.compression, data)), json.loads(self.pson.to_json(self.items)))
+        self.assert_same(self.pson.load_json(path, Box))
+        with open(path, 'rb') as f:
+            self.assertEqual(detect_compression(f), self.compression)
+            self.assertEqual(f.tell(), 0)
+        self.pson.dump_json(self.items, path, indent=2, compression_level=1)
+        self.assert_same(self.pson.load_json(path, Box))
+
+    def test_ndjson(self):
+        path = self.path('boxes.ndjson')
+        self.pson.write_ndjson(iter(self.items), path)
+        with open(path, 'rb') as f:
+            lines = decompress(self.compression, f.read()).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), len(self.items))
+        self.assert_same(list(self.pson.iter_ndjson(path, Box)))
+
+    def test_csv(self):
+        text = io.StringIO()
+        writer = csv.writer(text)
+        writer.writerow(['name', 'count'])
+        writer.writerows([['item ' + str(i), str(i)] for i in range(100)])
+        path = self.path('items.csv')
+        with open(path, 'wb') as f:
+            f.write(compress(self.compression, text.getvalue().encode('utf-8')))
+        items = self.pson.from_csv_file(path, Item)
+        self.assertEqual([(item.name, item.count) for item in items], [('item ' + str(i), i) for i in range(100)])
+
+    def test_file_objects(self):
+        buffer = io.BytesIO()
+        self.pson.dump_json(self.items, buffer, compression=self.compression)
+        self.assertFalse(buffer.closed)
+        buffer.seek(0)
+        self.assertEqual(detect_compression(buffer), self.compression)
+        self.assert_same(self.pson.load_json(buffer, Box))
+        self.assertFalse(buffer.closed)
+
+        buffer = io.BytesIO()
+        self.pson.write_ndjson(self.items, buffer, compression=self.compression)
+        self.assert_same(list(self.pson.iter_ndjson(io.BytesIO(buffer.getvalue()), Box)))
+
+    def test_detected_from_content(self):
+        path = os.path.join(self.directory.name, 'boxes.json')
+        with open(path, 'wb') as f:
+            f.write(compress(self.compression, self.pson.to_json(self.items).encode('utf-8')))
+        self.assert_same(self.pson.load_json(path, Box))
+
+    def test_small_buffers(self):
+        path = self.path('boxes.ndjson')
+        self.pson.write_ndjson(self.items, path, buffer_size=7)
+        self.assert_same(list(self.pson.iter_ndjson(path, Box, buffer_size=5)))
+
+
+class GzipTest(CompressionTestMixin, unittest.TestCase):
+    compression = 'gzip'
+
+
+class Bz2Test(CompressionTestMixin, unittest.TestCase):
+    compression = 'bz2'
+
+
+class LzmaTest(CompressionTestMixin, unittest.TestCase):
+    compression = 'lzma'
+
+
+@unittest.skipIf(zstd is None, 'zstandard is not installed')
+class ZstdTest(CompressionTestMixin, unittest.TestCase):
+    compression = 'zstd'
+
+
+class UncompressedTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_plain_files(self):
+        items = boxes(10)
+        path = os.path.join(self.directory.name, 'boxes.json')
+        self.pson.dump_json(items, path)
+        with open(path) as f:
+            self.assertEqual(f.read(), self.pson.to_json(items))
+        self.assertEqual(self.pson.to_json(self.pson.load_json(path, Box)), self.pson.to_json(items))
+        text = io.StringIO()
+        self.pson.write_ndjson(items, text)
+        text.seek(0)
+        self.assertEqual(self.pson.to_json(list(self.pson.iter_ndjson(text, Box))), self.pson.to_json(items))
+        self.assertEqual(self.pson.to_json(list(self.pson.iter_ndjson(io.BytesIO(b'\n{"label": "a"}\n\n'), Box))),
+                         '[{"label": "a", "items": null}]')
+
+    def test_names(self):
+        self.assertEqual(strip_compression_extension('records.ndjson.gz'), 'records.ndjson')
+        self.assertEqual(strip_compression_extension('records.ndjson'), 'records.ndjson')
+        self.assertEqual(COMPRESSIONS, ['gzip', 'bz2', 'lzma', 'zstd'])
+        with self.assertRaises(Exception):
+            with open_file(io.BytesIO(), 'w', 'zip'):
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import datetime
+import unittest
+
+from pykson import Pykson, JsonObject, IntegerField, StringField, DateField, ObjectField, ObjectListField, \
+    FunctionField
+
+
+class Address(JsonObject):
+    city = StringField()
+
+
+class Person(JsonObject):
+    name = StringField(null=False, default_value='')
+    age = IntegerField(serialized_name='a')
+    born = DateField()
+    address = ObjectField(Address)
+    friends = ObjectListField(Address)
+    title = FunctionField('get_title')
+
+    def get_title(self):
+        return 'Dr. ' + self.name
+
+
+def person():
+    return Person(name='sina', age=30, born='1990-01-02', address=Address(city='Tehran'),
+                  friends=[Address(city='Rasht'), Address(city='Shiraz')])
+
+
+class CopyTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+
+    def test_copy_shares_nested_values(self):
+        original = person()
+        copy = original.copy()
+        self.assertIsNot(copy, original)
+        self.assertIs(copy.address, original.address)
+        self.assertIs(copy.friends, original.friends)
+        self.assertEqual(self.pson.to_dict_or_list(copy), self.pson.to_dict_or_list(original))
+        copy.age = 31
+        self.assertEqual(original.age, 30)
+        self.assertEqual(copy._dirty, {'a'})
+        self.assertEqual(original._dirty, set())
+
+    def test_copy_does_not_inherit_observers_or_caches(self):
+        original = person()
+        changes = []
+        original._add_observer(lambda item, field: changes.append(field))
+        self.pson.enable_output_cache(original)
+        self.pson.to_json(original)
+        copy = original.copy()
+        self.assertIsNone(copy._observers)
+        self.assertIsNone(copy._output_cache)
+        copy.age = 31
+        self.assertEqual(changes, [])
+        self.assertEqual(self.pson.to_dict_or_list(copy)['a'], 31)
+
+    def test_decoding_into_a_copy_keeps_the_original(self):
+        original = person()
+        copy = original.copy()
+        self.pson.from_json_into(copy, {'address': {'city': 'Tabriz'}, 'friends': [{'city': 'Yazd'}]})
+        self.assertEqual(copy.address.city, 'Tabriz')
+        self.assertEqual(copy.friends[0].city, 'Yazd')
+        self.assertEqual(original.address.city, 'Tehran')
+        self.assertEqual([f.city for f in original.friends], ['Rasht', 'Shiraz'])
+
+
+class ReplaceTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+
+    def test_replace(self):
+        original = person()
+        before = self.pson.to_dict_or_list(original)
+        replaced = original.replace(name='ali', born='2000-05-06', address=Address(city='Yazd'))
+        self.assertEqual(self.pson.to_dict_or_list(original), before)
+        self.assertEqual((replaced.name, replaced.born, replaced.address.city),
+                         ('ali', datetime.date(2000, 5, 6), 'Yazd'))
+        self.assertEqual(replaced.title, 'Dr. ali')
+        self.assertIs(replaced.friends, original.friends)
+        self.assertEqual(replaced._dirty, set())
+        data = self.pson.to_dict_or_list(replaced)
+        decoded = self.pson.from_json({k: v for k, v in data.items() if k != 'title'}, Person)
+        self.assertEqual(self.pson.to_dict_or_list(decoded), data)
+
+    def test_replace_validates_values(self):
+        original = person()
+        with self.assertRaises(TypeError):
+            original.replace(age='old')
+        with self.assertRaises(Exception):
+            original.replace(name=None)
+        with self.assertRaises(Exception):
+            original.replace(unknown=1)
+        with self.assertRaises(Exception):
+            original.replace(title='Mr.')
+        self.assertEqual((original.name, original.age), ('sina', 30))
+
+
+if __name__ == '__main__':
+    unittest.main()
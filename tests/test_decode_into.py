@@ -0,0 +1,86 @@
+import unittest
+
+from pykson import Pykson, JsonObjectPool, JsonObject, StringField, IntegerField, ObjectField, ObjectListField
+
+
+class Address(JsonObject):
+    city = StringField()
+
+
+class Person(JsonObject):
+    name = StringField()
+    age = IntegerField()
+    address = ObjectField(Address)
+    previous_addresses = ObjectListField(Address)
+
+
+class FromJsonIntoTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+        self.data = {'name': 'Ann', 'age': 30, 'address': {'city': 'Paris'},
+                     'previous_addresses': [{'city': 'Rome'}, {'city': 'Oslo'}]}
+        self.changed = {'name': 'Bob', 'age': 40, 'address': {'city': 'CHANGED'},
+                        'previous_addresses': [{'city': 'CHANGED'}]}
+
+    def test_matches_from_json(self):
+        person = self.pson.from_json(self.data, Person)
+        self.pson.from_json_into(person, self.changed)
+        self.assertEqual(self.pson.to_json(person), self.pson.to_json(self.pson.from_json(self.changed, Person)))
+
+    def test_reuses_nested_objects(self):
+        person = self.pson.from_json(self.data, Person)
+        address = person.address
+        self.pson.from_json_into(person, self.changed)
+        self.assertIs(person.address, address)
+
+    def test_copy_is_not_changed(self):
+        person = self.pson.from_json(self.data, Person)
+        expected = self.pson.to_json(person)
+        self.pson.from_json_into(person.copy(), self.changed)
+        self.assertEqual(self.pson.to_json(person), expected)
+
+    def test_original_of_copy_is_not_changed(self):
+        person = self.pson.from_json(self.data, Person)
+        copied = person.replace(name='Eve')
+        expected = self.pson.to_json(copied)
+        self.pson.from_json_into(person, self.changed)
+        self.assertEqual(self.pson.to_json(copied), expected)
+        self.assertEqual(person.address.city, 'CHANGED')
+
+    def test_decoded_references_are_not_changed(self):
+        data = {'name': 'Ann', 'address': {'$id': 1, 'city': 'Paris'}, 'previous_addresses': [{'$ref': 1}]}
+        person = self.pson.from_json(data, Person, references=True)
+        shared = person.address
+        self.pson.from_json_into(person, {'address': {'city': 'CHANGED'}, 'previous_addresses': [{'city': 'Rome'}]})
+        self.assertEqual(shared.city, 'Paris')
+        self.assertEqual(person.address.city, 'CHANGED')
+
+
+class JsonObjectPoolTest(unittest.TestCase):
+    def test_reuses_released_objects(self):
+        pson = Pykson()
+        pool = JsonObjectPool(Person)
+        first = pson.from_json_pooled({'name': 'Ann', 'address': {'city': 'Paris'}}, pool)
+        pool.release(first)
+        second = pson.from_json_pooled({'name': 'Bob', 'address': {'city': 'Rome'}}, pool)
+        self.assertIs(second, first)
+        self.assertEqual(second.name, 'Bob')
+        self.assertEqual(second.address.city, 'Rome')
+
+    def test_double_release(self):
+        pson = Pykson()
+        pool = JsonObjectPool(Person)
+        person = pson.from_json({'name': 'Ann'}, Person)
+        pool.release(person)
+        pool.release([person, person])
+        a = pson.from_json_pooled({'name': 'Bob'}, pool)
+        b = pson.from_json_pooled({'name': 'Eve'}, pool)
+        self.assertIsNot(a, b)
+        self.assertEqual((a.name, b.name), ('Bob', 'Eve'))
+        pool.release(a)
+        self.assertIs(pool.acquire(), a)
+        self.assertIsNone(pool.acquire())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import datetime
+import unittest
+
+from pykson import Pykson, JsonObject, StringField, IntegerField, DateField, ListField, ObjectField, ObjectListField
+
+
+class Score(JsonObject):
+    course = StringField(serialized_name='c')
+    score = IntegerField()
+
+
+class Student(JsonObject):
+    name = StringField()
+    age = IntegerField(serialized_name='a')
+    days = ListField(DateField())
+    score = ObjectField(Score, serialized_name='s')
+    scores = ObjectListField(Score)
+
+
+def merge_patch(target, patch):
+    # json merge patch (RFC 7386)
+    if not isinstance(patch, dict):
+        return patch
+    target = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        else:
+            target[key] = merge_patch(target.get(key), value)
+    return target
+
+
+def without_nulls(value):
+    if isinstance(value, dict):
+        return {k: without_nulls(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [without_nulls(v) for v in value]
+    return value
+
+
+class DeltaEncodingTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+        self.data = {'name': 'Ann', 'a': 20, 'days': ['2020-01-02'], 's': {'c': 'Math', 'score': 10},
+                     'scores': [{'c': 'Art', 'score': 12}, {'c': 'Music', 'score': 14}]}
+        self.student = self.pson.from_json(self.data, Student)
+
+    def assert_patch_applies(self, student):
+        patch = json.loads(self.pson.to_json_delta(student))
+        expected = without_nulls(self.pson.to_dict_or_list(student))
+        self.assertEqual(merge_patch(self.data, patch), expected)
+        return patch
+
+    def test_decoded_and_created_objects_are_clean(self):
+        self.assertEqual(self.pson.to_dict_delta(self.student), {})
+        self.assertEqual(self.pson.to_dict_delta(Student(name='Bob', score=Score(course='Art'))), {})
+
+    def test_changed_fields(self):
+        self.student.age = 21
+        self.student.days = [datetime.date(2021, 3, 4)]
+        self.student.score.course = 'Geometry'
+        self.assertEqual(self.assert_patch_applies(self.student),
+                         {'a': 21, 'days': ['2021-03-04'], 's': {'c': 'Geometry'}})
+
+    def test_removed_and_replaced_values(self):
+        self.student.name = None
+        self.student.score = Score(course='History')
+        self.assertEqual(self.assert_patch_applies(self.student), {'name': None, 's': {'c': 'History', 'score': None}})
+
+    def test_lists_of_objects_are_replaced(self):
+        self.student.scores[1].score = 15
+        self.assertEqual(self.assert_patch_applies(self.student)['scores'],
+                         [{'c': 'Art', 'score': 12}, {'c': 'Music', 'score': 15}])
+
+    def test_mark_clean(self):
+        self.student.age = 21
+        self.student.scores[0].score = 1
+        self.assertEqual(self.pson.to_json_delta(self.student, mark_clean=True),
+                         json.dumps({'a': 21, 'scores': [{'c': 'Art', 'score': 1}, {'c': 'Music', 'score': 14}]}))
+        self.assertEqual(self.pson.to_dict_delta(self.student), {})
+        self.student.score.score = 11
+        self.pson.mark_clean([self.student])
+        self.assertEqual(self.pson.to_dict_delta(self.student), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,369 @@
+import os
+import gzip
+import json
+import pickle
+import random
+import datetime
+import tempfile
+import unittest
+import warnings
+
+from dateutil import parser
+
+from pykson import Pykson
+from pykson.generator import PyksonGenerator, main
+
+LAYOUTS = [
+    ('2020-01-02T10:11:12', '%Y-%m-%dT%H:%M:%S'),
+    ('2020-01-02T10:11:12Z', '%Y-%m-%dT%H:%M:%S%z'),
+    ('2020-01-02T10:11:12+0330', '%Y-%m-%dT%H:%M:%S%z'),
+    ('2020-01-02T10:11:12.123456', '%Y-%m-%dT%H:%M:%S.%f'),
+    ('2020-01-02T10:11:12.5-05:00', '%Y-%m-%dT%H:%M:%S.%f%z'),
+    ('2020-01-02T10:11', '%Y-%m-%dT%H:%M'),
+    ('2020-01-02 10:11:12', '%Y-%m-%d %H:%M:%S'),
+    ('2020-01-02 10:11:12.123', '%Y-%m-%d %H:%M:%S.%f'),
+    ('2020-01-02 10:11+00:00', '%Y-%m-%d %H:%M%z'),
+    ('2020-01-02', '%Y-%m-%d'),
+    ('2020/01/02 10:11:12', '%Y/%m/%d %H:%M:%S'),
+    ('2020/01/02T10:11:12Z', '%Y/%m/%dT%H:%M:%S%z'),
+    ('2020/01/02', '%Y/%m/%d'),
+    ('Thu, 02 Jan 2020 10:11:12 +0000', '%a, %d %b %Y %H:%M:%S %z'),
+    ('Thu, 02 Jan 2020 10:11:12 GMT', '%a, %d %b %Y %H:%M:%S GMT'),
+    ('02 Jan 2020 10:11:12', '%d %b %Y %H:%M:%S'),
+    ('02 Jan 2020', '%d %b %Y'),
+    ('Jan 02, 2020', '%b %d, %Y'),
+]
+# datetimes dateutil understands in other layouts
+OTHER_DATETIMES = ['2020-1-2', '2020-1-2 1:2', '10:11:12', '1/2/2020', '12/31/99', '20200102', '2020.01.02',
+                   '1-2-3 4:5:6', 'June 5th', 'Saturday', 'March 5 9pm', '3rd of March 2020', '10:00:00 UTC',
+                   'Mon Jan  1 10:00:00 2020']
+NOT_DATETIMES = ['10:11', '2020-1', 'Jan 2', 'hello world', 'version 2020', '12345678', '123 Main St', 'v1.2.3.4',
+                 '2019 Q1', '1 2 3 4', '2020-13-01T10:11:12']
+
+
+class DatetimeDetectionTest(unittest.TestCase):
+    def test_layouts(self):
+        for value, datetime_format in LAYOUTS:
+            self.assertEqual(PyksonGenerator._detect_datetime_format(value), datetime_format, value)
+            datetime.datetime.strptime(value, datetime_format)
+
+    def test_other_layouts(self):
+        for value in OTHER_DATETIMES:
+            self.assertIs(PyksonGenerator._detect_datetime_format(value), True, value)
+
+    def test_not_datetimes(self):
+        for value in NOT_DATETIMES:
+            self.assertIs(PyksonGenerator._detect_datetime_format(value), False, value)
+
+    def test_same_values_as_dateutil(self):
+        # strings shorter than 8 characters are not datetimes, others are the ones dateutil parses
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for value in [v for v, _ in LAYOUTS] + OTHER_DATETIMES + NOT_DATETIMES:
+                try:
+                    parser.parse(value)
+                    parsed = len(value) >= 8
+                except (ValueError, OverflowError):
+                    parsed = False
+                self.assertEqual(PyksonGenerator._detect_datetime_format(value) is not False, parsed, value)
+
+
+class GeneratedDatetimeFieldTest(unittest.TestCase):
+    def test_datetime_fields(self):
+        records = [{'created': '2020-01-0' + str(i) + 'T10:00:00Z', 'day': '2020-1-' + str(i), 'at': '10:3' + str(i),
+                    'mixed': '2020-01-0' + str(i) if i < 4 else '0' + str(i) + ' Jan 2020'} for i in range(1, 6)]
+        schema, sub_schemas = PyksonGenerator.generate_schema_from_records(records, 'Record')
+        source = PyksonGenerator.pykson_class_sources(schema, sub_schemas)['RecordItems']
+        self.assertIn("created = pykson.DateTimeField(datetime_format='%Y-%m-%dT%H:%M:%S%z'", source)
+        self.assertIn('day = pykson.DateTimeField(datetime_format=None', source)
+        self.assertIn('at = pykson.StringField(', source)
+        self.assertIn('mixed = pykson.DateTimeField(datetime_format=None', source)
+
+
+class ValueSketchTest(unittest.TestCase):
+    def sketch(self, values):
+        sketch = PyksonGenerator.ValueSketch()
+        for value in values:
+            sketch.add(value)
+        return sketch
+
+    def test_bounded_summary(self):
+        sketch = self.sketch(list(range(100000)) + [5, 7])
+        self.assertEqual(sketch.count, 100002)
+        self.assertEqual(len(sketch.sample), PyksonGenerator.ValueSketch.sample_size)
+        self.assertEqual(len(sketch.smallest_hashes), PyksonGenerator.ValueSketch.distinct_sketch_size)
+        self.assertEqual((sketch.min_value, sketch.max_value), (0, 99999))
+        self.assertLess(abs(sketch.distinct_estimate - 100000), 15000)
+        small = self.sketch(['a', 'bb', 'a', 'ccc'])
+        self.assertEqual(small.distinct_estimate, 3)
+        self.assertEqual((small.min_length, small.max_length), (1, 3))
+        self.assertEqual(set(small.sample.keys()), {'a', 'bb', 'ccc'})
+
+    def test_merged_sketches(self):
+        values = ['v' + str(i % 700) for i in range(3000)]
+        merged = self.sketch(values[:1000])
+        merged.update_from(self.sketch(values[1000:]))
+        whole = self.sketch(values)
+        self.assertEqual(merged.json_repr(), whole.json_repr())
+        self.assertEqual(merged.smallest_hashes, whole.smallest_hashes)
+        self.assertEqual(list(merged.sample.keys()), list(whole.sample.keys()))
+
+    def test_json_state(self):
+        sketch = self.sketch(['2020-01-0' + str(i % 9 + 1) for i in range(300)])
+        restored = PyksonGenerator.ValueSketch.from_json_state(json.loads(json.dumps(sketch.json_state())))
+        self.assertEqual(restored.json_state(), sketch.json_state())
+        self.assertEqual(restored.datetime_format, '%Y-%m-%d')
+        restored.add('hello world')
+        self.assertFalse(restored.are_all_datetime())
+
+    def test_every_value_is_checked_for_datetimes(self):
+        values = ['2020-01-01 10:00:' + '%02d' % (i % 60) + '.' + str(i) for i in range(150)]
+        sketch = self.sketch(values)
+        self.assertTrue(sketch.are_all_datetime())
+        self.assertEqual(sketch.datetime_format, '%Y-%m-%d %H:%M:%S.%f')
+        sketch.add('hello world')
+        self.assertNotIn('hello world', sketch.sample)
+        self.assertFalse(sketch.are_all_datetime())
+        self.assertIsNone(sketch.datetime_format)
+        merged = self.sketch(values)
+        merged.update_from(self.sketch(['hello world']))
+        self.assertFalse(merged.are_all_datetime())
+        mixed = self.sketch(['2020-01-01', '02 Jan 2020'])
+        self.assertTrue(mixed.are_all_datetime())
+        self.assertIsNone(mixed.datetime_format)
+
+    def test_generated_fields(self):
+        records = [{'created': '2020-01-01 10:00:' + '%02d' % (i % 60) + '.' + str(i)} for i in range(150)]
+        schema, sub_schemas = PyksonGenerator.generate_schema_from_records(records + [{'created': 'hello world'}],
+                                                                           'Record', chunk_size=40)
+        source = PyksonGenerator.pykson_class_sources(schema, sub_schemas)['RecordItems']
+        self.assertIn('created = pykson.StringField(', source)
+
+
+def order_record(i):
+    record = {'id': i, 'name': 'order ' + str(i), 'score': i * 1.5, 'tags': ['a', 'b'][:i % 2 + 1],
+              'owner': {'name': 'owner', 'age': i},
+              'items': [{'sku': 's' + str(j), 'qty': j} for j in range(i % 3 + 1)]}
+    if i % 4 == 0:
+        record['note'] = None
+    if i % 5 == 0:
+        record['extra'] = {'flag': True}
+    return record
+
+
+def load_module(path):
+    namespace = {}
+    with open(path) as f:
+        exec(compile(f.read(), path, 'exec'), namespace)
+    return namespace
+
+
+class StreamingInferenceTest(unittest.TestCase):
+    def setUp(self):
+        self.records = [order_record(i) for i in range(200)]
+        self.expected = PyksonGenerator.pykson_class_sources(
+            *PyksonGenerator.generate_schema({'items': self.records}, 'Order'))
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_corpus(self):
+        # records split across json, ndjson and compressed files, in path order
+        path = self.directory.name
+        os.makedirs(os.path.join(path, 'b'))
+        with open(os.path.join(path, 'a.json'), 'w') as f:
+            json.dump(self.records[:50], f)
+        with open(os.path.join(path, 'a_single.json'), 'w') as f:
+            json.dump(self.records[50], f)
+        with open(os.path.join(path, 'b', 'c.ndjson'), 'w') as f:
+            f.write('\n'.join(json.dumps(r) for r in self.records[51:120]) + '\n\n')
+        with gzip.open(os.path.join(path, 'b', 'd.jsonl.gz'), 'wt') as f:
+            f.write('\n'.join(json.dumps(r) for r in self.records[120:]))
+        with open(os.path.join(path, 'b', 'notes.txt'), 'w') as f:
+            f.write('not json')
+        return path
+
+    def test_chunks_and_processes(self):
+        for chunk_size, processes in [(10000, 1), (7, 1), (7, 2), (50, None)]:
+            result = PyksonGenerator.generate_schema_from_records(iter(self.records), 'Order', chunk_size=chunk_size,
+                                                                  processes=processes)
+            self.assertEqual(PyksonGenerator.pykson_class_sources(*result), self.expected, (chunk_size, processes))
+
+    def test_files(self):
+        path = self.write_corpus()
+        self.assertEqual(list(PyksonGenerator.iter_json_records(path)), self.records)
+        self.assertEqual(list(PyksonGenerator.iter_json_records([os.path.join(path, 'a_single.json')])),
+                         [self.records[50]])
+        output_path = os.path.join(path, 'models.py')
+        self.assertEqual(PyksonGenerator.generate_pykson_classes_from_files(path, 'Order', output_path,
+                                                                            chunk_size=30), output_path)
+        module = load_module(output_path)
+        orders = Pykson().from_json(self.records, module['OrderItems'])
+        self.assertEqual(Pykson().to_dict_or_list(orders[5])['extra'], {'flag': True})
+        self.assertEqual(orders[7].items[1].qty, 1)
+
+    def test_command_line(self):
+        path = self.write_corpus()
+        output_path = os.path.join(path, 'cli_models.py')
+        main([os.path.join(path, 'a.json'), os.path.join(path, 'b'), '--name', 'Order', '--output', output_path,
+              '--chunk-size', '25'])
+        with open(output_path) as f:
+            source = f.read()
+        for class_source in self.expected.values():
+            self.assertIn(class_source, source)
+
+    def test_no_records(self):
+        with self.assertRaises(PyksonGenerator.ValidationError):
+            PyksonGenerator.generate_schema_from_records([], 'Order')
+
+
+def random_schema(rng, i):
+    names = rng.sample(['a', 'b', 'c', 'd', 'e', 'f'], rng.randint(0, 4))
+    return PyksonGenerator.Schema('s' + str(i), [
+        PyksonGenerator.SchemaProperty(name, rng.choice(['int', 'str', 'NoneType', 'list']),
+                                       item_type_str=rng.choice([None, 'int', 'str']))
+        for name in names
+    ])
+
+
+class SchemaListTest(unittest.TestCase):
+    def assert_same_as_linear_search(self, schema_list, schemas):
+        for schema in schemas:
+            for is_sibling_in_list in [False, True]:
+                expected = next((s for s in schema_list if s is not schema and
+                                 schema.is_similar(s, is_sibling_in_list)), None)
+                self.assertIs(schema_list.find_similar(schema, is_sibling_in_list), expected)
+
+    def test_find_similar(self):
+        rng = random.Random(5)
+        schema_list = PyksonGenerator.SchemaList(random_schema(rng, i) for i in range(60))
+        others = [random_schema(rng, i) for i in range(60, 120)]
+        self.assert_same_as_linear_search(schema_list, list(schema_list) + others)
+        # changed properties are indexed again
+        for schema in list(schema_list)[:30]:
+            schema.properties = random_schema(rng, 0).properties
+        schema_list[0].properties = schema_list[0].properties + [PyksonGenerator.SchemaProperty('g', 'int')]
+        self.assert_same_as_linear_search(schema_list, list(schema_list) + others)
+        unpickled = pickle.loads(pickle.dumps(schema_list, protocol=4))
+        self.assertIsInstance(unpickled, PyksonGenerator.SchemaList)
+        self.assert_same_as_linear_search(unpickled, list(unpickled) + others)
+
+
+class SchemaPersistenceTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.schemas_path = os.path.join(self.directory.name, 'order.schemas.json')
+        self.output_path = os.path.join(self.directory.name, 'models.py')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_records(self, name, records):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as f:
+            f.write('\n'.join(json.dumps(r) for r in records))
+        return path
+
+    def update(self, path):
+        return PyksonGenerator.update_pykson_classes_from_files(path, 'Order', self.schemas_path,
+                                                                output_path=self.output_path)
+
+    def test_save_and_load(self):
+        schema, sub_schemas = PyksonGenerator.generate_schema_from_records([order_record(i) for i in range(50)],
+                                                                           'Order')
+        sources = PyksonGenerator.pykson_class_sources(schema, sub_schemas)
+        PyksonGenerator.save_schemas(schema, sub_schemas, self.schemas_path, class_sources=sources)
+        loaded_schema, loaded_sub_schemas, loaded_sources = PyksonGenerator.load_schemas(self.schemas_path)
+        self.assertEqual(loaded_sources, sources)
+        self.assertEqual(PyksonGenerator.pykson_class_sources(loaded_schema, loaded_sub_schemas), sources)
+        self.assertEqual(loaded_schema.json_repr(True), schema.json_repr(True))
+        with open(self.schemas_path, 'w') as f:
+            json.dump({'version': 2}, f)
+        with self.assertRaises(Exception):
+            PyksonGenerator.load_schemas(self.schemas_path)
+
+    def test_incremental_updates(self):
+        first = [order_record(i) for i in range(1, 40) if i % 5 != 0]
+        second = [order_record(i) for i in range(40, 100)]
+        changed = self.update(self.write_records('first.ndjson', first))
+        self.assertEqual(set(changed), {'OrderItemsOwner', 'OrderItemsItems', 'OrderItems', 'Order'})
+        self.assertEqual(self.update(self.write_records('first_again.ndjson', first)), [])
+        with open(self.output_path) as f:
+            source = f.read()
+        # manual changes of classes which do not change are kept
+        source = source.replace('class OrderItemsOwner(pykson.JsonObject):\n',
+                                'class OrderItemsOwner(pykson.JsonObject):\n    # checked\n')
+        with open(self.output_path, 'w') as f:
+            f.write(source)
+        # the second records add the extra objects to orders
+        self.assertEqual(set(self.update(self.write_records('second.ndjson', second))),
+                         {'OrderItemsExtra', 'OrderItems'})
+        with open(self.output_path) as f:
+            source = f.read()
+        self.assertIn('    # checked\n', source)
+        merged = PyksonGenerator.pykson_class_sources(*PyksonGenerator.load_schemas(self.schemas_path)[:2])
+        expected = PyksonGenerator.pykson_class_sources(*PyksonGenerator.generate_schema_from_records(first + second,
+                                                                                                      'Order'))
+        self.assertEqual(merged, expected)
+        module = load_module(self.output_path)
+        self.assertTrue(Pykson().from_json(second[0], module['OrderItems']).extra.flag)
+
+    def test_command_line(self):
+        path = self.write_records('first.ndjson', [order_record(i) for i in range(1, 5)])
+        main([path, '--name', 'Order', '--output', self.output_path, '--schemas', self.schemas_path])
+        self.assertTrue(os.path.exists(self.schemas_path))
+        self.assertEqual(self.update(path), [])
+
+
+class GeneratedCodecsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.records = [dict(order_record(i), created='2020-01-02T10:00:' + '%02d' % (i % 60) + '+03:30',
+                             seen='2020-1-' + str(i % 28 + 1) + ' 10:00', price=i + 0.5)
+                        for i in range(60)]
+        path = os.path.join(self.directory.name, 'orders.ndjson')
+        with open(path, 'w') as f:
+            f.write('\n'.join(json.dumps(r) for r in self.records))
+        self.module = load_module(PyksonGenerator.generate_pykson_classes_from_files(
+            path, 'Order', os.path.join(self.directory.name, 'models.py'), generate_codecs=True))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_same_objects_as_pykson(self):
+        pson = Pykson()
+        cls = self.module['OrderItems']
+        from_dict = self.module['order_items_from_dict']
+        to_dict = self.module['order_items_to_dict']
+        for record in self.records:
+            decoded = from_dict(record)
+            expected = pson.from_json(record, cls)
+            self.assertIsInstance(decoded, cls)
+            self.assertEqual(decoded.created, expected.created)
+            self.assertEqual(decoded.seen, expected.seen)
+            self.assertIsInstance(decoded.price, float)
+            self.assertEqual([(i.sku, i.qty) for i in decoded.items], [(i.sku, i.qty) for i in expected.items])
+            self.assertEqual((decoded.owner.name, decoded.owner.age), (expected.owner.name, expected.owner.age))
+            encoded = to_dict(decoded)
+            self.assertEqual(json.loads(json.dumps(encoded)), encoded)
+            for again in [from_dict(encoded), pson.from_json(encoded, cls)]:
+                self.assertEqual((again.id_, again.owner.age, again.tags, again.price, again.created, again.seen),
+                                 (decoded.id_, decoded.owner.age, decoded.tags, decoded.price, decoded.created,
+                                  decoded.seen))
+                self.assertEqual([(i.sku, i.qty) for i in again.items], [(i.sku, i.qty) for i in decoded.items])
+            self.assertEqual(self.module['order_from_dict']({'items': [record]}).items[0].id_, record['id'])
+
+    def test_invalid_data(self):
+        from_dict = self.module['order_items_from_dict']
+        with self.assertRaises(Exception):
+            from_dict(dict(self.records[1], unknown=1))
+        self.assertEqual(from_dict(dict(self.records[1], unknown=1), accept_unknown=True).id_, 1)
+        for key, value in [('id', 'x'), ('owner', None), ('owner', 1), ('items', 1), ('tags', [1]), ('price', 'x')]:
+            with self.assertRaises((TypeError, AssertionError)):
+                from_dict(dict(self.records[1], **{key: value}))
+        self.assertEqual(from_dict(dict(self.records[1], tags=None)).tags, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import sys
+import json
+import datetime
+import unittest
+import subprocess
+
+import jdatetime
+
+from pykson import Pykson, JsonObject, DateTimeField, JDateField, JDateTimeField, UUIDField, BytesField, \
+    TimestampSecondsField, _LazyModule
+
+LAZY_MODULES = ['pytz', 'jdatetime', 'dateutil', 'dateutil.parser', 'uuid', 'csv', 'pickle', 'hashlib', 'base64']
+
+
+class Record(JsonObject):
+    created = DateTimeField(datetime_format='%Y-%m-%dT%H:%M:%S%z')
+    day = JDateField()
+    moment = JDateTimeField()
+    key = UUIDField()
+    payload = BytesField()
+    stamp = TimestampSecondsField()
+
+
+def modules_after(code):
+    script = code + '\nimport sys, json\nprint(json.dumps([m for m in ' + repr(LAZY_MODULES) + ' if m in sys.modules]))'
+    output = subprocess.run([sys.executable, '-c', script], check=True, stdout=subprocess.PIPE).stdout
+    return json.loads(output.decode('utf-8'))
+
+
+class LazyImportTest(unittest.TestCase):
+    def test_import_does_not_load_optional_dependencies(self):
+        self.assertEqual(modules_after('import pykson'), [])
+
+    def test_dependencies_are_loaded_on_first_use(self):
+        loaded = modules_after('import pykson\n'
+                               'class A(pykson.JsonObject):\n'
+                               '    created = pykson.DateTimeField(datetime_format=None)\n'
+                               'pykson.Pykson().from_json({"created": "2020-01-02 10:00"}, A)')
+        self.assertIn('pytz', loaded)
+        self.assertIn('dateutil.parser', loaded)
+        self.assertNotIn('jdatetime', loaded)
+
+    def test_proxy_caches_attributes(self):
+        proxy = _LazyModule('json')
+        self.assertIs(proxy.dumps, json.dumps)
+        self.assertIn('dumps', vars(proxy))
+        with self.assertRaises(AttributeError):
+            _ = proxy.not_an_attribute
+
+    def test_fields_round_trip(self):
+        pson = Pykson()
+        data = {'created': '2020-01-02T10:00:00+0200', 'day': '1399-01-02', 'moment': '1399-01-02 10:11:12',
+                'key': '12345678-1234-4678-9234-567812345678', 'payload': 'aGVsbG8=', 'stamp': 1577959200}
+        record = pson.from_json(data, Record)
+        self.assertEqual(record.created.utcoffset(), datetime.timedelta(hours=2))
+        self.assertIsInstance(record.day, jdatetime.date)
+        self.assertIsInstance(record.moment, jdatetime.datetime)
+        self.assertEqual(record.payload, b'hello')
+        self.assertEqual(json.loads(pson.to_json(record)), data)
+        self.assertEqual(pson.from_json(pson.to_json(record), Record).key, record.key)
+
+
+if __name__ == '__main__':
+    unittest.main()
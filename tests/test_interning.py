@@ -0,0 +1,103 @@
+import enum
+import json
+import unittest
+
+from pykson import Pykson, JsonObject, StringField, ListField, ObjectListField, MultipleChoiceStringField, \
+    EnumStringField, MultipleChoiceIntegerField, EnumIntegerField
+
+
+class Color(enum.Enum):
+    RED = 'red'
+    BLUE = 'blue'
+
+
+class Size(enum.Enum):
+    SMALL = 1
+    LARGE = 2
+
+
+class Line(JsonObject):
+    product = StringField()
+
+
+class Order(JsonObject):
+    city = StringField()
+    country = StringField(intern=True, intern_table_size=2)
+    tags = ListField(str)
+    status = MultipleChoiceStringField(options=['open', 'closed'])
+    color = EnumStringField(Color)
+    priority = MultipleChoiceIntegerField(options=[1, 2, 1000])
+    size = EnumIntegerField(Size)
+    lines = ObjectListField(Line)
+
+
+def orders_json(count):
+    return json.dumps([{'city': 'Paris', 'country': 'France', 'tags': ['gift', 'express'], 'status': 'open',
+                        'color': 'red', 'priority': 1000, 'size': 2, 'lines': [{'product': 'Hat'}]}
+                       for _ in range(count)])
+
+
+class StringInterningTest(unittest.TestCase):
+    def test_intern_strings(self):
+        pson = Pykson()
+        first, second = pson.from_json(orders_json(2), Order, intern_strings=True)
+        self.assertIs(first.city, second.city)
+        self.assertIs(first.tags[1], second.tags[1])
+        self.assertIs(first.lines[0].product, second.lines[0].product)
+        self.assertEqual(pson.to_json([first, second]), json.dumps(json.loads(orders_json(2))))
+        # later decodes share the values of the table of the Pykson instance
+        self.assertIs(pson.from_json(orders_json(1), Order, intern_strings=True)[0].city, first.city)
+
+    def test_values_are_not_shared_by_default(self):
+        first, second = Pykson().from_json(orders_json(2), Order)
+        self.assertEqual(first.city, second.city)
+        self.assertIsNot(first.city, second.city)
+
+    def test_bounded_tables(self):
+        pson = Pykson(intern_table_size=1)
+        first, second = pson.from_json(orders_json(2), Order, intern_strings=True)
+        self.assertEqual(len(pson.intern_table), 1)
+        self.assertIs(first.city, second.city)
+        self.assertIsNot(first.tags[0], second.tags[0])
+        self.assertEqual(first.tags, second.tags)
+
+    def test_field_tables(self):
+        orders = Pykson().from_json(orders_json(2), Order)
+        self.assertIs(orders[0].country, orders[1].country)
+        for i in range(5):
+            Order(country='country ' + str(i))
+        self.assertEqual(len(Order._pykson_fields_by_name['country'].intern_table), 2)
+
+    def test_rows(self):
+        rows = [('Paris', ''.join(['Fr', 'ance'])), (''.join(['Par', 'is']), 'France')]
+        first, second = Pykson().from_rows(rows, Order, columns=['city', 'country'], intern_strings=True)
+        self.assertIs(first.city, second.city)
+
+
+class CanonicalOptionsTest(unittest.TestCase):
+    def test_option_values_are_shared(self):
+        first, second = Pykson().from_json(orders_json(2), Order)
+        self.assertIs(first.status, second.status)
+        self.assertIs(first.color, second.color)
+        self.assertIs(first.priority, second.priority)
+        self.assertEqual(first.color, 'red')
+        self.assertIs(Order(color=Color.BLUE).color, Order(color='blue').color)
+        self.assertEqual(Order(size=Size.LARGE).size, 2)
+
+    def test_values_of_other_types_are_kept(self):
+        class Status(str):
+            pass
+        value = Status('open')
+        self.assertIs(Order(status=value).status, value)
+
+    def test_booleans_are_rejected(self):
+        with self.assertRaises(Exception):
+            Order(priority=True)
+        with self.assertRaises(Exception):
+            Order(size=True)
+        with self.assertRaises(Exception):
+            MultipleChoiceIntegerField(options=[0, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
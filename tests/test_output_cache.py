@@ -0,0 +1,94 @@
+import unittest
+from unittest import mock
+
+from pykson import Pykson, JsonObject, StringField, IntegerField, ListField, ObjectField, ObjectListField
+
+
+class Product(JsonObject):
+    name = StringField()
+    price = IntegerField()
+
+
+class Catalog(JsonObject):
+    title = StringField()
+    tags = ListField(str)
+    featured = ObjectField(Product)
+    products = ObjectListField(Product)
+
+
+def catalog():
+    return Catalog(title='Spring', tags=['new'], featured=Product(name='Hat', price=10),
+                   products=[Product(name='Hat', price=10), Product(name='Scarf', price=20)])
+
+
+class OutputCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+        self.catalog = catalog()
+        self.expected = self.pson.to_dict_or_list(catalog())
+
+    def encodes(self, item):
+        # number of objects encoded without cache while encoding item
+        with mock.patch.object(Pykson, '_Pykson__get_field_and_child_values_as_dict',
+                               wraps=getattr(Pykson, '_Pykson__get_field_and_child_values_as_dict')) as encode:
+            self.pson.to_dict_or_list(item)
+            return encode.call_count
+
+    def test_cached_outputs(self):
+        self.pson.enable_output_cache(self.catalog)
+        self.assertEqual(self.pson.to_dict_or_list(self.catalog), self.expected)
+        json_text = self.pson.to_json(self.catalog)
+        self.assertIs(self.pson.to_json(self.catalog), json_text)
+        self.assertEqual(json_text, self.pson.to_json(catalog()))
+        self.assertEqual(self.encodes(self.catalog), 0)
+        self.assertEqual(Pykson().to_dict_or_list(self.catalog), self.expected)
+
+    def test_returned_dicts_are_copies(self):
+        self.pson.enable_output_cache(self.catalog, recursive=True)
+        first = self.pson.to_dict_or_list(self.catalog)
+        first['title'] = 'changed'
+        first['tags'].append('changed')
+        first['products'][0]['name'] = 'changed'
+        first['featured']['price'] = 0
+        self.assertEqual(self.pson.to_dict_or_list(self.catalog), self.expected)
+        self.assertEqual(self.pson.to_dict_or_list([self.catalog]), [self.expected])
+        self.assertEqual(self.pson.to_json(self.catalog), self.pson.to_json(catalog()))
+
+    def test_changes_clear_caches(self):
+        self.pson.enable_output_cache(self.catalog)
+        self.pson.to_json(self.catalog)
+        self.catalog.title = 'Summer'
+        self.assertEqual(self.pson.to_dict_or_list(self.catalog)['title'], 'Summer')
+        self.catalog.featured.price = 11
+        self.assertEqual(self.pson.to_dict_or_list(self.catalog)['featured']['price'], 11)
+        self.catalog.products[1].name = 'Gloves'
+        self.assertIn('Gloves', self.pson.to_json(self.catalog))
+        # lists changed in place are not tracked, assigning a new list clears the cache
+        self.catalog.products = self.catalog.products + [Product(name='Coat')]
+        self.assertEqual(len(self.pson.to_dict_or_list(self.catalog)['products']), 3)
+
+    def test_recursive_caches(self):
+        self.pson.enable_output_cache(self.catalog, recursive=True)
+        self.pson.to_dict_or_list(self.catalog)
+        self.assertEqual(self.encodes(self.catalog), 0)
+        self.catalog.title = 'Summer'
+        # nested objects are served from their own caches
+        self.assertEqual(self.encodes(self.catalog), 1)
+        self.catalog.products[0].price = 1
+        self.assertEqual(self.encodes(self.catalog), 2)
+        self.assertEqual(self.pson.to_dict_or_list(self.catalog)['products'][0]['price'], 1)
+
+    def test_disable_and_copy(self):
+        self.pson.enable_output_cache(self.catalog, recursive=True)
+        self.pson.to_json(self.catalog)
+        copied = self.catalog.replace(title='Copy')
+        self.assertEqual(self.pson.to_dict_or_list(copied)['title'], 'Copy')
+        self.assertEqual(self.pson.to_dict_or_list(self.catalog)['title'], 'Spring')
+        self.pson.disable_output_cache(self.catalog, recursive=True)
+        self.assertIsNone(self.catalog._output_cache)
+        self.assertIsNone(self.catalog.featured._output_cache)
+        self.assertEqual(self.encodes(self.catalog), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import pickle
+import unittest
+
+from pykson import Pykson, JsonObject, IntegerField, StringField, BytesField, ObjectField, ObjectListField, \
+    FunctionField
+
+
+class Point(JsonObject):
+    x = IntegerField()
+    y = IntegerField(serialized_name='Y')
+
+
+class Shape(JsonObject):
+    name = StringField()
+    origin = ObjectField(Point)
+    points = ObjectListField(Point)
+    size = FunctionField('get_size')
+
+    def get_size(self):
+        return len(self.points or [])
+
+
+class Blob(JsonObject):
+    data = BytesField(zero_copy=True)
+    version = IntegerField(default_value=3)
+
+
+def shape(i):
+    return Shape(name='shape ' + str(i), origin=Point(x=i, y=-i), points=[Point(x=j, y=j * i) for j in range(i % 3)])
+
+
+class PickleTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+
+    def assert_same(self, a, b):
+        self.assertIs(type(a), type(b))
+        self.assertEqual(self.pson.to_dict_or_list(a), self.pson.to_dict_or_list(b))
+
+    def test_round_trip(self):
+        for item in [shape(5), Point(x=1), Shape(), Blob(data=b'abc')]:
+            copy = pickle.loads(pickle.dumps(item))
+            self.assert_same(copy, item)
+            self.assertEqual(copy._dirty, set())
+        self.assertEqual(pickle.loads(pickle.dumps(shape(5))).size, 2)
+
+    def test_state_is_a_value_tuple(self):
+        item = Point(x=1, y=2)
+        self.assertEqual(item.__getstate__(), (1, 2))
+        item.label = 'extra'
+        copy = pickle.loads(pickle.dumps(item))
+        self.assertEqual(copy.label, 'extra')
+        self.assert_same(copy, item)
+
+    def test_old_dict_states(self):
+        item = Point.__new__(Point)
+        item.__setstate__({'_data': {'x': 1, 'Y': 2}, 'serialized_name': None})
+        self.assertEqual((item.x, item.y), (1, 2))
+
+    def test_memoryviews_are_pickled_as_bytes(self):
+        buffer = bytearray(b'hello')
+        item = Blob(data=memoryview(buffer))
+        self.assertIsInstance(item.data, memoryview)
+        copy = pickle.loads(pickle.dumps(item))
+        buffer[0:1] = b'j'
+        self.assertEqual(copy.data, b'hello')
+        self.assertIsInstance(copy.data, bytes)
+        self.assertEqual(copy.version, 3)
+
+
+class PackManyTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+
+    def test_round_trip(self):
+        items = [shape(i) for i in range(50)]
+        unpacked = self.pson.unpack_many(self.pson.pack_many(items))
+        self.assertEqual(self.pson.to_dict_or_list(unpacked), self.pson.to_dict_or_list(items))
+        self.assertTrue(all(type(item) is Shape for item in unpacked))
+        self.assertEqual(self.pson.unpack_many(self.pson.pack_many([])), [])
+
+    def test_mixed_classes_and_extra_attributes(self):
+        buffer = bytearray(b'data')
+        items = [Point(x=1, y=2), shape(4), Blob(data=memoryview(buffer)), Point(x=3)]
+        items[1].label = 'extra'
+        unpacked = self.pson.unpack_many(self.pson.pack_many(items))
+        self.assertEqual([type(item) for item in unpacked], [Point, Shape, Blob, Point])
+        self.assertEqual(self.pson.to_dict_or_list(unpacked), self.pson.to_dict_or_list(items))
+        self.assertEqual(unpacked[1].label, 'extra')
+        self.assertFalse(hasattr(unpacked[0], 'label'))
+        self.assertEqual(unpacked[2].data, b'data')
+        self.assertIsInstance(unpacked[2].data, bytes)
+        unpacked[3].y = 4
+        self.assertEqual(unpacked[3]._dirty, {'Y'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import unittest
+
+from pykson import Pykson, JsonObject, IntegerField, StringField, ObjectField, ObjectListField
+
+
+class Address(JsonObject):
+    city = StringField()
+
+
+class Person(JsonObject):
+    name = StringField()
+    address = ObjectField(Address)
+    previous_addresses = ObjectListField(Address, serialized_name='previous')
+
+
+class Team(JsonObject):
+    size = IntegerField()
+    lead = ObjectField(Person)
+    members = ObjectListField(Person)
+
+
+class Node(JsonObject):
+    children = ObjectListField(JsonObject)
+
+
+def team():
+    home = Address(city='Tehran')
+    office = Address(city='Rasht')
+    members = [Person(name='a', address=home, previous_addresses=[office]),
+               Person(name='b', address=office, previous_addresses=[home, office]),
+               Person(name='c', address=Address(city='Yazd'))]
+    return Team(size=3, lead=members[1], members=members)
+
+
+class ReferencesTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+
+    def assert_same_graph(self, decoded):
+        self.assertIs(decoded.lead, decoded.members[1])
+        self.assertIs(decoded.members[0].address, decoded.members[1].previous_addresses[0])
+        self.assertIs(decoded.members[0].previous_addresses[0], decoded.members[1].address)
+        self.assertIs(decoded.members[1].address, decoded.members[1].previous_addresses[1])
+        self.assertEqual([m.address.city for m in decoded.members], ['Tehran', 'Rasht', 'Yazd'])
+
+    def test_shared_objects_are_written_once(self):
+        data = json.loads(self.pson.to_json(team(), references=True))
+        self.assertEqual(data['lead'], {'$id': 1, 'name': 'b', 'address': {'$id': 2, 'city': 'Rasht'},
+                                        'previous': [{'$id': 3, 'city': 'Tehran'}, {'$ref': 2}]})
+        self.assertEqual(data['members'][0], {'name': 'a', 'address': {'$ref': 3}, 'previous': [{'$ref': 2}]})
+        self.assertEqual(data['members'][1], {'$ref': 1})
+        self.assertEqual(data['members'][2], {'name': 'c', 'address': {'city': 'Yazd'}, 'previous': None})
+        self.assertNotIn('$id', self.pson.to_json(team()))
+
+    def test_round_trip(self):
+        item = team()
+        for data in [self.pson.to_json(item, references=True), self.pson.to_dict_or_list(item, references=True)]:
+            decoded = self.pson.from_json(data, Team, references=True)
+            self.assert_same_graph(decoded)
+            self.assertEqual(self.pson.to_json(decoded, references=True), self.pson.to_json(item, references=True))
+            self.assertEqual(self.pson.to_json(decoded), self.pson.to_json(item))
+
+    def test_lists_of_objects(self):
+        address = Address(city='Tehran')
+        people = [Person(name=str(i), address=address) for i in range(3)]
+        data = json.loads(self.pson.to_json(people, references=True))
+        self.assertEqual([p['address'] for p in data], [{'$id': 1, 'city': 'Tehran'}, {'$ref': 1}, {'$ref': 1}])
+        decoded = self.pson.from_json(data, Person, references=True)
+        self.assertIs(decoded[0].address, decoded[2].address)
+        self.assertIsNot(self.pson.from_json(data[:1], Person, references=True)[0].address, decoded[0].address)
+
+    def test_shared_objects_are_not_decoded_into(self):
+        decoded = self.pson.from_json(self.pson.to_json(team(), references=True), Team, references=True)
+        shared_address = decoded.members[1].address
+        self.pson.from_json_into(decoded.members[0], {'previous': [{'city': 'Tabriz'}]})
+        self.assertEqual(decoded.members[0].previous_addresses[0].city, 'Tabriz')
+        self.assertIs(decoded.members[1].address, shared_address)
+        self.assertEqual(shared_address.city, 'Rasht')
+
+    def test_invalid_references(self):
+        with self.assertRaises(Exception):
+            self.pson.from_json({'lead': {'$ref': 1}, 'members': [{'$id': 1, 'name': 'a'}]}, Team, references=True)
+        with self.assertRaises(Exception):
+            self.pson.from_json({'lead': {'$id': 1, 'name': 'a'}, 'members': [{'address': {'$ref': 1}}]}, Team,
+                                references=True)
+        node = Node(children=[])
+        node.children.append(node)
+        with self.assertRaises(Exception):
+            self.pson.to_json(node, references=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import json
+import sqlite3
+import unittest
+
+from pykson import Pykson, JsonObject, StringField, IntegerField, ObjectField, ObjectListField, ListField, \
+    FunctionField
+
+
+class Address(JsonObject):
+    city = StringField()
+
+
+class Person(JsonObject):
+    name = StringField()
+    age = IntegerField(serialized_name='a')
+    address = ObjectField(Address)
+    previous_addresses = ObjectListField(Address)
+
+
+class Account(JsonObject):
+    owner = StringField(null=False)
+    plan = StringField(null=False, default_value='free')
+    logins = IntegerField(default_value=0)
+    tags = ListField(str)
+    label = FunctionField('get_label')
+
+    def get_label(self):
+        return self.owner + ' (' + self.plan + ')'
+
+
+class FromRowsTest(unittest.TestCase):
+    def test_object_list_column(self):
+        rows = [('Ann', 30, {'city': 'Paris'}, [{'city': 'Rome'}, {'city': 'Oslo'}]),
+                ('Bob', None, '{"city": "Kyiv"}', '[{"city": "Lima"}]')]
+        people = Pykson().from_rows(rows, Person)
+        self.assertEqual([p.name for p in people], ['Ann', 'Bob'])
+        self.assertEqual(people[0].age, 30)
+        self.assertEqual(people[1].age, None)
+        self.assertEqual(people[1].address.city, 'Kyiv')
+        self.assertEqual([a.city for a in people[0].previous_addresses], ['Rome', 'Oslo'])
+        self.assertEqual([a.city for a in people[1].previous_addresses], ['Lima'])
+
+    def test_columns_by_serialized_and_attribute_names(self):
+        people = Pykson().from_rows([([{'city': 'Rome'}], 30, 'Ann')], Person,
+                                    columns=['previous_addresses', 'a', 'name'])
+        self.assertEqual(people[0].age, 30)
+        self.assertEqual(people[0].name, 'Ann')
+        self.assertEqual(people[0].previous_addresses[0].city, 'Rome')
+        self.assertEqual(Pykson().from_rows([(31,)], Person, columns=['age'])[0].age, 31)
+
+    def test_same_objects_as_from_json(self):
+        rows = [('n' + str(i), i, {'city': 'c' + str(i)}, [{'city': 'p' + str(i)}] * (i % 3)) for i in range(20)]
+        pson = Pykson()
+        people = pson.from_rows(rows, Person)
+        expected = pson.from_json([dict(zip(['name', 'a', 'address', 'previous_addresses'], row)) for row in rows],
+                                  Person)
+        self.assertEqual(pson.to_json(people), pson.to_json(expected))
+        self.assertTrue(all(p._dirty == set() for p in people))
+
+    def test_invalid_columns(self):
+        pson = Pykson()
+        with self.assertRaises(Exception):
+            pson.from_rows([('Ann', 1)], Person, columns=['name', 'unknown'])
+        self.assertEqual(pson.from_rows([('Ann', 1)], Person, columns=['name', 'unknown'],
+                                        accept_unknown=True)[0].name, 'Ann')
+        with self.assertRaises(Exception):
+            pson.from_rows([(1, 2)], Person, columns=['a', 'age'])
+        with self.assertRaises(Exception):
+            pson.from_rows([(1,)], Account, columns=['label'])
+        with self.assertRaises(TypeError):
+            pson.from_rows([('Ann', 'old')], Person, columns=['name', 'a'])
+
+
+class MissingColumnsTest(unittest.TestCase):
+    def test_defaults(self):
+        accounts = Pykson().from_rows([('ann',), ('bob',)], Account, columns=['owner'])
+        self.assertEqual([(a.owner, a.plan, a.logins, a.tags) for a in accounts],
+                         [('ann', 'free', 0, []), ('bob', 'free', 0, [])])
+        self.assertIsNot(accounts[0].tags, accounts[1].tags)
+        self.assertEqual(accounts[1].label, 'bob (free)')
+
+    def test_not_nullable_fields(self):
+        with self.assertRaises(Exception):
+            Pykson().from_rows([('pro',)], Account, columns=['plan'])
+        with self.assertRaises(Exception):
+            Pykson().from_rows([(None, 'pro')], Account, columns=['owner', 'plan'])
+
+
+class CountingCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.description = cursor.description
+        self.fetches = 0
+
+    def fetchmany(self, size):
+        self.fetches += 1
+        return self.cursor.fetchmany(size)
+
+
+class FromCursorTest(unittest.TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.execute('CREATE TABLE people (name TEXT, age INTEGER, address TEXT, previous TEXT)')
+        self.connection.executemany('INSERT INTO people VALUES (?, ?, ?, ?)', [
+            ('n' + str(i), i, json.dumps({'city': 'c' + str(i)}), json.dumps([{'city': 'p'}] * (i % 3)))
+            for i in range(25)
+        ])
+
+    def tearDown(self):
+        self.connection.close()
+
+    def test_batches(self):
+        cursor = CountingCursor(self.connection.execute(
+            'SELECT name, age AS a, address, previous AS previous_addresses FROM people ORDER BY age'))
+        people = Pykson().from_cursor(cursor, Person, batch_size=4)
+        self.assertEqual(cursor.fetches, 0)
+        first = next(people)
+        self.assertEqual((first.name, first.age, first.address.city, first.previous_addresses), ('n0', 0, 'c0', []))
+        self.assertEqual(cursor.fetches, 1)
+        rest = list(people)
+        self.assertEqual(cursor.fetches, 8)
+        self.assertEqual([p.age for p in rest], list(range(1, 25)))
+        self.assertEqual([len(p.previous_addresses) for p in rest], [i % 3 for i in range(1, 25)])
+
+    def test_columns(self):
+        cursor = self.connection.execute('SELECT age, name FROM people WHERE age < 3 ORDER BY age')
+        people = list(Pykson().from_cursor(cursor, Person))
+        self.assertEqual([(p.name, p.age, p.address) for p in people],
+                         [('n0', 0, None), ('n1', 1, None), ('n2', 2, None)])
+        cursor = self.connection.execute('SELECT age, name FROM people WHERE age = 3')
+        self.assertEqual(next(Pykson().from_cursor(cursor, Person, columns=['a', 'name'])).age, 3)
+        with self.assertRaises(Exception):
+            list(Pykson().from_cursor(self.connection.execute('SELECT age AS years FROM people'), Person))
+        with self.assertRaises(AssertionError):
+            Pykson().from_cursor(self.connection.cursor(), Person)
+
+
+if __name__ == '__main__':
+    unittest.main()
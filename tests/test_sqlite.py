@@ -0,0 +1,138 @@
+import enum
+import uuid
+import sqlite3
+import decimal
+import datetime
+import unittest
+
+from pykson import Pykson, JsonObject, StringField, IntegerField, FloatField, BooleanField, BytesField, DateField, \
+    TimeField, DateTimeField, TimestampSecondsField, DecimalField, UUIDField, JsonField, ListField, ObjectField, \
+    ObjectListField, EnumStringField
+from pykson.sqlite import SqliteTable
+
+
+class Level(enum.Enum):
+    LOW = 'low'
+    HIGH = 'high'
+
+
+class Score(JsonObject):
+    course = StringField()
+    score = FloatField()
+
+
+class Student(JsonObject):
+    name = StringField(null=False)
+    age = IntegerField(serialized_name='a')
+    active = BooleanField()
+    photo = BytesField()
+    birth_date = DateField()
+    wake_up = TimeField()
+    registered = DateTimeField(datetime_timezone='Asia/Tehran')
+    updated = TimestampSecondsField()
+    balance = DecimalField()
+    id = UUIDField()
+    level = EnumStringField(Level)
+    extra = JsonField()
+    tags = ListField(str)
+    days = ListField(DateField())
+    best_score = ObjectField(Score)
+    scores = ObjectListField(Score)
+
+
+def student(i):
+    return Student(name='student ' + str(i), age=20 + i, active=i % 2 == 0, photo=bytes([i, 0, 255]),
+                   birth_date=datetime.date(2000, 1, 1 + i), wake_up=datetime.time(7, i, 30),
+                   registered=datetime.datetime(2020, 2, 3, 4, 5, i, 250, tzinfo=datetime.timezone.utc),
+                   updated=datetime.datetime(2021, 1, 1, 12, 0, i, tzinfo=datetime.timezone.utc),
+                   balance=decimal.Decimal('10.0' + str(i)), id=uuid.UUID(int=i), level=Level.HIGH,
+                   extra={'a': [1, None, 'b']}, tags=['x', 'ü'], days=[datetime.date(2010, 5, 6)],
+                   best_score=Score(course='math', score=19.5),
+                   scores=[Score(course='art', score=i), Score(course='music')])
+
+
+class SqliteTableTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+        self.connection = sqlite3.connect(':memory:')
+        self.table = SqliteTable(self.connection, Student)
+        self.table.create(indexes=['name', ('a', 'birth_date')])
+
+    def tearDown(self):
+        self.connection.close()
+
+    def assert_same(self, first, second):
+        self.assertEqual(self.pson.to_json(first), self.pson.to_json(second))
+
+    def test_round_trip(self):
+        items = [student(i) for i in range(5)] + [Student(name='empty')]
+        self.assertEqual(self.table.insert(items, batch_size=2), 6)
+        self.assertEqual(self.table.count(), 6)
+        selected = list(self.table.select(order_by='rowid'))
+        self.assertEqual(len(selected), 6)
+        for first, second in zip(selected, items):
+            self.assert_same(first, second)
+        self.assertEqual(selected[1].registered, items[1].registered)
+        self.assertEqual(selected[1].balance, decimal.Decimal('10.01'))
+        self.assertEqual(selected[1].id, uuid.UUID(int=1))
+        self.assertIs(selected[1].active, False)
+        self.assertEqual(selected[1].scores[0].course, 'art')
+
+    def test_select(self):
+        self.table.insert([student(i) for i in range(5)])
+        self.assertEqual([s.age for s in self.table.select('"a" > ?', [21], order_by='"a" DESC', limit=2)],
+                         [24, 23])
+        self.assertEqual(self.table.count('"registered" >= ?', ['2020-02-03 04:05:03']), 2)
+        self.assertEqual(list(self.table.select('"name" = ?', ['unknown'])), [])
+
+    def test_indexes(self):
+        indexes = {row[0] for row in self.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'Student'")}
+        self.assertEqual(indexes, {'ix_Student_name', 'ix_Student_a_birth_date'})
+        self.table.create_index('id', unique=True)
+        self.table.insert([student(1)])
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.table.insert([student(2), student(1)])
+        self.assertEqual(self.table.count(), 1)
+        with self.assertRaises(Exception):
+            self.table.create_index('unknown')
+
+    def test_invalid_items(self):
+        with self.assertRaises(Exception):
+            self.table.insert([Score(course='a')])
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.connection.execute('INSERT INTO "Student" ("a") VALUES (1)')
+
+    def test_drop(self):
+        self.table.drop()
+        self.assertIsNone(self.connection.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'Student'").fetchone())
+
+    def test_batches_in_autocommit_mode(self):
+        connection = sqlite3.connect(':memory:', isolation_level=None)
+        table = SqliteTable(connection, Student, table_name='students')
+        table.create()
+        statements = []
+        connection.set_trace_callback(statements.append)
+        table.insert([student(i) for i in range(5)], batch_size=2)
+        self.assertEqual([s for s in statements if s in ('BEGIN', 'COMMIT')], ['BEGIN', 'COMMIT'] * 3)
+        self.assertEqual(len([s for s in statements if s.startswith('INSERT')]), 5)
+        self.assertFalse(connection.in_transaction)
+        table.create_index('name', unique=True)
+        with self.assertRaises(sqlite3.IntegrityError):
+            table.insert([Student(name='new'), student(0)])
+        self.assertFalse(connection.in_transaction)
+        self.assertEqual(table.count(), 5)
+        connection.close()
+
+    def test_pending_changes_are_committed(self):
+        self.connection.execute('CREATE TABLE other (value INTEGER)')
+        self.connection.execute('INSERT INTO other VALUES (1)')
+        self.assertTrue(self.connection.in_transaction)
+        self.table.insert([student(1)])
+        self.assertFalse(self.connection.in_transaction)
+        self.assertEqual(self.table.count(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
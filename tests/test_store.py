@@ -0,0 +1,129 @@
+import os
+import json
+import uuid
+import struct
+import datetime
+import tempfile
+import unittest
+from unittest import mock
+
+from pykson import Pykson, JsonObject, StringField, IntegerField, UUIDField, DateTimeField, ListField
+from pykson.store import PyksonStore
+
+
+class Student(JsonObject):
+    student_id = StringField(serialized_name='id')
+    name = StringField()
+    age = IntegerField()
+    uid = UUIDField()
+    registered = DateTimeField()
+    tags = ListField(str)
+
+
+class PyksonStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'students.ndjson')
+        self.records = [{'id': 's-' + str(i), 'name': 'student ' + str(i), 'age': 20 + i,
+                         'uid': str(uuid.UUID(int=i)), 'registered': '2020-01-0' + str(i + 1) + ' 10:00:00'}
+                        for i in range(5)]
+        lines = [json.dumps(r) for r in self.records]
+        # blank and whitespace only lines are skipped, the last line has no newline
+        self.write(lines[0] + '\n\n' + lines[1] + '\n  \t\n' + '\n'.join(lines[2:]))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, text):
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def test_random_access(self):
+        with PyksonStore(self.path, Student) as store:
+            self.assertEqual(len(store), 5)
+            self.assertEqual(store[0].name, 'student 0')
+            self.assertEqual(store[-1].age, 24)
+            self.assertEqual([s.student_id for s in store[1:4]], ['s-1', 's-2', 's-3'])
+            self.assertEqual([s.age for s in store], [20, 21, 22, 23, 24])
+            self.assertEqual(json.loads(store.raw(2)), self.records[2])
+            with self.assertRaises(IndexError):
+                store[5]
+            with self.assertRaises(IndexError):
+                store.raw(-6)
+            with self.assertRaises(Exception):
+                store.get('s-1')
+
+    def test_empty_file(self):
+        self.write('')
+        with PyksonStore(self.path, Student, key_field='student_id') as store:
+            self.assertEqual(len(store), 0)
+            self.assertEqual(store.keys(), [])
+
+    def test_keys(self):
+        with open(self.path, 'a') as f:
+            f.write('\n' + json.dumps({'id': 's-1', 'name': 'again'}) + '\n')
+        with PyksonStore(self.path, Student, key_field='student_id') as store:
+            self.assertIn('s-3', store)
+            self.assertNotIn('s-9', store)
+            self.assertEqual(store.get('s-3').name, 'student 3')
+            # later lines win
+            self.assertEqual(store.get('s-1').name, 'again')
+            self.assertIsNone(store.get('s-9'))
+            self.assertEqual(sorted(store.keys()), ['s-0', 's-1', 's-2', 's-3', 's-4'])
+
+    def test_keys_of_formatted_fields(self):
+        with PyksonStore(self.path, Student, key_field='uid') as store:
+            self.assertEqual(store.get(uuid.UUID(int=2)).name, 'student 2')
+            self.assertEqual(store.get(str(uuid.UUID(int=3))).name, 'student 3')
+        with PyksonStore(self.path, Student, key_field='registered') as store:
+            self.assertEqual(store.get(Pykson().from_json(self.records[1], Student).registered).name, 'student 1')
+            self.assertIn(datetime.datetime(2020, 1, 5, 10), store)
+
+    def test_key_fields_must_be_scalar(self):
+        with self.assertRaises(Exception):
+            PyksonStore(self.path, Student, key_field='tags')
+        with self.assertRaises(Exception):
+            PyksonStore(self.path, Student, key_field='unknown')
+        self.write(json.dumps({'id': ['a'], 'name': 'list'}))
+        with self.assertRaises(Exception):
+            PyksonStore(self.path, Student, key_field='student_id')
+
+    def test_persisted_indexes(self):
+        with PyksonStore(self.path, Student, key_field='student_id') as store:
+            offsets = list(store._offsets)
+        with open(self.path + '.offsets', 'rb') as f:
+            data = f.read()
+        # offsets are little endian after the header
+        self.assertEqual(list(struct.unpack('<' + str(len(offsets)) + 'Q', data[-8 * len(offsets):])), offsets)
+        self.assertTrue(os.path.exists(self.path + '.student_id.keys'))
+        self.assertEqual([n for n in os.listdir(self.directory.name) if n.endswith('.tmp')], [])
+        with mock.patch.object(PyksonStore, '_build_offsets', side_effect=AssertionError('rebuilt')):
+            with PyksonStore(self.path, Student, key_field='student_id') as store:
+                self.assertEqual(list(store._offsets), offsets)
+                self.assertEqual(store.get('s-4').age, 24)
+
+    def test_changed_files_are_indexed_again(self):
+        with PyksonStore(self.path, Student, key_field='student_id') as store:
+            self.assertEqual(len(store), 5)
+        self.write(json.dumps({'id': 'new', 'name': 'only'}) + '\n')
+        with PyksonStore(self.path, Student, key_field='student_id') as store:
+            self.assertEqual(len(store), 1)
+            self.assertEqual(store.keys(), ['new'])
+
+    def test_without_persisted_indexes(self):
+        with PyksonStore(self.path, Student, key_field='student_id', persist_index=False) as store:
+            self.assertEqual(store.get('s-0').age, 20)
+        self.assertEqual(os.listdir(self.directory.name), ['students.ndjson'])
+
+    def test_read_only_directory(self):
+        with mock.patch('tempfile.mkstemp', side_effect=PermissionError('read only')):
+            with PyksonStore(self.path, Student, key_field='student_id') as store:
+                self.assertEqual(store.get('s-2').age, 22)
+        with mock.patch('os.replace', side_effect=PermissionError('read only')):
+            with PyksonStore(self.path, Student, key_field='student_id') as store:
+                self.assertEqual(len(store), 5)
+        self.assertEqual(os.listdir(self.directory.name), ['students.ndjson'])
+
+
+if __name__ == '__main__':
+    unittest.main()
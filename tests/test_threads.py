@@ -0,0 +1,77 @@
+import sys
+import datetime
+import threading
+import unittest
+
+from pykson import Pykson, JsonObject, StringField, IntegerField, DateField, TimeField, ListField
+
+
+class Event(JsonObject):
+    name = StringField()
+    number = IntegerField()
+    days = ListField(DateField())
+    times = ListField(TimeField(time_format='%H:%M'))
+
+
+def event_data(thread_index, i):
+    first_day = datetime.date(2000, 1, 1) + datetime.timedelta(days=thread_index * 1000 + i)
+    return {
+        'name': 'event ' + str(thread_index) + ' ' + str(i),
+        'number': i,
+        'days': [(first_day + datetime.timedelta(days=d)).strftime('%Y-%m-%d') for d in range(i % 5 + 1)],
+        'times': ['%02d:%02d' % (thread_index % 24, (i + t) % 60) for t in range(i % 3 + 1)],
+    }
+
+
+class ListFieldItemFormatTest(unittest.TestCase):
+    def test_items_are_formatted(self):
+        pson = Pykson()
+        data = event_data(1, 7)
+        event = pson.from_json(data, Event)
+        self.assertEqual(event.days[0], datetime.date(2002, 10, 4))
+        self.assertEqual(event.times, [datetime.time(1, 7), datetime.time(1, 8)])
+        self.assertEqual(pson.to_dict_or_list(event), data)
+        self.assertEqual(pson.from_json(pson.to_json(event), Event).days, event.days)
+
+
+class ThreadSafetyTest(unittest.TestCase):
+    threads = 8
+    objects = 300
+
+    def setUp(self):
+        self.switch_interval = sys.getswitchinterval()
+        # switch threads often to interleave the conversions
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def test_decode_and_encode_from_threads(self):
+        pson = Pykson()
+        barrier = threading.Barrier(self.threads)
+        errors = []
+
+        def run(thread_index):
+            try:
+                data = [event_data(thread_index, i) for i in range(self.objects)]
+                barrier.wait()
+                for i, item_data in enumerate(data):
+                    event = pson.from_json(item_data, Event)
+                    if pson.to_dict_or_list(event) != item_data:
+                        errors.append((thread_index, i, 'encoded', pson.to_dict_or_list(event)))
+                events = pson.from_json(pson.to_json([pson.from_json(d, Event) for d in data]), Event)
+                if [pson.to_dict_or_list(e) for e in events] != data:
+                    errors.append((thread_index, 'list'))
+            except Exception as e:
+                errors.append((thread_index, repr(e)))
+
+        workers = [threading.Thread(target=run, args=(i,)) for i in range(self.threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(errors, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
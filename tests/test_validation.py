@@ -0,0 +1,156 @@
+import json
+import unittest
+
+from pykson import Pykson, JsonObject, StringField, ListField, ObjectListField, IntegerField, FloatField, \
+    BooleanField, DateField, UUIDField, ObjectField, MultipleChoiceStringField, FunctionField
+from pykson.validation import DictValidator, ValidationError, json_schema
+
+try:
+    import jsonschema
+except ImportError:
+    jsonschema = None
+
+
+class Address(JsonObject):
+    city = StringField()
+
+
+class Person(JsonObject):
+    tags = ListField(str)
+    required_tags = ListField(str, null=False)
+    addresses = ObjectListField(Address)
+    required_addresses = ObjectListField(Address, null=False)
+
+
+class NullListTest(unittest.TestCase):
+    def assert_agrees_with_from_json(self, data):
+        try:
+            Pykson().from_json(data, Person)
+            decoded = True
+        except Exception:
+            decoded = False
+        self.assertEqual(DictValidator.for_class(Person).is_valid(data), decoded, data)
+
+    def test_null_lists(self):
+        for key in ['tags', 'required_tags', 'addresses', 'required_addresses']:
+            data = {'tags': [], 'required_tags': [], 'addresses': [], 'required_addresses': []}
+            data[key] = None
+            self.assert_agrees_with_from_json(data)
+
+    def test_missing_lists(self):
+        for key in ['tags', 'required_tags', 'addresses', 'required_addresses']:
+            data = {'tags': [], 'required_tags': [], 'addresses': [], 'required_addresses': []}
+            del data[key]
+            self.assert_agrees_with_from_json(data)
+
+    def test_null_not_nullable_list_decodes_to_empty_list(self):
+        data = {'required_tags': None, 'required_addresses': []}
+        self.assertEqual(DictValidator.for_class(Person).errors(data), [])
+        self.assertEqual(Pykson().from_json(data, Person).required_tags, [])
+
+
+class Line(JsonObject):
+    sku = StringField(null=False)
+    count = IntegerField(min_value=1, max_value=100, default_value=1)
+
+
+class Order(JsonObject):
+    id_ = IntegerField(serialized_name='id', null=False)
+    price = FloatField(accepts_string=True)
+    paid = BooleanField()
+    day = DateField()
+    key = UUIDField()
+    state = MultipleChoiceStringField(options=['new', 'sent'])
+    tags = ListField(str)
+    days = ListField(DateField())
+    shipping = ObjectField(Address)
+    lines = ObjectListField(Line)
+    total = FunctionField('get_total')
+
+    def get_total(self):
+        return sum(line.count for line in self.lines or [])
+
+
+def order(i):
+    return Order(id_=i, price=i / 2, paid=i % 2 == 0, day='2020-01-' + str(i % 28 + 1).zfill(2),
+                 key='12345678-1234-4678-9234-5678123456' + str(i % 100).zfill(2), state=['new', 'sent'][i % 2],
+                 tags=['a'] * (i % 3), days=['2021-02-03'], shipping=Address(city='c' + str(i)),
+                 lines=[Line(sku='s' + str(j), count=j + 1) for j in range(i % 4)])
+
+
+def invalid_orders():
+    valid = {k: v for k, v in json.loads(Pykson().to_json(order(3))).items() if k != 'total'}
+    changes = [('id', None), ('id', 'x'), ('price', '1.5'), ('price', 'x'), ('price', 2), ('paid', 'yes'),
+               ('day', '2020-13-01'), ('day', 1), ('key', 'not a uuid'), ('state', 'lost'), ('state', 1),
+               ('tags', 'a'), ('tags', [1]), ('tags', [None]), ('days', ['2021-02-30']), ('shipping', []),
+               ('shipping', {'city': 1}), ('shipping', {'town': 'x'}), ('lines', {}), ('lines', [1]),
+               ('lines', [{'count': 1}]), ('lines', [{'sku': 's', 'count': 0}]), ('lines', [{'sku': 's'}]),
+               ('lines', None), ('unknown', 1), ('total', 1)]
+    for key, value in changes:
+        yield dict(valid, **{key: value})
+    yield {k: v for k, v in valid.items() if k != 'id'}
+    yield valid
+
+
+class DictValidatorTest(unittest.TestCase):
+    def setUp(self):
+        self.pson = Pykson()
+        self.validator = DictValidator.for_class(Order)
+
+    def test_encoded_objects_are_valid(self):
+        for i in range(20):
+            data = json.loads(self.pson.to_json(order(i)))
+            del data['total']
+            self.assertEqual(self.validator.errors(data), [], data)
+            self.assertEqual(self.pson.to_json(self.pson.from_json(data, Order)), self.pson.to_json(order(i)))
+        self.assertTrue(self.validator.is_valid([{'id': 1}, {'id': 2, 'lines': []}]))
+
+    def test_agrees_with_from_json(self):
+        for data in invalid_orders():
+            try:
+                self.pson.from_json(data, Order)
+                decoded = True
+            except Exception:
+                decoded = False
+            self.assertEqual(self.validator.is_valid(data), decoded, data)
+
+    def test_error_paths(self):
+        data = {'id': 'x', 'shipping': {'city': 1}, 'lines': [{'sku': 's'}, {'count': 500}], 'bad key': 1}
+        self.assertEqual(sorted(path for path, message in self.validator.errors(data)),
+                         ['$.id', '$.lines[1].count', '$.lines[1].sku', '$.shipping.city', '$["bad key"]'])
+        self.assertEqual(self.validator.errors([{'id': 1}, 2]), [('$[1]', 'expected object, found int')])
+        with self.assertRaises(ValidationError) as context:
+            self.validator.validate({'id': None})
+        self.assertEqual(context.exception.errors, [('$.id', 'null value for not nullable field')])
+        self.assertTrue(DictValidator.for_class(Order, accept_unknown=True).is_valid({'id': 1, 'unknown': 1}))
+        self.assertIs(DictValidator.for_class(Order), self.validator)
+
+
+class JsonSchemaTest(unittest.TestCase):
+    def test_schema(self):
+        schema = json_schema(Order)
+        self.assertEqual(json.loads(json.dumps(schema)), schema)
+        self.assertEqual(schema['$ref'], '#/$defs/Order')
+        self.assertEqual(sorted(schema['$defs']), ['Address', 'Line', 'Order'])
+        definition = schema['$defs']['Order']
+        self.assertEqual(definition['required'], ['id'])
+        self.assertFalse(definition['additionalProperties'])
+        self.assertNotIn('total', definition['properties'])
+        self.assertEqual(definition['properties']['id'], {'type': 'integer'})
+        self.assertEqual(definition['properties']['price'], {'type': ['number', 'string', 'null']})
+        self.assertEqual(definition['properties']['state'], {'enum': ['new', 'sent', None]})
+        self.assertEqual(definition['properties']['lines'],
+                         {'type': ['array', 'null'], 'items': {'$ref': '#/$defs/Line'}})
+        self.assertEqual(schema['$defs']['Line']['properties']['count'],
+                         {'type': ['integer', 'null'], 'minimum': 1, 'maximum': 100, 'default': 1})
+        self.assertNotIn('additionalProperties', json_schema(Order, accept_unknown=True)['$defs']['Order'])
+
+    @unittest.skipIf(jsonschema is None, 'jsonschema is not installed')
+    def test_encoded_objects_match_schema(self):
+        validator = jsonschema.Draft202012Validator(json_schema(Order))
+        for data in invalid_orders():
+            self.assertEqual(validator.is_valid(data), DictValidator.for_class(Order).is_valid(data), data)
+
+
+if __name__ == '__main__':
+    unittest.main()